@@ -0,0 +1,156 @@
+"""
+Emotion Detection Benchmark
+Measures EmotionDetector throughput against a naive per-keyword substring loop
+"""
+
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.emotion import EmotionDetector, EmotionStream, classify_logs
+
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "emotion_keywords.json"
+
+FILLER = [
+    "今天", "我们", "一起", "玩游戏", "晚上", "你在干嘛", "然后", "就是说", "这个",
+    "let's", "play", "a", "game", "tonight", "and", "then", "maybe", "the",
+]
+
+
+def make_utterances(config, count: int = 20_000, seed: int = 7):
+    """Random mixed Chinese/English utterances, about half containing a keyword"""
+    rng = random.Random(seed)
+    keywords = [k for data in config['emotion_triggers'].values() for k in data['keywords']]
+    utterances = []
+    for _ in range(count):
+        words = rng.choices(FILLER, k=rng.randint(4, 30))
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(keywords))
+        utterances.append(" ".join(words))
+    return utterances
+
+
+def grow_rules(config, per_emotion: int = 400, seed: int = 11):
+    """Copy of the rules with extra random CJK keywords, to show scaling"""
+    rng = random.Random(seed)
+    alphabet = [chr(code) for code in range(0x4e00, 0x4e00 + 3000)]
+    triggers = {}
+    for name, data in config['emotion_triggers'].items():
+        extra = ["".join(rng.choices(alphabet, k=rng.randint(2, 4))) for _ in range(per_emotion)]
+        triggers[name] = dict(data, keywords=data['keywords'] + extra)
+    return dict(config, emotion_triggers=triggers)
+
+
+def naive_detect(config, text: str):
+    """The per-keyword substring loop integrators write by hand"""
+    text = text.lower()
+    for name in config['priority_order']:
+        for keyword in config['emotion_triggers'][name]['keywords']:
+            if keyword in text:
+                return name
+    return None
+
+
+def bench(function, utterances, repeat: int = 3) -> float:
+    """
+    Measure throughput of a detection function
+
+    Returns:
+        Characters per second of the best run
+    """
+    chars = sum(len(u) for u in utterances)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for utterance in utterances:
+            function(utterance)
+        best = min(best, time.perf_counter() - start)
+    return chars / best
+
+
+def bench_partials(detector, utterances, step: int = 2) -> tuple[float, float]:
+    """
+    Measure detection over growing ASR partials
+
+    Each utterance arrives as partials growing by `step` characters.
+
+    Returns:
+        Utterances per second (rescan every partial, EmotionStream)
+    """
+    long_utterances = [" ".join(utterances[i:i + 4]) for i in range(0, 2000, 4)]
+
+    start = time.perf_counter()
+    for utterance in long_utterances:
+        for end in range(step, len(utterance) + step, step):
+            detector.detect(utterance[:end])
+    rescan = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for utterance in long_utterances:
+        stream = EmotionStream(detector)
+        for end in range(step, len(utterance) + step, step):
+            stream.update(utterance[:end])
+        stream.finish()
+    streamed = time.perf_counter() - start
+
+    return len(long_utterances) / rescan, len(long_utterances) / streamed
+
+
+def bench_batch(config, utterances, copies: int = 10) -> list:
+    """
+    Measure offline log classification, inline and with a process pool
+
+    Returns:
+        List of (workers, messages per second)
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "log.jsonl"
+        with open(path, 'w', encoding='utf-8') as f:
+            for _ in range(copies):
+                for utterance in utterances:
+                    f.write(json.dumps({"role": "user", "text": utterance}, ensure_ascii=False) + "\n")
+
+        results = []
+        for workers in (0, 4):
+            start = time.perf_counter()
+            report = classify_logs([str(path)], config, workers=workers)
+            results.append((workers, report.messages / (time.perf_counter() - start)))
+        return results
+
+
+def main():
+    """Run emotion detection benchmarks"""
+    with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    utterances = make_utterances(config)
+    average = sum(len(u) for u in utterances) / len(utterances)
+
+    print("=== Emotion Detection Benchmark ===")
+    print(f"{len(utterances):,} utterances, {average:.0f} chars on average")
+    for rules in (config, grow_rules(config)):
+        detector = EmotionDetector(rules)
+        print(f"-- {len(detector.automaton.keywords)} keywords")
+        naive = bench(lambda text: naive_detect(rules, text), utterances, repeat=1)
+        compiled = bench(detector.detect, utterances)
+        print(f"naive substring loop: {naive:>12,.0f} chars/s ({naive / average:,.0f} utterances/s)")
+        print(f"EmotionDetector:      {compiled:>12,.0f} chars/s ({compiled / average:,.0f} utterances/s)")
+
+    rescan, streamed = bench_partials(EmotionDetector(config), utterances)
+    print(f"-- ASR partials (~{4 * average:.0f} chars, 2 chars per partial)")
+    print(f"rescan every partial: {rescan:>12,.0f} utterances/s")
+    print(f"EmotionStream:        {streamed:>12,.0f} utterances/s")
+
+    print(f"-- Log classification ({10 * len(utterances):,} JSONL messages)")
+    for workers, rate in bench_batch(config, utterances):
+        label = "inline" if workers == 0 else f"{workers} processes"
+        print(f"classify_logs, {label + ':':<13} {rate:>10,.0f} messages/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+State Machine Benchmark
+Measures StateMachine transition throughput on a typical conversation cycle
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.state import StateMachine, StateMachineArray, StateType, EmotionType, EventBus
+
+
+# One conversation turn: listen, speak, react, listen
+TURN = [
+    (StateType.SPEAKING, None),
+    (StateType.LISTENING, None),
+    (StateType.EMOTION, EmotionType.HAPPY),
+    (StateType.LISTENING, None),
+]
+
+
+def bench_transitions(turns: int = 100_000, repeat: int = 5) -> float:
+    """
+    Measure transition_to throughput
+
+    Args:
+        turns: Conversation turns per run
+        repeat: Number of runs (best run is reported)
+
+    Returns:
+        Transitions per second of the best run
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        machine = StateMachine()
+        machine.transition_to(StateType.ENTERING)
+        machine.transition_to(StateType.LISTENING)
+        transition_to = machine.transition_to
+
+        start = time.perf_counter()
+        for _ in range(turns):
+            for target, emotion in TURN:
+                transition_to(target, emotion)
+        best = min(best, time.perf_counter() - start)
+
+    return turns * len(TURN) / best
+
+
+def bench_batch(turns: int = 100_000, repeat: int = 5) -> float:
+    """
+    Measure apply_transitions throughput, one batch per conversation turn
+
+    Args:
+        turns: Conversation turns per run
+        repeat: Number of runs (best run is reported)
+
+    Returns:
+        Transitions per second of the best run
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        machine = StateMachine()
+        machine.transition_to(StateType.ENTERING)
+        machine.transition_to(StateType.LISTENING)
+        apply_transitions = machine.apply_transitions
+
+        start = time.perf_counter()
+        for _ in range(turns):
+            apply_transitions(TURN)
+        best = min(best, time.perf_counter() - start)
+
+    return turns * len(TURN) / best
+
+
+def bench_slow_subscriber(turns: int = 200, delay: float = 0.001) -> tuple[float, float]:
+    """
+    Measure transition_to latency with a slow subscriber, inline vs event bus
+
+    Args:
+        turns: Conversation turns per run
+        delay: Seconds the subscriber sleeps per event
+
+    Returns:
+        Mean transition_to latency in microseconds (inline, event bus)
+    """
+    def slow_subscriber(state):
+        time.sleep(delay)
+
+    latencies = []
+    for bus in (None, EventBus(max_queue=10_000)):
+        machine = StateMachine(event_bus=bus)
+        machine.register_callback(StateType.SPEAKING, slow_subscriber)
+        machine.transition_to(StateType.ENTERING)
+        machine.transition_to(StateType.LISTENING)
+
+        start = time.perf_counter()
+        for _ in range(turns):
+            for target, emotion in TURN:
+                machine.transition_to(target, emotion)
+        latencies.append((time.perf_counter() - start) / (turns * len(TURN)) * 1e6)
+
+        if bus is not None:
+            bus.close()
+
+    return latencies[0], latencies[1]
+
+
+def bench_validation(checks: int = 400_000, repeat: int = 5) -> float:
+    """
+    Measure can_transition_to throughput (validation only)
+
+    Args:
+        checks: Validations per run
+        repeat: Number of runs (best run is reported)
+
+    Returns:
+        Validations per second of the best run
+    """
+    machine = StateMachine()
+    machine.transition_to(StateType.ENTERING)
+    machine.transition_to(StateType.LISTENING)
+    can_transition_to = machine.can_transition_to
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(checks // 4):
+            can_transition_to(StateType.SPEAKING)
+            can_transition_to(StateType.DEFAULT)
+            can_transition_to(StateType.ENTERING)
+            can_transition_to(StateType.LEAVING)
+        best = min(best, time.perf_counter() - start)
+
+    return checks / best
+
+
+def bench_state_array(sessions: int = 1_000_000, repeat: int = 5) -> float:
+    """
+    Measure StateMachineArray batch throughput
+
+    Every session takes one conversation turn per run, one batch per step.
+
+    Args:
+        sessions: Number of sessions in the array
+        repeat: Number of runs (best run is reported)
+
+    Returns:
+        Transitions per second of the best run
+    """
+    import numpy as np
+
+    array = StateMachineArray(sessions)
+    ids = np.arange(sessions)
+    array.apply_transitions(ids, array.encode_states([StateType.ENTERING] * sessions))
+    array.apply_transitions(ids, array.encode_states([StateType.LISTENING] * sessions))
+
+    steps = [
+        (np.full(sessions, array.encode_states([target])[0]),
+         np.full(sessions, array.encode_emotions([emotion])[0]))
+        for target, emotion in TURN
+    ]
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for targets, emotions in steps:
+            array.apply_transitions(ids, targets, emotions)
+        best = min(best, time.perf_counter() - start)
+
+    return sessions * len(TURN) / best
+
+
+def bench_expiry(sessions: int = 1_000_000) -> tuple[float, float]:
+    """
+    Measure scheduling and firing state expiries
+
+    Every session starts speaking at a staggered time; the wheel then
+    advances tick by tick until all have returned to listening.
+
+    Args:
+        sessions: Number of sessions
+
+    Returns:
+        (expiries scheduled per second, expiries fired per second)
+    """
+    import numpy as np
+    from src.state import StateExpiryScheduler
+
+    array = StateMachineArray(sessions)
+    expiry = StateExpiryScheduler(array, tick=0.1, start=0.0)
+    ids = np.arange(sessions)
+    array.apply_transitions(ids, array.encode_states([StateType.ENTERING] * sessions), now=0.0)
+    expiry.advance(5.0)
+
+    # Speaking starts spread over one second, in ten batches
+    start = time.perf_counter()
+    for k in range(10):
+        batch = ids[k::10]
+        array.apply_transitions(batch, array.encode_states([StateType.SPEAKING] * len(batch)), now=5.0 + k / 10)
+    scheduled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fired = 0
+    now = 5.0
+    while fired < sessions:
+        now += 0.1
+        fired += len(expiry.advance(now))
+    return sessions / scheduled, sessions / (time.perf_counter() - start)
+
+
+def main():
+    """Run state machine benchmarks"""
+    print("=== State Machine Benchmark ===")
+    print(f"transition_to:     {bench_transitions():>12,.0f} transitions/s")
+    print(f"apply_transitions: {bench_batch():>12,.0f} transitions/s")
+    print(f"can_transition_to: {bench_validation():>12,.0f} validations/s")
+    inline, bus = bench_slow_subscriber()
+    print(f"slow subscriber:   {inline:>9,.1f} us/transition inline, {bus:,.1f} us with EventBus")
+    try:
+        print(f"StateMachineArray: {bench_state_array():>12,.0f} transitions/s (1M sessions)")
+        scheduled, fired = bench_expiry()
+        print(f"state expiry:      {scheduled:>12,.0f} scheduled/s, {fired:,.0f} fired/s (1M sessions)")
+    except ImportError:
+        print("StateMachineArray: skipped (numpy not installed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,7 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.character import Character, CharacterProfile
+from src.character import Character, get_profile_store
 from src.state import StateMachine, StateType, EmotionType
 
 
@@ -18,7 +18,7 @@ def main():
 
     # 1. Load character profile
     print("1. Loading character profile...")
-    profile = CharacterProfile("config/character_config.json")
+    profile = get_profile_store().load("config/character_config.json")
     print(f"   Loaded character: {profile.nickname}")
     print(f"   Traits: {', '.join(profile.personality_traits)}\n")
 
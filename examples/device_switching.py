@@ -8,7 +8,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.character import Character, CharacterProfile
+from src.character import Character, get_profile_store
 from src.state import StateMachine, StateType
 from src.device import DeviceManager, DeviceType, DeviceSyncManager
 
@@ -17,7 +17,7 @@ def main():
     print("=== Multi-Device Switching Example ===\n")
 
     # 1. Setup character
-    profile = CharacterProfile("config/character_config.json")
+    profile = get_profile_store().load("config/character_config.json")
     character = Character("char_001", profile)
     state_machine = StateMachine()
 
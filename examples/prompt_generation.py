@@ -8,7 +8,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.character import CharacterProfile
+from src.character import get_profile_store
 from src.video import PromptGenerator
 from src.state import CharacterState, StateType, EmotionType
 
@@ -17,7 +17,7 @@ def main():
     print("=== Video Prompt Generation Example ===\n")
 
     # 1. Load character profile
-    profile = CharacterProfile("config/character_config.json")
+    profile = get_profile_store().load("config/character_config.json")
     print(f"Character: {profile.nickname}\n")
 
     # 2. Create prompt generator
@@ -81,8 +81,9 @@ def main():
 
     # 7. Save all prompts to files
     print("\n\n5. Saving prompts to files...")
-    prompt_gen.save_prompts_to_file("prompts")
-    print("   ✓ Prompts saved to 'prompts/' directory")
+    # prompts/ holds the prompt templates; rendered prompts go to output/
+    prompt_gen.save_prompts_to_file("output/prompts")
+    print("   ✓ Prompts saved to 'output/prompts/' directory")
 
     print("\n=== Example Complete ===")
 
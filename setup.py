@@ -50,6 +50,10 @@ setup(
             "pillow>=10.0.0",
             "numpy>=1.24.0",
         ],
+        "runtime": [
+            # Vectorized multi-session state engine (StateMachineArray)
+            "numpy>=1.24.0",
+        ],
     },
     entry_points={
         "console_scripts": [
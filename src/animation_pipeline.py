@@ -4,15 +4,20 @@ Main orchestrator that generates all required character animations from config
 """
 
 import json
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.character import CharacterProfile
-from src.video import PromptGenerator, VideoGenerator, VideoGenerationRequest, VideoProcessor
-from src.state import CharacterState, StateType, EmotionType
+from src.character import get_profile_store
+from src.video import (
+    PromptGenerator, TemplateLibrary, VideoGenerator, VideoGenerationRequest, VideoProcessor,
+    Rendition, RenditionLadder
+)
+from src.state import CharacterState, StateType, EmotionType, get_character_state
+from src.assets import BundleWriter, AssetManifest, AssetAvailability
 
 
 class AnimationPipeline:
@@ -33,7 +38,8 @@ class AnimationPipeline:
         self,
         character_config_path: str,
         video_config_path: str,
-        output_dir: str = "output/videos"
+        output_dir: str = "output/videos",
+        template_dir: Optional[str] = None
     ):
         """
         Initialize animation pipeline
@@ -42,6 +48,7 @@ class AnimationPipeline:
             character_config_path: Path to character config JSON
             video_config_path: Path to video parameters config
             output_dir: Directory to save generated videos
+            template_dir: Prompt template directory (e.g. "prompts"); built-in prompts if None
         """
         self.character_config_path = character_config_path
         self.video_config_path = video_config_path
@@ -49,19 +56,30 @@ class AnimationPipeline:
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
         # Load configurations
-        self.profile = CharacterProfile(character_config_path)
-        self.prompt_gen = PromptGenerator(self.profile)
+        self.profile = get_profile_store().load(character_config_path)
+        templates = TemplateLibrary(template_dir) if template_dir else None
+        self.prompt_gen = PromptGenerator(self.profile, templates)
         self.video_gen = VideoGenerator(video_config_path)
         self.video_processor = VideoProcessor()
+        self.rendition_ladder = RenditionLadder.from_config(self.video_gen.config)
 
         # Track generated videos
         self.generated_videos: Dict[str, str] = {}
+        self.rendition_outputs: Dict[str, Dict[str, str]] = {}
         self.generation_log: List[Dict] = []
 
+        # Clips are published here as soon as they are ready
+        self.availability = AssetAvailability(str(self.output_dir))
+        self._announced_usable = False
+
     def generate_all_animations(self) -> Dict[str, str]:
         """
         Generate all required character animations
 
+        Clips are generated in priority order and published as soon as each
+        one is post-processed, so the character becomes usable after the
+        first couple of clips instead of after the full set.
+
         Returns:
             Dictionary mapping video name to file path
         """
@@ -72,33 +90,77 @@ class AnimationPipeline:
         reference_image = self._generate_reference_image()
         print(f"✓ Reference image: {reference_image}\n")
 
-        # Step 2: Generate base state videos
-        print("Step 2: Generating base state videos...")
-        self._generate_base_states(reference_image)
+        # Step 2: Generate, post-process and publish clips in priority order
+        print("Step 2: Generating clips in priority order...")
+        renditions = self.rendition_ladder.unique_renditions()
+        (self.output_dir / "renditions").mkdir(exist_ok=True)
 
-        # Step 3: Generate transition videos
-        print("\nStep 3: Generating transition videos...")
-        self._generate_transitions(reference_image)
+        for name, generate in self._build_generation_plan(reference_image):
+            video_path = generate()
+            if video_path is None:
+                continue
 
-        # Step 4: Generate emotion videos
-        print("\nStep 4: Generating emotion videos...")
-        self._generate_emotions(reference_image)
+            self._post_process_clip(name, video_path)
+            self._render_clip(name, video_path, renditions)
+            self.availability.publish(name, video_path)
 
-        # Step 5: Generate device transition videos
-        print("\nStep 5: Generating device transition videos...")
-        self._generate_device_transitions(reference_image)
+            if self.availability.is_usable() and not self._announced_usable:
+                self._announced_usable = True
+                print(f"   ★ Character usable after {len(self.availability.published)} clips")
 
-        # Step 6: Post-process all videos
-        print("\nStep 6: Post-processing videos...")
-        self._post_process_videos()
+        # Step 3: Write per-device rendition manifest
+        print("\nStep 3: Writing device manifest...")
+        self._write_device_manifest(renditions)
 
-        # Step 7: Generate summary
-        print("\nStep 7: Generating summary...")
+        # Step 4: Generate summary
+        print("\nStep 4: Generating summary...")
         self._generate_summary()
 
         print(f"\n=== Complete! Generated {len(self.generated_videos)} videos ===")
         return self.generated_videos
 
+    def _build_generation_plan(self, reference_image: str) -> List[Tuple[str, Callable[[], Optional[str]]]]:
+        """
+        Build the list of clip generation jobs, ordered by publish priority
+
+        Args:
+            reference_image: Reference image path
+
+        Returns:
+            List of (clip name, job) tuples; each job returns the clip path or None
+        """
+        plan: Dict[str, Callable[[], Optional[str]]] = {}
+
+        # Base states
+        for state_type, name, duration in [
+            (StateType.DEFAULT, "default", 5.0),
+            (StateType.LISTENING, "listening", 5.0),
+            (StateType.SPEAKING, "speaking", 4.0),
+        ]:
+            plan[name] = partial(self._generate_state_clip, state_type, name, duration, reference_image)
+
+        # State transitions
+        for from_state, to_state, name, duration in [
+            (StateType.DEFAULT, StateType.LISTENING, "default2listening", 5.0),
+            (StateType.LISTENING, StateType.DEFAULT, "listening2default", 5.0),
+        ]:
+            plan[name] = partial(self._generate_transition_clip, from_state, to_state, name, duration)
+
+        # Emotions
+        for emotion in EmotionType:
+            plan[f"emotion_{emotion.value}"] = partial(self._generate_emotion_clip, emotion)
+
+        # Device transitions: leave (from listening and default) and enter
+        for source_state, name in [
+            (StateType.LISTENING, "listening2leave"),
+            (StateType.DEFAULT, "default2leave"),
+        ]:
+            plan[name] = partial(self._generate_leave_clip, source_state, name)
+        plan["enter"] = self._generate_enter_clip
+
+        ordered = AssetManifest.download_order(list(plan))
+        return [(name, plan[name]) for name in ordered]
+
     def _generate_reference_image(self) -> str:
         """Generate character reference image"""
         prompt = self.prompt_gen.generate_image_prompt(with_background=False)
@@ -118,172 +180,160 @@ class AnimationPipeline:
 
         return output_path
 
-    def _generate_base_states(self, reference_image: str) -> None:
-        """Generate base state videos (default, listening, speaking)"""
+    def _generate_state_clip(
+        self,
+        state_type: StateType,
+        name: str,
+        duration: float,
+        reference_image: str
+    ) -> Optional[str]:
+        """Generate a base state video (default, listening, speaking)"""
+        state = CharacterState(state_type, duration=duration)
+        prompt = self.prompt_gen.generate_state_prompt(state)
+        output_path = str(self.output_dir / f"{name}.mp4")
 
-        states_to_generate = [
-            (StateType.DEFAULT, "default", 5.0),
-            (StateType.LISTENING, "listening", 5.0),
-            (StateType.SPEAKING, "speaking", 4.0),
-        ]
+        print(f"   Generating {name}...")
 
-        for state_type, name, duration in states_to_generate:
-            state = CharacterState(state_type, duration=duration)
-            prompt = self.prompt_gen.generate_state_prompt(state)
-            output_path = str(self.output_dir / f"{name}.mp4")
+        request = VideoGenerationRequest(
+            prompt=prompt,
+            state=state,
+            reference_image=reference_image,
+            duration=duration
+        )
 
-            print(f"   Generating {name}...")
+        result = self.video_gen.generate_video(request, output_path)
 
-            request = VideoGenerationRequest(
-                prompt=prompt,
-                state=state,
-                reference_image=reference_image,
-                duration=duration
-            )
+        if not result['success']:
+            return None
 
-            result = self.video_gen.generate_video(request, output_path)
+        self.generated_videos[name] = output_path
+        self.generation_log.append({
+            'type': 'video',
+            'name': name,
+            'state': state_type.value,
+            'prompt': prompt,
+            'output': output_path
+        })
+        print(f"   ✓ {name}.mp4")
+        return output_path
 
-            if result['success']:
-                self.generated_videos[name] = output_path
-                self.generation_log.append({
-                    'type': 'video',
-                    'name': name,
-                    'state': state_type.value,
-                    'prompt': prompt,
-                    'output': output_path
-                })
-                print(f"   ✓ {name}.mp4")
+    def _generate_transition_clip(
+        self,
+        from_state: StateType,
+        to_state: StateType,
+        name: str,
+        duration: float
+    ) -> Optional[str]:
+        """Generate a state transition video"""
+        prompt = self.prompt_gen.generate_transition_prompt(from_state, to_state)
 
-    def _generate_transitions(self, reference_image: str) -> None:
-        """Generate state transition videos"""
+        if not prompt:  # Skip if no transition video needed
+            return None
 
-        transitions = [
-            (StateType.DEFAULT, StateType.LISTENING, "default2listening", 5.0),
-            (StateType.LISTENING, StateType.DEFAULT, "listening2default", 5.0),
-        ]
+        output_path = str(self.output_dir / f"{name}.mp4")
 
-        for from_state, to_state, name, duration in transitions:
-            prompt = self.prompt_gen.generate_transition_prompt(from_state, to_state)
+        print(f"   Generating {name}...")
 
-            if not prompt:  # Skip if no transition video needed
-                continue
+        # Get first/last frames for seamless transition
+        first_frame = self._get_state_last_frame(from_state)
+        last_frame = self._get_state_first_frame(to_state)
 
-            output_path = str(self.output_dir / f"{name}.mp4")
+        result = self.video_gen.generate_with_frame_control(
+            prompt=prompt,
+            first_frame_path=first_frame,
+            last_frame_path=last_frame,
+            output_path=output_path,
+            duration=duration
+        )
 
-            print(f"   Generating {name}...")
+        if not result['success']:
+            return None
 
-            # Get first/last frames for seamless transition
-            first_frame = self._get_state_last_frame(from_state)
-            last_frame = self._get_state_first_frame(to_state)
+        self.generated_videos[name] = output_path
+        self.generation_log.append({
+            'type': 'transition',
+            'name': name,
+            'from': from_state.value,
+            'to': to_state.value,
+            'prompt': prompt,
+            'output': output_path
+        })
+        print(f"   ✓ {name}.mp4")
+        return output_path
 
-            result = self.video_gen.generate_with_frame_control(
-                prompt=prompt,
-                first_frame_path=first_frame,
-                last_frame_path=last_frame,
-                output_path=output_path,
-                duration=duration
-            )
+    def _generate_emotion_clip(self, emotion: EmotionType) -> Optional[str]:
+        """Generate an emotion state video"""
+        state = get_character_state(StateType.EMOTION, emotion)
+        prompt = self.prompt_gen.generate_state_prompt(state)
+        name = emotion.value
+        output_path = str(self.output_dir / f"emotion_{name}.mp4")
 
-            if result['success']:
-                self.generated_videos[name] = output_path
-                self.generation_log.append({
-                    'type': 'transition',
-                    'name': name,
-                    'from': from_state.value,
-                    'to': to_state.value,
-                    'prompt': prompt,
-                    'output': output_path
-                })
-                print(f"   ✓ {name}.mp4")
-
-    def _generate_emotions(self, reference_image: str) -> None:
-        """Generate all emotion state videos"""
-
-        emotions = [
-            EmotionType.NEUTRAL,
-            EmotionType.HAPPY,
-            EmotionType.SHY,
-            EmotionType.SURPRISED,
-            EmotionType.SMUG,
-            EmotionType.ANGRY,
-            EmotionType.CONFUSED,
-            EmotionType.SAD,
-            EmotionType.SLEEPY,
-        ]
-
-        for emotion in emotions:
-            state = CharacterState(StateType.EMOTION, emotion=emotion)
-            prompt = self.prompt_gen.generate_state_prompt(state)
-            name = emotion.value
-            output_path = str(self.output_dir / f"emotion_{name}.mp4")
-
-            print(f"   Generating emotion: {name}...")
-
-            # Get listening state frames for seamless transition
-            first_frame = self._get_state_first_frame(StateType.LISTENING)
-            last_frame = self._get_state_last_frame(StateType.LISTENING)
-
-            duration = 10.0 if emotion == EmotionType.SHY else 5.0
-
-            result = self.video_gen.generate_with_frame_control(
-                prompt=prompt,
-                first_frame_path=first_frame,
-                last_frame_path=last_frame,
-                output_path=output_path,
-                duration=duration
-            )
+        print(f"   Generating emotion: {name}...")
 
-            if result['success']:
-                self.generated_videos[f"emotion_{name}"] = output_path
-                self.generation_log.append({
-                    'type': 'emotion',
-                    'name': name,
-                    'emotion': emotion.value,
-                    'prompt': prompt,
-                    'output': output_path
-                })
-                print(f"   ✓ emotion_{name}.mp4")
-
-    def _generate_device_transitions(self, reference_image: str) -> None:
-        """Generate device transition videos (leave, enter)"""
-
-        # Leave animations (from listening and default)
-        leave_sources = [
-            (StateType.LISTENING, "listening2leave"),
-            (StateType.DEFAULT, "default2leave"),
-        ]
+        # Get listening state frames for seamless transition
+        first_frame = self._get_state_first_frame(StateType.LISTENING)
+        last_frame = self._get_state_last_frame(StateType.LISTENING)
 
-        for source_state, name in leave_sources:
-            state = CharacterState(StateType.LEAVING)
-            prompt = self.prompt_gen.generate_state_prompt(state)
-            output_path = str(self.output_dir / f"{name}.mp4")
+        duration = 10.0 if emotion == EmotionType.SHY else 5.0
 
-            print(f"   Generating {name}...")
+        result = self.video_gen.generate_with_frame_control(
+            prompt=prompt,
+            first_frame_path=first_frame,
+            last_frame_path=last_frame,
+            output_path=output_path,
+            duration=duration
+        )
 
-            first_frame = self._get_state_last_frame(source_state)
+        if not result['success']:
+            return None
 
-            request = VideoGenerationRequest(
-                prompt=prompt,
-                state=state,
-                first_frame=first_frame,
-                duration=5.0
-            )
+        self.generated_videos[f"emotion_{name}"] = output_path
+        self.generation_log.append({
+            'type': 'emotion',
+            'name': name,
+            'emotion': emotion.value,
+            'prompt': prompt,
+            'output': output_path
+        })
+        print(f"   ✓ emotion_{name}.mp4")
+        return output_path
 
-            result = self.video_gen.generate_video(request, output_path)
-
-            if result['success']:
-                self.generated_videos[name] = output_path
-                self.generation_log.append({
-                    'type': 'device_transition',
-                    'name': name,
-                    'action': 'leave',
-                    'prompt': prompt,
-                    'output': output_path
-                })
-                print(f"   ✓ {name}.mp4")
-
-        # Enter animation
-        state = CharacterState(StateType.ENTERING)
+    def _generate_leave_clip(self, source_state: StateType, name: str) -> Optional[str]:
+        """Generate a leave animation starting from the given state"""
+        state = get_character_state(StateType.LEAVING)
+        prompt = self.prompt_gen.generate_state_prompt(state)
+        output_path = str(self.output_dir / f"{name}.mp4")
+
+        print(f"   Generating {name}...")
+
+        first_frame = self._get_state_last_frame(source_state)
+
+        request = VideoGenerationRequest(
+            prompt=prompt,
+            state=state,
+            first_frame=first_frame,
+            duration=5.0
+        )
+
+        result = self.video_gen.generate_video(request, output_path)
+
+        if not result['success']:
+            return None
+
+        self.generated_videos[name] = output_path
+        self.generation_log.append({
+            'type': 'device_transition',
+            'name': name,
+            'action': 'leave',
+            'prompt': prompt,
+            'output': output_path
+        })
+        print(f"   ✓ {name}.mp4")
+        return output_path
+
+    def _generate_enter_clip(self) -> Optional[str]:
+        """Generate the enter animation"""
+        state = get_character_state(StateType.ENTERING)
         prompt = self.prompt_gen.generate_state_prompt(state)
         output_path = str(self.output_dir / "enter.mp4")
 
@@ -300,16 +350,19 @@ class AnimationPipeline:
 
         result = self.video_gen.generate_video(request, output_path)
 
-        if result['success']:
-            self.generated_videos["enter"] = output_path
-            self.generation_log.append({
-                'type': 'device_transition',
-                'name': 'enter',
-                'action': 'enter',
-                'prompt': prompt,
-                'output': output_path
-            })
-            print(f"   ✓ enter.mp4")
+        if not result['success']:
+            return None
+
+        self.generated_videos["enter"] = output_path
+        self.generation_log.append({
+            'type': 'device_transition',
+            'name': 'enter',
+            'action': 'enter',
+            'prompt': prompt,
+            'output': output_path
+        })
+        print(f"   ✓ enter.mp4")
+        return output_path
 
     def _get_state_first_frame(self, state_type: StateType) -> str:
         """Get first frame of a state video"""
@@ -323,20 +376,36 @@ class AnimationPipeline:
         # For now: return mock path
         return str(self.output_dir / f"{state_type.value}_last_frame.png")
 
-    def _post_process_videos(self) -> None:
-        """Post-process all generated videos"""
+    def _post_process_clip(self, name: str, video_path: str) -> None:
+        """Post-process a generated video"""
+        print(f"   Processing {name}...")
 
-        for name, video_path in self.generated_videos.items():
-            print(f"   Processing {name}...")
+        # Remove watermark
+        temp_path = str(Path(video_path).parent / f"temp_{Path(video_path).name}")
+        self.video_processor.remove_watermark(video_path, temp_path)
 
-            # Remove watermark
-            temp_path = str(Path(video_path).parent / f"temp_{Path(video_path).name}")
-            self.video_processor.remove_watermark(video_path, temp_path)
+        # Check consistency
+        self.video_processor.validate_video(video_path)
 
-            # Check consistency
-            self.video_processor.validate_video(video_path)
+        print(f"   ✓ {name} processed")
 
-            print(f"   ✓ {name} processed")
+    def _render_clip(self, name: str, video_path: str, renditions: List[Rendition]) -> None:
+        """Encode a clip into all device renditions in one decode"""
+        result = self.video_processor.create_renditions(
+            video_path, renditions, str(self.output_dir / "renditions")
+        )
+        if result['success']:
+            self.rendition_outputs[name] = result['outputs']
+
+    def _write_device_manifest(self, renditions: List[Rendition]) -> None:
+        """Write the per-device rendition manifest"""
+        manifest_path = self.output_dir / "device_manifest.json"
+        manifest = self.rendition_ladder.build_manifest(self.rendition_outputs)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+        print(f"   ✓ {len(renditions)} renditions per clip")
+        print(f"   Device manifest saved to: {manifest_path}")
 
     def _generate_summary(self) -> None:
         """Generate summary report"""
@@ -377,10 +446,59 @@ class AnimationPipeline:
             else:
                 print(f"   {status}/9 {item}")
 
+    def export_bundle(self, bundle_path: Optional[str] = None) -> Optional[str]:
+        """
+        Pack all generated clips into a single asset bundle
+
+        Args:
+            bundle_path: Output bundle path (defaults to <output_dir>/character.bundle)
+
+        Returns:
+            Bundle path, or None if no clip files exist yet
+        """
+        bundle_path = bundle_path or str(self.output_dir / "character.bundle")
+        writer = BundleWriter()
+
+        for name, video_path in self.generated_videos.items():
+            if not Path(video_path).exists():
+                print(f"   Skipping {name}: file not found (mock mode)")
+                continue
+            writer.add_clip(
+                name,
+                video_path,
+                first_thumb=str(self.output_dir / f"{name}_first_frame.png"),
+                last_thumb=str(self.output_dir / f"{name}_last_frame.png")
+            )
+
+        if not writer.clips:
+            return None
+
+        writer.write(bundle_path)
+        print(f"Bundle exported to: {bundle_path} ({len(writer.clips)} clips)")
+        return bundle_path
+
+    def export_manifest(self, manifest_path: Optional[str] = None) -> AssetManifest:
+        """
+        Write the content-hash manifest devices use for delta sync
+
+        Args:
+            manifest_path: Output path (defaults to <output_dir>/asset_manifest.json)
+
+        Returns:
+            Asset manifest of the clip files currently in the output directory
+        """
+        character_id = self.profile.get_character_info().get('id', self.profile.nickname)
+        manifest = AssetManifest.from_directory(character_id, str(self.output_dir))
+        manifest_path = manifest_path or str(self.output_dir / "asset_manifest.json")
+        manifest.save(manifest_path)
+        print(f"Asset manifest saved to: {manifest_path} ({len(manifest)} clips)")
+        return manifest
+
     def export_prompts(self, output_dir: str = "output/prompts") -> None:
-        """Export all prompts to text files"""
-        self.prompt_gen.save_prompts_to_file(output_dir)
-        print(f"Prompts exported to: {output_dir}")
+        """Export all prompts to text files, rewriting only changed ones"""
+        result = self.prompt_gen.save_prompts_to_file(output_dir)
+        print(f"Prompts exported to: {output_dir} "
+              f"({len(result.written)} written, {len(result.unchanged)} unchanged)")
 
 
 def main():
@@ -405,6 +523,10 @@ def main():
         default="output/videos",
         help="Directory to save generated videos"
     )
+    parser.add_argument(
+        "--template-dir",
+        help="Prompt template directory (e.g. prompts) overriding the built-in prompts"
+    )
     parser.add_argument(
         "--export-prompts-only",
         action="store_true",
@@ -417,7 +539,8 @@ def main():
     pipeline = AnimationPipeline(
         character_config_path=args.character_config,
         video_config_path=args.video_config,
-        output_dir=args.output_dir
+        output_dir=args.output_dir,
+        template_dir=args.template_dir
     )
 
     if args.export_prompts_only:
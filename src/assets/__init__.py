@@ -0,0 +1,10 @@
+"""Asset packaging and delivery module for generated character clips"""
+
+from .bundle import BundleWriter, BundleReader, BundleEntry, BundleError
+from .server import AssetServer
+from .manifest import AssetManifest, ManifestEntry, ManifestDiff, clips_for_state
+from .availability import AssetAvailability
+
+__all__ = ["BundleWriter", "BundleReader", "BundleEntry", "BundleError", "AssetServer",
+           "AssetManifest", "ManifestEntry", "ManifestDiff", "clips_for_state",
+           "AssetAvailability"]
@@ -0,0 +1,149 @@
+"""
+Asset Availability
+Tracks which clips are published so a character can go live on a partial set
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .manifest import DEFAULT_CLIP_PRIORITY
+from ..state.states import CharacterState, StateType, EmotionType
+
+
+# Clips a character needs before it can be shown on a device at all
+REQUIRED_CLIPS = ("listening", "enter")
+
+NEUTRAL_EMOTION_CLIP = f"emotion_{EmotionType.NEUTRAL.value}"
+
+
+class AssetAvailability:
+    """
+    Registry of published clips with graceful fallbacks for missing ones
+
+    The pipeline publishes clips as they finish; the runtime resolves each
+    state to the best clip that is already available, e.g. an emotion that
+    is not ready yet plays emotion_neutral, or listening if that is missing too.
+    """
+
+    def __init__(
+        self,
+        output_dir: Optional[str] = None,
+        expected_clips: Optional[List[str]] = None,
+        file_name: str = "availability.json"
+    ):
+        """
+        Initialize availability registry
+
+        Args:
+            output_dir: Directory to write the availability file to (None to keep in memory)
+            expected_clips: Full clip set (defaults to DEFAULT_CLIP_PRIORITY)
+            file_name: Availability file name
+        """
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.expected_clips = list(expected_clips or DEFAULT_CLIP_PRIORITY)
+        self.file_name = file_name
+        self.published: Dict[str, str] = {}
+        self.callbacks: List[Callable[[str, str], None]] = []
+        self._lock = threading.Lock()
+
+    def publish(self, name: str, path: str) -> None:
+        """
+        Mark a clip as available
+
+        Args:
+            name: Clip name
+            path: Clip file path
+        """
+        with self._lock:
+            self.published[name] = path
+            if self.output_dir is not None:
+                self._write_file()
+
+        for callback in self.callbacks:
+            try:
+                callback(name, path)
+            except Exception as e:
+                print(f"Error in availability callback: {e}")
+
+    def register_callback(self, callback: Callable[[str, str], None]) -> None:
+        """
+        Register a callback called with (name, path) whenever a clip is published
+
+        Args:
+            callback: Callback function
+        """
+        self.callbacks.append(callback)
+
+    def is_available(self, name: str) -> bool:
+        """Check if a clip is published"""
+        return name in self.published
+
+    def is_usable(self) -> bool:
+        """Check if enough clips exist to put the character on a device"""
+        return all(name in self.published for name in REQUIRED_CLIPS)
+
+    def is_complete(self) -> bool:
+        """Check if every expected clip is published"""
+        return all(name in self.published for name in self.expected_clips)
+
+    def get_missing(self) -> List[str]:
+        """Get expected clips not yet published, in priority order"""
+        return [name for name in self.expected_clips if name not in self.published]
+
+    def resolve_clip(self, state: CharacterState) -> Optional[str]:
+        """
+        Get the clip to play for a state, falling back if it is missing
+
+        Fallbacks: emotion -> emotion_neutral -> listening;
+        default/speaking -> listening. Leaving/entering fall back to a
+        direct cut (None).
+
+        Args:
+            state: Character state to play
+
+        Returns:
+            Available clip name, or None for a direct cut
+        """
+        for name in self._candidates(state):
+            if name in self.published:
+                return name
+        return None
+
+    def _candidates(self, state: CharacterState) -> List[str]:
+        """Preferred clip followed by its fallbacks"""
+        state_type = state.state_type
+        if state_type == StateType.EMOTION:
+            emotion = state.emotion or EmotionType.NEUTRAL
+            return [f"emotion_{emotion.value}", NEUTRAL_EMOTION_CLIP, "listening"]
+        if state_type in (StateType.DEFAULT, StateType.SPEAKING):
+            return [state_type.value, "listening"]
+        if state_type == StateType.LISTENING:
+            return ["listening"]
+        if state_type == StateType.ENTERING:
+            return ["enter"]
+        if state_type == StateType.LEAVING:
+            return ["listening2leave", "default2leave"]
+        return []
+
+    def to_dict(self) -> Dict:
+        """Convert availability to dictionary"""
+        return {
+            'usable': self.is_usable(),
+            'complete': self.is_complete(),
+            'available': dict(self.published),
+            'missing': self.get_missing()
+        }
+
+    def _write_file(self) -> None:
+        """Atomically replace the availability file so devices never read a partial one"""
+        path = self.output_dir / self.file_name
+        temp_path = path.with_name(f".{self.file_name}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def __repr__(self) -> str:
+        return f"AssetAvailability({len(self.published)}/{len(self.expected_clips)} clips, usable={self.is_usable()})"
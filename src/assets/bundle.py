@@ -0,0 +1,338 @@
+"""
+Asset Bundle
+Packs all character clips into one memory-mappable file
+
+Layout:
+    header   fixed-size, see HEADER
+    index    entry_count fixed-size records, see INDEX_ENTRY
+    payload  clip and thumbnail data, each starting on a page boundary
+"""
+
+import hashlib
+import mmap
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+BUNDLE_MAGIC = b"GANIMBDL"
+BUNDLE_VERSION = 1
+PAGE_SIZE = mmap.ALLOCATIONGRANULARITY
+
+# magic, version, flags, page_size, entry_count, index_offset, payload_offset
+HEADER = struct.Struct("<8sHHIIQQ")
+HEADER_SIZE = 64
+
+# name, offset, length, sha256, first thumb offset/length, last thumb offset/length
+INDEX_ENTRY = struct.Struct("<64sQQ32sQIQI")
+MAX_NAME_LENGTH = 64
+
+_COPY_CHUNK = 1024 * 1024
+
+
+class BundleError(Exception):
+    """Raised when a bundle file is malformed"""
+    pass
+
+
+@dataclass(frozen=True)
+class BundleEntry:
+    """
+    Index record for one clip in a bundle
+
+    Attributes:
+        name: Clip name (e.g. "listening", "emotion_happy")
+        offset: Byte offset of clip payload in the bundle
+        length: Clip payload length in bytes
+        sha256: Hex SHA-256 digest of the clip payload
+        first_thumb: (offset, length) of first-frame thumbnail, length 0 if absent
+        last_thumb: (offset, length) of last-frame thumbnail, length 0 if absent
+    """
+    name: str
+    offset: int
+    length: int
+    sha256: str
+    first_thumb: Tuple[int, int] = (0, 0)
+    last_thumb: Tuple[int, int] = (0, 0)
+
+    def pack(self) -> bytes:
+        """Encode entry as a fixed-size index record"""
+        return INDEX_ENTRY.pack(
+            self.name.encode('utf-8'),
+            self.offset,
+            self.length,
+            bytes.fromhex(self.sha256),
+            self.first_thumb[0], self.first_thumb[1],
+            self.last_thumb[0], self.last_thumb[1]
+        )
+
+    @classmethod
+    def unpack_from(cls, buffer, position: int) -> "BundleEntry":
+        """Decode entry from a fixed-size index record at position"""
+        name, offset, length, digest, ft_off, ft_len, lt_off, lt_len = INDEX_ENTRY.unpack_from(
+            buffer, position
+        )
+        return cls(
+            name=name.rstrip(b"\0").decode('utf-8'),
+            offset=offset,
+            length=length,
+            sha256=digest.hex(),
+            first_thumb=(ft_off, ft_len),
+            last_thumb=(lt_off, lt_len)
+        )
+
+
+def _align(offset: int, page_size: int) -> int:
+    """Round offset up to the next page boundary"""
+    return (offset + page_size - 1) // page_size * page_size
+
+
+class BundleWriter:
+    """
+    Builds an asset bundle from clip files on disk
+
+    Clips are streamed into the bundle in chunks, so the writer never holds
+    a whole clip in memory.
+    """
+
+    def __init__(self, page_size: int = PAGE_SIZE):
+        """
+        Initialize bundle writer
+
+        Args:
+            page_size: Payload alignment in bytes (must be a multiple of the mmap granularity
+                for zero-copy slicing on all platforms)
+        """
+        self.page_size = page_size
+        self.clips: List[Tuple[str, Path, Optional[Path], Optional[Path]]] = []
+
+    def add_clip(
+        self,
+        name: str,
+        clip_path: str,
+        first_thumb: Optional[str] = None,
+        last_thumb: Optional[str] = None
+    ) -> None:
+        """
+        Add a clip to the bundle
+
+        Args:
+            name: Clip name used for lookup
+            clip_path: Path to clip file
+            first_thumb: Optional first-frame thumbnail path
+            last_thumb: Optional last-frame thumbnail path
+        """
+        if len(name.encode('utf-8')) > MAX_NAME_LENGTH:
+            raise ValueError(f"Clip name too long: {name}")
+        if any(existing == name for existing, _, _, _ in self.clips):
+            raise ValueError(f"Duplicate clip name: {name}")
+
+        path = Path(clip_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Clip file not found: {clip_path}")
+
+        self.clips.append((
+            name,
+            path,
+            Path(first_thumb) if first_thumb else None,
+            Path(last_thumb) if last_thumb else None
+        ))
+
+    def write(self, output_path: str) -> List[BundleEntry]:
+        """
+        Write the bundle file
+
+        Args:
+            output_path: Bundle file path
+
+        Returns:
+            List of index entries written
+        """
+        index_size = INDEX_ENTRY.size * len(self.clips)
+        payload_offset = _align(HEADER_SIZE + index_size, self.page_size)
+        entries: List[BundleEntry] = []
+
+        with open(output_path, 'wb') as f:
+            f.seek(payload_offset)
+
+            for name, clip_path, first_thumb, last_thumb in self.clips:
+                offset, length, digest = self._append_file(f, clip_path)
+                first = self._append_thumb(f, first_thumb)
+                last = self._append_thumb(f, last_thumb)
+                entries.append(BundleEntry(name, offset, length, digest, first, last))
+
+            f.truncate(_align(f.tell(), self.page_size))
+
+            f.seek(0)
+            header = HEADER.pack(
+                BUNDLE_MAGIC,
+                BUNDLE_VERSION,
+                0,
+                self.page_size,
+                len(entries),
+                HEADER_SIZE,
+                payload_offset
+            )
+            f.write(header.ljust(HEADER_SIZE, b"\0"))
+            f.write(b"".join(entry.pack() for entry in entries))
+
+        return entries
+
+    def _append_file(self, f, path: Path) -> Tuple[int, int, str]:
+        """Copy a file to the next page boundary, returning (offset, length, sha256)"""
+        offset = _align(f.tell(), self.page_size)
+        f.seek(offset)
+
+        digest = hashlib.sha256()
+        length = 0
+        with open(path, 'rb') as src:
+            while True:
+                chunk = src.read(_COPY_CHUNK)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                f.write(chunk)
+                length += len(chunk)
+
+        return offset, length, digest.hexdigest()
+
+    def _append_thumb(self, f, path: Optional[Path]) -> Tuple[int, int]:
+        """Copy an optional thumbnail, returning (offset, length)"""
+        if path is None or not path.exists():
+            return (0, 0)
+        offset, length, _ = self._append_file(f, path)
+        return (offset, length)
+
+
+class BundleReader:
+    """
+    Memory-maps an asset bundle for O(1), zero-copy clip access
+
+    Clip data is returned as memoryview slices of the mapping, so opening a
+    clip never copies it.
+    """
+
+    def __init__(self, bundle_path: str):
+        """
+        Open and map a bundle file
+
+        Args:
+            bundle_path: Path to bundle file
+        """
+        self.bundle_path = bundle_path
+        self._file = open(bundle_path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise BundleError(f"Empty bundle file: {bundle_path}")
+        self._view = memoryview(self._mmap)
+        self.entries: Dict[str, BundleEntry] = {}
+
+        try:
+            self._read_index()
+        except Exception:
+            self.close()
+            raise
+
+    def _read_index(self) -> None:
+        """Parse header and index into the lookup table"""
+        if len(self._mmap) < HEADER_SIZE:
+            raise BundleError("Bundle too small for header")
+
+        magic, version, _, page_size, count, index_offset, _ = HEADER.unpack_from(self._mmap, 0)
+        if magic != BUNDLE_MAGIC:
+            raise BundleError("Not an asset bundle")
+        if version != BUNDLE_VERSION:
+            raise BundleError(f"Unsupported bundle version: {version}")
+
+        size = len(self._mmap)
+        if index_offset < HEADER_SIZE or index_offset + count * INDEX_ENTRY.size > size:
+            raise BundleError("Bundle index extends past end of bundle")
+
+        self.page_size = page_size
+        for i in range(count):
+            try:
+                entry = BundleEntry.unpack_from(self._mmap, index_offset + i * INDEX_ENTRY.size)
+            except UnicodeDecodeError:
+                raise BundleError(f"Malformed clip name in index entry {i}")
+            if entry.offset + entry.length > size:
+                raise BundleError(f"Clip '{entry.name}' extends past end of bundle")
+            for offset, length in (entry.first_thumb, entry.last_thumb):
+                if length and offset + length > size:
+                    raise BundleError(f"Thumbnail of clip '{entry.name}' extends past end of bundle")
+            self.entries[entry.name] = entry
+
+    def get_entry(self, name: str) -> Optional[BundleEntry]:
+        """Get index entry for a clip"""
+        return self.entries.get(name)
+
+    def open_clip(self, name: str) -> memoryview:
+        """
+        Get clip payload without copying
+
+        Args:
+            name: Clip name
+
+        Returns:
+            Read-only memoryview over the clip bytes
+        """
+        entry = self.entries.get(name)
+        if entry is None:
+            raise KeyError(f"Clip not in bundle: {name}")
+        return self._view[entry.offset:entry.offset + entry.length]
+
+    def get_thumbnail(self, name: str, frame_position: str = "first") -> Optional[memoryview]:
+        """
+        Get first or last frame thumbnail of a clip
+
+        Args:
+            name: Clip name
+            frame_position: "first" or "last"
+
+        Returns:
+            Thumbnail bytes view, or None if the bundle has none
+        """
+        entry = self.entries.get(name)
+        if entry is None:
+            raise KeyError(f"Clip not in bundle: {name}")
+
+        offset, length = entry.first_thumb if frame_position == "first" else entry.last_thumb
+        if length == 0:
+            return None
+        return self._view[offset:offset + length]
+
+    def verify(self, name: str) -> bool:
+        """Check a clip payload against its indexed checksum"""
+        entry = self.entries[name]
+        return hashlib.sha256(self.open_clip(name)).hexdigest() == entry.sha256
+
+    def fileno(self) -> int:
+        """File descriptor of the bundle, for sendfile-style transfers"""
+        return self._file.fileno()
+
+    def close(self) -> None:
+        """
+        Release the mapping and file handle
+
+        Views returned by open_clip/get_thumbnail must be released first.
+        """
+        self._view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "BundleReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __repr__(self) -> str:
+        return f"BundleReader('{self.bundle_path}', clips={len(self.entries)})"
@@ -0,0 +1,246 @@
+"""
+Asset Manifest
+Content-hash manifest of a character's clips with delta sync support
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Any
+
+from .bundle import BundleReader
+from ..state.states import StateType, EmotionType
+
+
+# Download priority for time-to-ready: listening is the state every
+# interaction returns to, enter is played right after a device switch
+DEFAULT_CLIP_PRIORITY: List[str] = [
+    "listening",
+    "enter",
+    "default",
+    "speaking",
+    *[f"emotion_{emotion.value}" for emotion in EmotionType],
+    "default2listening",
+    "listening2default",
+    "listening2leave",
+    "default2leave",
+]
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def clips_for_state(state_type: StateType, emotion: Optional[EmotionType] = None) -> List[str]:
+    """
+    Get clip names needed to play a state
+
+    Args:
+        state_type: State type
+        emotion: Optional emotion for emotion states
+
+    Returns:
+        List of clip names (empty for states without a clip)
+    """
+    if state_type == StateType.EMOTION:
+        if emotion is not None:
+            return [f"emotion_{emotion.value}"]
+        return [f"emotion_{e.value}" for e in EmotionType]
+    if state_type == StateType.ENTERING:
+        return ["enter"]
+    if state_type == StateType.LEAVING:
+        return ["listening2leave", "default2leave"]
+    if state_type == StateType.EMPTY:
+        return []
+    return [state_type.value]
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    """Content hash and size of one clip"""
+    sha256: str
+    size: int
+
+
+@dataclass
+class ManifestDiff:
+    """
+    Result of comparing a device manifest against the current one
+
+    Attributes:
+        changed: Clips to download, in download order
+        removed: Clips the device can delete
+        unchanged: Number of clips the device already has
+        download_bytes: Total size of changed clips
+    """
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    download_bytes: int = 0
+
+    @property
+    def is_empty(self) -> bool:
+        """Whether the device is already up to date"""
+        return not self.changed and not self.removed
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert diff to dictionary"""
+        return {
+            'changed': self.changed,
+            'removed': self.removed,
+            'unchanged': self.unchanged,
+            'download_bytes': self.download_bytes
+        }
+
+
+class AssetManifest:
+    """
+    Content-hash manifest for one character's asset set
+
+    Devices keep the manifest they last synced and send it back; the diff
+    returns only clips whose content changed.
+    """
+
+    def __init__(self, character_id: str, entries: Optional[Dict[str, ManifestEntry]] = None):
+        """
+        Initialize manifest
+
+        Args:
+            character_id: Character identifier
+            entries: Mapping of clip name to manifest entry
+        """
+        self.character_id = character_id
+        self.entries: Dict[str, ManifestEntry] = dict(entries or {})
+
+    @property
+    def version(self) -> str:
+        """Hash identifying the whole asset set"""
+        digest = hashlib.sha256(self.character_id.encode('utf-8'))
+        for name in sorted(self.entries):
+            digest.update(f"\0{name}:{self.entries[name].sha256}".encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    @classmethod
+    def from_directory(cls, character_id: str, directory: str, pattern: str = "*.mp4") -> "AssetManifest":
+        """
+        Build manifest by hashing clip files in a directory
+
+        Args:
+            character_id: Character identifier
+            directory: Directory containing clips
+            pattern: Glob pattern for clip files
+
+        Returns:
+            Asset manifest keyed by file stem
+        """
+        entries = {}
+        for path in sorted(Path(directory).glob(pattern)):
+            digest = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+                    digest.update(chunk)
+            entries[path.stem] = ManifestEntry(digest.hexdigest(), path.stat().st_size)
+        return cls(character_id, entries)
+
+    @classmethod
+    def from_bundle(cls, character_id: str, bundle: BundleReader) -> "AssetManifest":
+        """
+        Build manifest from a bundle index (no hashing needed)
+
+        Args:
+            character_id: Character identifier
+            bundle: Open bundle reader
+
+        Returns:
+            Asset manifest
+        """
+        entries = {
+            name: ManifestEntry(entry.sha256, entry.length)
+            for name, entry in bundle.entries.items()
+        }
+        return cls(character_id, entries)
+
+    def diff(
+        self,
+        device_manifest: Optional["AssetManifest"],
+        preferred: Sequence[str] = ()
+    ) -> ManifestDiff:
+        """
+        Compute what a device needs to download
+
+        Args:
+            device_manifest: Manifest the device currently has (None for a fresh device)
+            preferred: Clips needed first, e.g. from clips_for_state() for the
+                device's likely next states
+
+        Returns:
+            Manifest diff with changed clips in download order
+        """
+        current = device_manifest.entries if device_manifest else {}
+        result = ManifestDiff()
+
+        changed = []
+        for name, entry in self.entries.items():
+            if current.get(name) == entry:
+                result.unchanged += 1
+            else:
+                changed.append(name)
+                result.download_bytes += entry.size
+
+        result.changed = self.download_order(changed, preferred)
+        result.removed = sorted(name for name in current if name not in self.entries)
+        return result
+
+    @staticmethod
+    def download_order(clip_names: Sequence[str], preferred: Sequence[str] = ()) -> List[str]:
+        """
+        Sort clips so the ones needed soonest come first
+
+        Args:
+            clip_names: Clips to order
+            preferred: Clips to put ahead of the default priority
+
+        Returns:
+            Ordered list of clip names
+        """
+        rank = {name: i for i, name in enumerate(DEFAULT_CLIP_PRIORITY)}
+        offset = len(DEFAULT_CLIP_PRIORITY)
+        for i, name in enumerate(preferred):
+            rank[name] = i - len(preferred)
+        return sorted(clip_names, key=lambda name: (rank.get(name, offset), name))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert manifest to dictionary"""
+        return {
+            'character_id': self.character_id,
+            'version': self.version,
+            'clips': {
+                name: {'sha256': entry.sha256, 'size': entry.size}
+                for name, entry in sorted(self.entries.items())
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AssetManifest":
+        """Create manifest from dictionary"""
+        entries = {
+            name: ManifestEntry(item['sha256'], int(item['size']))
+            for name, item in data.get('clips', {}).items()
+        }
+        return cls(data['character_id'], entries)
+
+    def save(self, file_path: str) -> None:
+        """Save manifest as JSON"""
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, file_path: str) -> "AssetManifest":
+        """Load manifest from JSON file"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __repr__(self) -> str:
+        return f"AssetManifest(character='{self.character_id}', clips={len(self.entries)}, version={self.version})"
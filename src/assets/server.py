@@ -0,0 +1,384 @@
+"""
+Asset Server
+Minimal asyncio HTTP/1.1 server for delivering clips to devices
+
+Serves either an output directory or a packed bundle, with byte ranges,
+strong content-hash ETags, conditional GETs and zero-copy sendfile.
+"""
+
+import asyncio
+import hashlib
+import os
+import stat as stat_module
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+from .bundle import BundleReader
+
+
+CONTENT_TYPES = {
+    '.mp4': 'video/mp4',
+    '.png': 'image/png',
+    '.json': 'application/json',
+    '.txt': 'text/plain; charset=utf-8',
+    '.bundle': 'application/octet-stream',
+}
+
+STATUS_TEXT = {
+    200: 'OK',
+    206: 'Partial Content',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    416: 'Range Not Satisfiable',
+    431: 'Request Header Fields Too Large',
+    500: 'Internal Server Error',
+}
+
+_HASH_CHUNK = 1024 * 1024
+
+
+@dataclass
+class _Resource:
+    """A resolved byte range of a file on disk"""
+    path: str
+    offset: int
+    length: int
+    etag: str
+    content_type: str
+
+
+def parse_range(header: str, length: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header
+
+    Args:
+        header: Range header value (e.g. "bytes=0-1023", "bytes=-500")
+        length: Total resource length
+
+    Returns:
+        Inclusive (start, end) tuple, or None if unsatisfiable
+
+    Raises:
+        ValueError: If the header is malformed or requests multiple ranges
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        raise ValueError(f"Unsupported range: {header}")
+
+    start_s, sep, end_s = spec.strip().partition('-')
+    if not sep:
+        raise ValueError(f"Malformed range: {header}")
+
+    if not start_s:
+        # Suffix range: last N bytes
+        suffix = int(end_s)
+        if suffix <= 0:
+            return None
+        return max(0, length - suffix), length - 1
+
+    start = int(start_s)
+    end = int(end_s) if end_s else length - 1
+    if start >= length or end < start:
+        return None
+    return start, min(end, length - 1)
+
+
+class AssetServer:
+    """
+    Asyncio asset server over an output directory or a packed bundle
+
+    ETags are SHA-256 content hashes: taken from the bundle index, or
+    computed once per file and cached by (mtime, size). Filesystem calls
+    run in the loop's executor, so a slow disk never stalls other
+    connections.
+    """
+
+    def __init__(self, source: str, host: str = "127.0.0.1", port: int = 8080):
+        """
+        Initialize asset server
+
+        Args:
+            source: Output directory or bundle file path
+            host: Bind address
+            port: Bind port (0 picks a free port)
+        """
+        self.source = Path(source)
+        self.host = host
+        self.port = port
+        self.bundle: Optional[BundleReader] = None
+        if self.source.is_file():
+            self.bundle = BundleReader(str(self.source))
+        elif not self.source.is_dir():
+            raise FileNotFoundError(f"Asset source not found: {source}")
+
+        self.root = self.source.resolve()
+        self._etag_cache: Dict[str, Tuple[int, int, str]] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.stats = {'requests': 0, 'bytes_sent': 0, 'not_modified': 0, 'partial': 0}
+
+    async def start(self) -> Tuple[str, int]:
+        """
+        Start listening
+
+        Returns:
+            Bound (host, port)
+        """
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        sock = self._server.sockets[0]
+        self.host, self.port = sock.getsockname()[:2]
+        return self.host, self.port
+
+    async def serve_forever(self) -> None:
+        """Start (if needed) and serve until cancelled"""
+        if self._server is None:
+            await self.start()
+        print(f"[AssetServer] Serving {self.source} on http://{self.host}:{self.port}")
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop accepting connections and release the bundle"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self.bundle is not None:
+            self.bundle.close()
+            self.bundle = None
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one keep-alive connection"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._send_status(writer, 431, keep_alive=False)
+                    break
+
+                try:
+                    keep_alive = await self._handle_request(head, writer)
+                except (ConnectionError, asyncio.CancelledError):
+                    raise
+                except Exception as e:
+                    # Failures before the response head is written end here
+                    print(f"[AssetServer] Error handling request: {e}")
+                    await self._send_status(writer, 500, keep_alive=False)
+                    break
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _handle_request(self, head: bytes, writer: asyncio.StreamWriter) -> bool:
+        """
+        Handle one request
+
+        Returns:
+            Whether the connection should be kept open
+        """
+        self.stats['requests'] += 1
+        lines = head.decode('latin-1').split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            await self._send_status(writer, 400, keep_alive=False)
+            return False
+
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                key, _, value = line.partition(':')
+                headers[key.strip().lower()] = value.strip()
+
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+        if method not in ('GET', 'HEAD'):
+            await self._send_status(writer, 405, keep_alive, {'Allow': 'GET, HEAD'})
+            return keep_alive
+
+        resource = await self._resolve(unquote(urlsplit(target).path))
+        if resource is None:
+            await self._send_status(writer, 404, keep_alive)
+            return keep_alive
+
+        base_headers = {
+            'ETag': resource.etag,
+            'Accept-Ranges': 'bytes',
+            'Cache-Control': 'no-cache',
+        }
+
+        # Conditional GET
+        if_none_match = headers.get('if-none-match')
+        if if_none_match and (if_none_match.strip() == '*' or
+                              resource.etag in [tag.strip() for tag in if_none_match.split(',')]):
+            self.stats['not_modified'] += 1
+            await self._send_status(writer, 304, keep_alive, base_headers)
+            return keep_alive
+
+        status = 200
+        offset, length = resource.offset, resource.length
+        range_header = headers.get('range')
+        if range_header and headers.get('if-range', resource.etag) == resource.etag:
+            try:
+                byte_range = parse_range(range_header, resource.length)
+            except ValueError:
+                byte_range = (0, resource.length - 1)  # Unsupported ranges: serve full body
+            if byte_range is None:
+                base_headers['Content-Range'] = f"bytes */{resource.length}"
+                await self._send_status(writer, 416, keep_alive, base_headers)
+                return keep_alive
+
+            start, end = byte_range
+            if (start, end) != (0, resource.length - 1):
+                status = 206
+                self.stats['partial'] += 1
+                base_headers['Content-Range'] = f"bytes {start}-{end}/{resource.length}"
+            offset, length = resource.offset + start, end - start + 1
+
+        # Open before the head goes out, so a vanished file still gets a 500
+        body = open(resource.path, 'rb') if method == 'GET' and length > 0 else None
+        try:
+            base_headers['Content-Type'] = resource.content_type
+            base_headers['Content-Length'] = str(length)
+            writer.write(self._format_head(status, keep_alive, base_headers))
+            await writer.drain()
+
+            if body is not None:
+                try:
+                    # Zero-copy via os.sendfile where the transport supports it
+                    sent = await asyncio.get_running_loop().sendfile(
+                        writer.transport, body, offset, length
+                    )
+                except OSError as e:
+                    # The response has started; all that is left is dropping the connection
+                    raise ConnectionError(f"Failed sending {resource.path}: {e}") from e
+                self.stats['bytes_sent'] += sent
+        finally:
+            if body is not None:
+                body.close()
+
+        return keep_alive
+
+    async def _resolve(self, url_path: str) -> Optional[_Resource]:
+        """Map a request path to a file byte range"""
+        name = url_path.lstrip('/')
+        if not name:
+            return None
+
+        if self.bundle is not None:
+            clip_name = name[:-4] if name.endswith('.mp4') else name
+            entry = self.bundle.get_entry(clip_name)
+            if entry is None:
+                return None
+            return _Resource(str(self.root), entry.offset, entry.length, f'"{entry.sha256}"', 'video/mp4')
+
+        found = await asyncio.get_running_loop().run_in_executor(None, _stat_file, self.root, name)
+        if found is None:
+            return None
+
+        path, stat = found
+        etag = await self._get_file_etag(path, stat)
+        content_type = CONTENT_TYPES.get(path.suffix, 'application/octet-stream')
+        return _Resource(str(path), 0, stat.st_size, etag, content_type)
+
+    async def _get_file_etag(self, path: Path, stat: os.stat_result) -> str:
+        """Get strong ETag for a file, hashing it off the event loop when stale"""
+        key = str(path)
+        cached = self._etag_cache.get(key)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        digest = await asyncio.get_running_loop().run_in_executor(None, _hash_file, key)
+        etag = f'"{digest}"'
+        self._etag_cache[key] = (stat.st_mtime_ns, stat.st_size, etag)
+        return etag
+
+    async def _send_status(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        keep_alive: bool,
+        headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Send a body-less response"""
+        headers = dict(headers or {})
+        if status != 304:
+            headers['Content-Length'] = '0'
+        writer.write(self._format_head(status, keep_alive, headers))
+        await writer.drain()
+
+    @staticmethod
+    def _format_head(status: int, keep_alive: bool, headers: Dict[str, str]) -> bytes:
+        """Build status line and headers"""
+        lines = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}"]
+        lines += [f"{key}: {value}" for key, value in headers.items()]
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1')
+
+    def __repr__(self) -> str:
+        kind = "bundle" if self.bundle is not None else "directory"
+        return f"AssetServer({kind}='{self.source}', port={self.port})"
+
+
+def _stat_file(root: Path, name: str) -> Optional[Tuple[Path, os.stat_result]]:
+    """Resolve a request path inside root and stat it; None unless it is a regular file"""
+    path = (root / name).resolve()
+    if root not in path.parents:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    if not stat_module.S_ISREG(stat.st_mode):
+        return None
+    return path, stat
+
+
+def _hash_file(path: str) -> str:
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def main():
+    """Serve an output directory or bundle"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve character clips to devices")
+    parser.add_argument(
+        "source",
+        nargs="?",
+        default="output/videos",
+        help="Output directory or bundle file to serve"
+    )
+    parser.add_argument("--host", default="0.0.0.0", help="Bind address")
+    parser.add_argument("--port", type=int, default=8080, help="Bind port")
+
+    args = parser.parse_args()
+
+    server = AssetServer(args.source, host=args.host, port=args.port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -2,5 +2,6 @@
 
 from .character import Character
 from .profile import CharacterProfile
+from .store import ProfileStore, get_profile_store
 
-__all__ = ["Character", "CharacterProfile"]
+__all__ = ["Character", "CharacterProfile", "ProfileStore", "get_profile_store"]
@@ -5,7 +5,7 @@ Main character entity that manages profile, state, and behavior
 
 from typing import Optional, Dict, Any
 from .profile import CharacterProfile
-from ..state.states import CharacterState, StateType
+from ..state.states import CharacterState, StateType, get_character_state
 
 
 class Character:
@@ -37,7 +37,7 @@ class Character:
         self.current_device: Optional[str] = None
 
         # Initialize with default state
-        self._set_state(CharacterState(initial_state))
+        self._set_state(get_character_state(initial_state))
 
     def _set_state(self, new_state: CharacterState) -> None:
         """
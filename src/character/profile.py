@@ -4,10 +4,30 @@ Handles loading and managing character configuration data
 """
 
 import json
+from collections.abc import Mapping
+from types import MappingProxyType
 from typing import Dict, Any, Optional
 from pathlib import Path
 
 
+def _freeze(value: Any) -> Any:
+    """Read-only copy of parsed JSON: dicts become mapping proxies, lists tuples"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Plain mutable copy of frozen data"""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
 class CharacterProfile:
     """Manages character profile information including appearance and personality"""
 
@@ -20,10 +40,26 @@ class CharacterProfile:
         """
         self.config_path = config_path
         self.data: Dict[str, Any] = {}
+        # Bumped on every change, so derived caches (e.g. prompt tables) can revalidate
+        self.revision = 0
+        self.frozen = False
 
         if config_path:
             self.load_from_file(config_path)
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        if self.__dict__.get('frozen'):
+            raise TypeError(f"Cannot set {name} on a frozen character profile")
+        object.__setattr__(self, name, value)
+        if name == 'data':
+            # Replacing data is a change too; revision may not exist yet in __init__
+            object.__setattr__(self, 'revision', self.__dict__.get('revision', 0) + 1)
+
+    def __delattr__(self, name: str) -> None:
+        if self.__dict__.get('frozen'):
+            raise TypeError(f"Cannot delete {name} from a frozen character profile")
+        object.__delattr__(self, name)
+
     def load_from_file(self, file_path: str) -> None:
         """
         Load character configuration from JSON file
@@ -31,6 +67,9 @@ class CharacterProfile:
         Args:
             file_path: Path to configuration file
         """
+        if self.frozen:
+            raise TypeError("Cannot reload a frozen character profile")
+
         path = Path(file_path)
         if not path.exists():
             raise FileNotFoundError(f"Character config file not found: {file_path}")
@@ -38,6 +77,27 @@ class CharacterProfile:
         with open(path, 'r', encoding='utf-8') as f:
             self.data = json.load(f)
 
+    def mark_changed(self) -> None:
+        """Record an in-place edit of data, invalidating derived caches"""
+        if self.frozen:
+            raise TypeError("Cannot change a frozen character profile")
+        self.revision += 1
+
+    def freeze(self) -> "CharacterProfile":
+        """
+        Make the profile read-only so it can be shared
+
+        Nested dicts become read-only mappings and lists become tuples,
+        and the profile's attributes can no longer be reassigned.
+
+        Returns:
+            This profile
+        """
+        if not self.frozen:
+            self.data = _freeze(self.data)
+            self.frozen = True
+        return self
+
     def get_character_info(self) -> Dict[str, Any]:
         """Get basic character information"""
         return self.data.get('character', {})
@@ -92,8 +152,8 @@ class CharacterProfile:
         return ". ".join(filter(None, prompt_parts))
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert profile to dictionary"""
-        return self.data
+        """Convert profile to dictionary (a mutable copy if the profile is frozen)"""
+        return _thaw(self.data) if self.frozen else self.data
 
     def __repr__(self) -> str:
         return f"CharacterProfile(nickname='{self.nickname}')"
@@ -0,0 +1,194 @@
+"""
+Profile Store
+Process-wide, lazily loaded and LRU-cached character profiles
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .profile import CharacterProfile
+
+
+class _CachedProfile:
+    """Cached profile with the stat signature it was loaded from"""
+
+    __slots__ = ("profile", "signature", "checked_at")
+
+    def __init__(self, profile: CharacterProfile, signature: Tuple[int, int], checked_at: float):
+        self.profile = profile
+        self.signature = signature
+        self.checked_at = checked_at
+
+
+class ProfileStore:
+    """
+    Resolves character ids to shared, read-only CharacterProfile objects
+
+    A profile is parsed the first time it is asked for and kept in a
+    bounded LRU cache, so every consumer in the process gets the same
+    frozen object. A cached profile is revalidated at most once per
+    check_interval by mtime and size; an edited file is parsed into a new
+    profile object, leaving the old one untouched for whoever still holds
+    it.
+
+    Character ids resolve to explicitly registered paths first, then to
+    <root>/<character_id>.json.
+    """
+
+    def __init__(self, root: str = "config/characters", capacity: int = 1024, check_interval: float = 1.0):
+        """
+        Initialize store
+
+        Args:
+            root: Directory of <character_id>.json profiles
+            capacity: Maximum number of parsed profiles kept
+            check_interval: Minimum seconds between revalidations of a profile (0 checks on every get)
+        """
+        if capacity <= 0:
+            raise ValueError("Profile store capacity must be positive")
+
+        self.root = Path(root)
+        self.capacity = capacity
+        self.check_interval = check_interval
+        self.paths: Dict[str, str] = {}
+        self._cache: "OrderedDict[str, _CachedProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.evictions = 0
+
+    def register(self, character_id: str, file_path: str) -> None:
+        """
+        Map a character id to a profile file outside the root
+
+        Args:
+            character_id: Character id
+            file_path: Path to the character's config JSON
+        """
+        self.paths[character_id] = file_path
+
+    def resolve(self, character_id: str) -> str:
+        """
+        Get the profile file of a character
+
+        Args:
+            character_id: Character id
+
+        Returns:
+            Path to the character's config JSON
+        """
+        path = self.paths.get(character_id)
+        if path is not None:
+            return path
+        if not character_id or "/" in character_id or "\\" in character_id or character_id.startswith("."):
+            raise ValueError(f"Invalid character id: {character_id!r}")
+        return str(self.root / f"{character_id}.json")
+
+    def get(self, character_id: str) -> CharacterProfile:
+        """
+        Get a character's profile
+
+        Args:
+            character_id: Character id
+
+        Returns:
+            Shared frozen profile
+        """
+        return self.load(self.resolve(character_id))
+
+    def load(self, file_path: str) -> CharacterProfile:
+        """
+        Get the profile stored in a file
+
+        Args:
+            file_path: Path to a character config JSON
+
+        Returns:
+            Shared frozen profile
+        """
+        key = os.path.abspath(file_path)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                if now - entry.checked_at < self.check_interval:
+                    self.hits += 1
+                    return entry.profile
+
+        # Stat and parse outside the lock; a concurrent load of the same file
+        # at worst parses it twice
+        try:
+            stat = os.stat(key)
+        except FileNotFoundError:
+            with self._lock:
+                self._cache.pop(key, None)
+            raise FileNotFoundError(f"Character config file not found: {file_path}")
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        if entry is not None and entry.signature == signature:
+            with self._lock:
+                entry.checked_at = now
+                self.hits += 1
+            return entry.profile
+
+        profile = CharacterProfile(key).freeze()
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.reloads += 1
+            self._cache[key] = _CachedProfile(profile, signature, now)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.capacity:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+        return profile
+
+    def invalidate(self, character_id: Optional[str] = None) -> None:
+        """
+        Drop cached profiles
+
+        Args:
+            character_id: Character to drop (all if None)
+        """
+        with self._lock:
+            if character_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(os.path.abspath(self.resolve(character_id)), None)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache statistics"""
+        with self._lock:
+            return {
+                'cached': len(self._cache),
+                'capacity': self.capacity,
+                'hits': self.hits,
+                'misses': self.misses,
+                'reloads': self.reloads,
+                'evictions': self.evictions,
+            }
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __repr__(self) -> str:
+        return f"ProfileStore('{self.root}', {len(self._cache)}/{self.capacity} cached)"
+
+
+_default_store: Optional[ProfileStore] = None
+
+
+def get_profile_store() -> ProfileStore:
+    """Get the process-wide profile store"""
+    global _default_store
+    if _default_store is None:
+        _default_store = ProfileStore()
+    return _default_store
@@ -0,0 +1,18 @@
+"""Emotion detection module for triggering emotion states from user input"""
+
+from .detector import EmotionDetector, KeywordAutomaton, KeywordMatch
+from .streaming import EmotionStream, StreamUpdate
+from .scoring import EmotionScorer
+from .reload import ReloadingDetector, RuleVersion
+
+__all__ = ["EmotionDetector", "KeywordAutomaton", "KeywordMatch", "EmotionStream", "StreamUpdate",
+           "EmotionScorer", "BatchReport", "classify_logs", "ReloadingDetector", "RuleVersion"]
+
+
+def __getattr__(name):
+    # Batch classification is imported on first use, so that running
+    # `python -m src.emotion.batch` does not find the module already imported
+    if name in ("BatchReport", "classify_logs"):
+        from . import batch
+        return getattr(batch, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
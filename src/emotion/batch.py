@@ -0,0 +1,299 @@
+"""
+Batch Emotion Classification
+Runs the emotion rules over archived conversation logs (JSONL or CSV)
+"""
+
+import csv
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import combinations, islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .detector import EmotionDetector
+
+
+@dataclass
+class BatchReport:
+    """
+    Aggregated classification results
+
+    Attributes:
+        messages: Messages classified
+        matched: Messages with at least one keyword hit
+        skipped: Input records without usable text (malformed, wrong role)
+        emotion_counts: Messages classified as each emotion
+        hit_counts: Keyword hits per emotion
+        keyword_hits: Hits per keyword
+        cooccurrence: Messages hitting both emotions of a pair (sorted by name)
+    """
+    messages: int = 0
+    matched: int = 0
+    skipped: int = 0
+    emotion_counts: Dict[str, int] = field(default_factory=dict)
+    hit_counts: Dict[str, int] = field(default_factory=dict)
+    keyword_hits: Dict[str, int] = field(default_factory=dict)
+    cooccurrence: Dict[Tuple[str, str], int] = field(default_factory=dict)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of messages with at least one keyword hit"""
+        return self.matched / self.messages if self.messages else 0.0
+
+    def merge(self, other: "BatchReport") -> None:
+        """
+        Add another report's counts into this one
+
+        Args:
+            other: Report of a different chunk
+        """
+        self.messages += other.messages
+        self.matched += other.matched
+        self.skipped += other.skipped
+        for target, source in (
+            (self.emotion_counts, other.emotion_counts),
+            (self.hit_counts, other.hit_counts),
+            (self.keyword_hits, other.keyword_hits),
+            (self.cooccurrence, other.cooccurrence),
+        ):
+            for key, count in source.items():
+                target[key] = target.get(key, 0) + count
+
+    def to_dict(self, detector: Optional[EmotionDetector] = None) -> Dict[str, Any]:
+        """
+        Convert to a JSON-serializable report
+
+        Args:
+            detector: Rules that were applied; adds keywords that never hit
+
+        Returns:
+            Report dictionary
+        """
+        messages = self.messages or 1
+        report = {
+            'messages': self.messages,
+            'matched': self.matched,
+            'skipped': self.skipped,
+            'hit_rate': self.hit_rate,
+            'emotions': {
+                name: {
+                    'messages': self.emotion_counts.get(name, 0),
+                    'share': self.emotion_counts.get(name, 0) / messages,
+                    'hits': self.hit_counts.get(name, 0),
+                }
+                for name in sorted(set(self.emotion_counts) | set(self.hit_counts))
+            },
+            'cooccurrence': {
+                f"{first}+{second}": count
+                for (first, second), count in sorted(self.cooccurrence.items(), key=lambda item: -item[1])
+            },
+            'keywords': dict(sorted(self.keyword_hits.items(), key=lambda item: -item[1])),
+        }
+        if detector is not None:
+            report['unused_keywords'] = sorted(set(detector.automaton.keywords) - set(self.keyword_hits))
+        return report
+
+
+def read_messages(path: str, text_field: str = "text", role: Optional[str] = None) -> Iterator[Optional[str]]:
+    """
+    Stream message texts from a JSONL or CSV log
+
+    Args:
+        path: Log file (.csv is read as CSV, anything else as JSONL)
+        text_field: Field holding the message text
+        role: Only keep records whose "role" field equals this
+
+    Yields:
+        Message text, or None for a record that was skipped
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if Path(path).suffix.lower() == '.csv':
+            records: Iterable[Any] = csv.DictReader(f)
+        else:
+            records = (_parse_json(line) for line in f if line.strip())
+
+        for record in records:
+            if not isinstance(record, dict) or (role is not None and record.get('role') != role):
+                yield None
+                continue
+            text = record.get(text_field)
+            yield text if isinstance(text, str) else None
+
+
+def _parse_json(line: str) -> Any:
+    """Parse one JSONL line, None if malformed"""
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError:
+        return None
+
+
+def classify_chunk(detector: EmotionDetector, texts: List[Optional[str]]) -> BatchReport:
+    """
+    Classify a chunk of messages
+
+    Args:
+        detector: Compiled rules
+        texts: Message texts (None for skipped records)
+
+    Returns:
+        Report of the chunk
+    """
+    automaton = detector.automaton
+    emotions = [emotion.value for emotion in detector.keyword_emotions]
+
+    report = BatchReport()
+    keyword_counts = [0] * len(automaton.keywords)
+    for text in texts:
+        if text is None:
+            report.skipped += 1
+            continue
+        report.messages += 1
+
+        text = text.lower()
+        _, hits = automaton.scan(text)
+        if not hits:
+            continue
+        spans = detector.resolve_spans(text, hits)
+        if not spans:
+            continue
+        report.matched += 1
+
+        keyword_ids = [keyword_id for _, _, keyword_id in spans]
+        for keyword_id in keyword_ids:
+            keyword_counts[keyword_id] += 1
+            emotion = emotions[keyword_id]
+            report.hit_counts[emotion] = report.hit_counts.get(emotion, 0) + 1
+
+        # Same scoring and tie-break as detect()
+        scores = detector.score_hits(keyword_ids)
+        winner = detector.pick(scores).value
+        report.emotion_counts[winner] = report.emotion_counts.get(winner, 0) + 1
+        if len(scores) > 1:
+            for pair in combinations(sorted(emotion.value for emotion in scores), 2):
+                report.cooccurrence[pair] = report.cooccurrence.get(pair, 0) + 1
+
+    report.keyword_hits = {
+        automaton.keywords[keyword_id]: count
+        for keyword_id, count in enumerate(keyword_counts) if count
+    }
+    return report
+
+
+# Detector of a pool worker process, compiled once by _init_worker
+_worker_detector: Optional[EmotionDetector] = None
+
+
+def _init_worker(config: Dict[str, Any]) -> None:
+    """Compile the rules once per worker process"""
+    global _worker_detector
+    _worker_detector = EmotionDetector(config)
+
+
+def _classify_in_worker(texts: List[Optional[str]]) -> BatchReport:
+    """Classify a chunk with the worker's detector"""
+    return classify_chunk(_worker_detector, texts)
+
+
+def _chunks(texts: Iterator[Optional[str]], size: int) -> Iterator[List[Optional[str]]]:
+    """Split a stream into lists of at most size items"""
+    while True:
+        chunk = list(islice(texts, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def classify_logs(
+    paths: List[str],
+    config: Dict[str, Any],
+    text_field: str = "text",
+    role: Optional[str] = None,
+    chunk_size: int = 10_000,
+    workers: Optional[int] = None
+) -> BatchReport:
+    """
+    Classify every message of a set of conversation logs
+
+    Logs are read in chunks of chunk_size messages, and at most two chunks
+    per worker are in flight, so memory stays bounded however large the
+    input is. Workers compile the rules once and return only counts.
+
+    Args:
+        paths: JSONL/CSV log files
+        config: Emotion keywords dictionary (see config/emotion_keywords.json)
+        text_field: Field holding the message text
+        role: Only classify records whose "role" field equals this
+        chunk_size: Messages per chunk
+        workers: Worker processes (defaults to CPU count; 0 runs in this process)
+
+    Returns:
+        Aggregated report
+    """
+    messages = (text for path in paths for text in read_messages(path, text_field, role))
+    chunks = _chunks(messages, chunk_size)
+    report = BatchReport()
+
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers <= 0:
+        detector = EmotionDetector(config)
+        for chunk in chunks:
+            report.merge(classify_chunk(detector, chunk))
+        return report
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config,)) as pool:
+        pending = set()
+        for chunk in chunks:
+            pending.add(pool.submit(_classify_in_worker, chunk))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    report.merge(future.result())
+        for future in pending:
+            report.merge(future.result())
+    return report
+
+
+def main():
+    """Classify conversation logs and write a JSON report"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run emotion rules over conversation logs")
+    parser.add_argument("logs", nargs="+", help="JSONL or CSV log files")
+    parser.add_argument(
+        "--rules",
+        default="config/emotion_keywords.json",
+        help="Path to emotion keywords JSON"
+    )
+    parser.add_argument("--text-field", default="text", help="Field holding the message text")
+    parser.add_argument("--role", help="Only classify messages with this role (e.g. user)")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="Messages per chunk")
+    parser.add_argument("--workers", type=int, help="Worker processes (0 = no pool)")
+    parser.add_argument("--output", help="Report file (defaults to stdout)")
+
+    args = parser.parse_args()
+
+    with open(args.rules, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    report = classify_logs(
+        args.logs, config,
+        text_field=args.text_field,
+        role=args.role,
+        chunk_size=args.chunk_size,
+        workers=args.workers
+    )
+    output = json.dumps(report.to_dict(EmotionDetector(config)), ensure_ascii=False, indent=2)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"Report written to: {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
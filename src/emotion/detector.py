@@ -0,0 +1,324 @@
+"""
+Emotion Detector
+Keyword-based emotion detection compiled into one Aho-Corasick automaton
+"""
+
+import json
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..state.states import EmotionType
+
+
+@dataclass(frozen=True)
+class KeywordMatch:
+    """
+    One keyword found in a text
+
+    Attributes:
+        keyword: Matched keyword (as written in the rules, lowercased)
+        emotion: Emotion the keyword triggers
+        start: Start offset in the text
+        end: End offset in the text (exclusive)
+        weight: Weight of the emotion
+    """
+    keyword: str
+    emotion: EmotionType
+    start: int
+    end: int
+    weight: float
+
+
+def _is_word_char(ch: str) -> bool:
+    """ASCII letters and digits form words; CJK text has no word boundaries"""
+    return ch.isascii() and ch.isalnum()
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a set of keywords
+
+    Every keyword is found in a single left-to-right pass over the text,
+    whatever the number of keywords. Matching is on characters, so Chinese
+    needs no tokenization. Keywords starting or ending with an ASCII
+    letter/digit only match on word boundaries ("easy" does not match
+    "uneasy").
+    """
+
+    def __init__(self, keywords: List[str]):
+        """
+        Build automaton
+
+        Args:
+            keywords: Lowercase keywords; keyword ids are list positions
+        """
+        self.keywords = keywords
+        self.lengths = [len(keyword) for keyword in keywords]
+        self.bounded_start = [_is_word_char(keyword[0]) for keyword in keywords]
+        self.bounded_end = [_is_word_char(keyword[-1]) for keyword in keywords]
+
+        # Trie
+        self.goto: List[Dict[str, int]] = [{}]
+        self.depth: List[int] = [0]
+        outputs: List[List[int]] = [[]]
+        for keyword_id, keyword in enumerate(keywords):
+            node = 0
+            for ch in keyword:
+                next_node = self.goto[node].get(ch)
+                if next_node is None:
+                    next_node = len(self.goto)
+                    self.goto[node][ch] = next_node
+                    self.goto.append({})
+                    self.depth.append(self.depth[node] + 1)
+                    outputs.append([])
+                node = next_node
+            outputs[node].append(keyword_id)
+
+        # Failure links (BFS), merging outputs of the failure chain. Each
+        # node's step table also inherits the non-root transitions of its
+        # failure node, so scanning needs no failure-chain loop: a character
+        # missing from the table restarts from the root.
+        self.fail = [0] * len(self.goto)
+        self.step: List[Dict[str, int]] = [{} for _ in self.goto]
+        # Length of the longest text suffix that may still grow into a keyword
+        self.open_depth: List[int] = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            fail = self.fail[node]
+            self.step[node] = {**self.step[fail], **self.goto[node]} if fail else dict(self.goto[node])
+            self.open_depth[node] = self.depth[node] if self.goto[node] else self.open_depth[fail]
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                fallback = fail
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(ch, 0) if node else 0
+                outputs[child].extend(outputs[self.fail[child]])
+        self.step[0] = self.goto[0]
+
+        # Longest first, so contained matches are easy to drop
+        self.outputs: List[Tuple[int, ...]] = [
+            tuple(sorted(ids, key=lambda k: -self.lengths[k])) for ids in outputs
+        ]
+
+    def scan(self, text: str, node: int = 0, offset: int = 0) -> Tuple[int, List[Tuple[int, int]]]:
+        """
+        Feed text through the automaton
+
+        Args:
+            text: Lowercased text
+            node: Automaton state to start from (0 for a fresh scan)
+            offset: Position of text[0] in the whole stream
+
+        Returns:
+            Tuple of (final node, list of (end position, keyword id)) in end order;
+            word boundaries are not checked yet
+        """
+        step, root, outputs = self.step, self.goto[0], self.outputs
+        hits: List[Tuple[int, int]] = []
+        for i, ch in enumerate(text, offset + 1):
+            node = step[node].get(ch) or root.get(ch, 0)
+            if outputs[node]:
+                for keyword_id in outputs[node]:
+                    hits.append((i, keyword_id))
+        return node, hits
+
+    def on_boundary(self, text: str, start: int, end: int, keyword_id: int) -> bool:
+        """
+        Check word boundaries of a match
+
+        Args:
+            text: Text the positions refer to
+            start: Match start
+            end: Match end (exclusive)
+            keyword_id: Matched keyword
+
+        Returns:
+            True if the match is not inside a longer ASCII word
+        """
+        if self.bounded_start[keyword_id] and start > 0 and _is_word_char(text[start - 1]):
+            return False
+        if self.bounded_end[keyword_id] and end < len(text) and _is_word_char(text[end]):
+            return False
+        return True
+
+
+class EmotionDetector:
+    """
+    Detects the emotion of an utterance from emotion_keywords.json rules
+
+    All keywords of all emotions are compiled into one automaton, so an
+    utterance is scanned once in O(text length). Hits are scored by the
+    emotion's weight; a keyword contained in a longer hit (e.g. "什么" in
+    "什么意思") is ignored, and ties go to the emotion earliest in
+    priority_order.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Compile detector rules
+
+        Args:
+            config: Emotion keywords dictionary (see config/emotion_keywords.json)
+        """
+        triggers = config.get('emotion_triggers', {})
+        priority_order = config.get('priority_order', [])
+
+        self.weights: Dict[EmotionType, float] = {}
+        keywords: List[str] = []
+        self.keyword_emotions: List[EmotionType] = []
+        for name, data in triggers.items():
+            emotion = EmotionType(name)
+            self.weights[emotion] = float(data.get('weight', 1.0))
+            for keyword in data.get('keywords', []):
+                keyword = keyword.strip().lower()
+                if keyword:
+                    keywords.append(keyword)
+                    self.keyword_emotions.append(emotion)
+
+        # Lower rank wins ties; emotions missing from priority_order come last
+        self.priority: Dict[EmotionType, int] = {
+            emotion: len(priority_order) for emotion in EmotionType
+        }
+        for rank, name in enumerate(priority_order):
+            self.priority[EmotionType(name)] = rank
+
+        self.automaton = KeywordAutomaton(keywords)
+        self.keyword_weights = [self.weights[emotion] for emotion in self.keyword_emotions]
+
+    @classmethod
+    def from_file(cls, file_path: str = "config/emotion_keywords.json") -> "EmotionDetector":
+        """
+        Load detector rules from a JSON file
+
+        Args:
+            file_path: Path to emotion keywords file
+
+        Returns:
+            Compiled detector
+        """
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Emotion keywords file not found: {file_path}")
+
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def find_matches(self, text: str) -> List[KeywordMatch]:
+        """
+        Find all keyword hits in a text
+
+        Args:
+            text: Utterance
+
+        Returns:
+            KeywordMatch objects, ordered by position
+        """
+        text = text.lower()
+        _, hits = self.automaton.scan(text)
+        return [
+            KeywordMatch(
+                self.automaton.keywords[keyword_id],
+                self.keyword_emotions[keyword_id],
+                start, end,
+                self.keyword_weights[keyword_id]
+            )
+            for start, end, keyword_id in self.resolve_spans(text, hits)
+        ]
+
+    def resolve_spans(self, text: str, hits: List[Tuple[int, int]]) -> List[Tuple[int, int, int]]:
+        """
+        Turn raw automaton hits into the keyword spans that count
+
+        Applies word boundaries to English keywords and drops hits
+        contained in a longer hit.
+
+        Args:
+            text: Lowercased text the hits were found in
+            hits: (end, keyword id) pairs from KeywordAutomaton.scan
+
+        Returns:
+            (start, end, keyword id) spans, ordered by position
+        """
+        automaton = self.automaton
+        lengths = automaton.lengths
+        spans = [
+            (end - lengths[keyword_id], end, keyword_id)
+            for end, keyword_id in hits
+            if automaton.on_boundary(text, end - lengths[keyword_id], end, keyword_id)
+        ]
+        if len(spans) < 2:
+            return spans
+
+        spans.sort(key=lambda span: (span[0], -span[1]))
+        kept = []
+        covered = -1
+        for span in spans:
+            if span[1] > covered:
+                kept.append(span)
+                covered = span[1]
+        return kept
+
+    def score_hits(self, keyword_ids: List[int]) -> Dict[EmotionType, float]:
+        """
+        Sum emotion weights over keyword hits
+
+        Args:
+            keyword_ids: Ids of matched keywords
+
+        Returns:
+            Score per emotion that had at least one hit
+        """
+        scores: Dict[EmotionType, float] = {}
+        emotions, weights = self.keyword_emotions, self.keyword_weights
+        for keyword_id in keyword_ids:
+            emotion = emotions[keyword_id]
+            scores[emotion] = scores.get(emotion, 0.0) + weights[keyword_id]
+        return scores
+
+    def scores(self, text: str) -> Dict[EmotionType, float]:
+        """
+        Score every emotion with at least one hit
+
+        Args:
+            text: Utterance
+
+        Returns:
+            Dictionary of emotion -> summed weight
+        """
+        text = text.lower()
+        _, hits = self.automaton.scan(text)
+        return self.score_hits([keyword_id for _, _, keyword_id in self.resolve_spans(text, hits)])
+
+    def pick(self, scores: Dict[EmotionType, float]) -> Optional[EmotionType]:
+        """
+        Choose the winning emotion from scores
+
+        Args:
+            scores: Score per emotion
+
+        Returns:
+            Highest scoring emotion (ties by priority_order), or None if empty
+        """
+        if not scores:
+            return None
+        priority = self.priority
+        return min(scores, key=lambda emotion: (-scores[emotion], priority[emotion]))
+
+    def detect(self, text: str) -> Optional[EmotionType]:
+        """
+        Detect the emotion of an utterance
+
+        Args:
+            text: Utterance
+
+        Returns:
+            EmotionType to pass to StateMachine.transition_to, or None if no keyword matched
+        """
+        return self.pick(self.scores(text))
+
+    def __repr__(self) -> str:
+        return f"EmotionDetector({len(self.automaton.keywords)} keywords, {len(self.weights)} emotions)"
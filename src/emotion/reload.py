@@ -0,0 +1,197 @@
+"""
+Emotion Rule Reloading
+Watches emotion_keywords.json and swaps in recompiled rules without a restart
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..state.states import EmotionType
+from ..utils.validator import ConfigValidator
+from .detector import EmotionDetector, KeywordMatch
+
+
+@dataclass(frozen=True)
+class RuleVersion:
+    """
+    One compiled generation of the emotion rules
+
+    Attributes:
+        version: Generation number, starting at 1
+        detector: Compiled rules
+        digest: SHA-256 of the rules file content
+        loaded_at: Time the rules were swapped in
+    """
+    version: int
+    detector: EmotionDetector
+    digest: str
+    loaded_at: float
+
+
+class ReloadingDetector:
+    """
+    EmotionDetector that follows edits of its rules file
+
+    The current rules are one immutable RuleVersion behind a single
+    reference. A reload reads, validates and compiles the file entirely
+    on the side, then replaces the reference in one assignment. Detection
+    reads the reference once per call and takes no lock, so a detection
+    that is in flight during a swap finishes on the rules it started with.
+    Invalid edits are rejected and the previous rules stay active.
+
+    Call check() to reload on demand, or start() to poll in a background
+    thread.
+    """
+
+    def __init__(
+        self,
+        file_path: str = "config/emotion_keywords.json",
+        interval: float = 1.0,
+        on_reload: Optional[Callable[[RuleVersion], None]] = None
+    ):
+        """
+        Load the initial rules
+
+        Args:
+            file_path: Path to emotion keywords file
+            interval: Seconds between checks of the background watcher
+            on_reload: Called with each RuleVersion swapped in after the initial load
+        """
+        self.file_path = file_path
+        self.interval = interval
+        self.on_reload = on_reload
+        self.last_error: Optional[str] = None
+
+        # Serializes reloads only; detection never touches it
+        self._reload_lock = threading.Lock()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._current: Optional[RuleVersion] = None
+        if not self.check():
+            raise ValueError(f"Invalid emotion rules in {file_path}: {self.last_error}")
+
+    @property
+    def current(self) -> RuleVersion:
+        """Active rule version"""
+        return self._current
+
+    @property
+    def version(self) -> int:
+        """Generation number of the active rules"""
+        return self._current.version
+
+    @property
+    def detector(self) -> EmotionDetector:
+        """
+        Active compiled rules
+
+        Hold on to the returned detector for work that must see one
+        consistent rule set, e.g. an EmotionStream for one utterance.
+        """
+        return self._current.detector
+
+    def detect(self, text: str) -> Optional[EmotionType]:
+        """Detect the emotion of an utterance with the active rules"""
+        return self._current.detector.detect(text)
+
+    def scores(self, text: str) -> Dict[EmotionType, float]:
+        """Score every emotion with at least one hit, with the active rules"""
+        return self._current.detector.scores(text)
+
+    def find_matches(self, text: str) -> List[KeywordMatch]:
+        """Find all keyword hits in a text with the active rules"""
+        return self._current.detector.find_matches(text)
+
+    def check(self) -> bool:
+        """
+        Reload the rules if the file changed
+
+        Returns:
+            True if new rules were swapped in
+        """
+        with self._reload_lock:
+            try:
+                stat = os.stat(self.file_path)
+            except OSError as e:
+                self.last_error = str(e)
+                return False
+
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if signature == self._signature:
+                return False
+
+            try:
+                with open(self.file_path, 'rb') as f:
+                    content = f.read()
+                digest = hashlib.sha256(content).hexdigest()
+                current = self._current
+                if current is not None and digest == current.digest:
+                    # Touched but unchanged
+                    self._signature = signature
+                    return False
+
+                config = json.loads(content.decode('utf-8'))
+                is_valid, error = ConfigValidator.validate_emotion_keywords(config)
+                if not is_valid:
+                    raise ValueError(error)
+                detector = EmotionDetector(config)
+            except Exception as e:
+                # Keep the previous rules; retry once the file changes again
+                self._signature = signature
+                self.last_error = str(e)
+                return False
+
+            version = RuleVersion(
+                version=current.version + 1 if current is not None else 1,
+                detector=detector,
+                digest=digest,
+                loaded_at=time.time()
+            )
+            self._current = version
+            self._signature = signature
+            self.last_error = None
+
+        if self.on_reload is not None and current is not None:
+            try:
+                self.on_reload(version)
+            except Exception as e:
+                print(f"Error in emotion rule reload callback: {e}")
+        return True
+
+    def start(self) -> None:
+        """Start polling the rules file in a background thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="emotion-rules-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background watcher"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _watch(self) -> None:
+        """Background loop: check the file every interval"""
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def __enter__(self) -> "ReloadingDetector":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def __repr__(self) -> str:
+        return f"ReloadingDetector('{self.file_path}', version={self.version})"
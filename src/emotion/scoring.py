@@ -0,0 +1,140 @@
+"""
+Emotion Scorer
+Decayed per-emotion scores over conversation turns with hysteresis
+"""
+
+from typing import Dict, List, Optional
+
+from ..state.states import EmotionType
+from .detector import EmotionDetector, KeywordMatch
+
+
+class EmotionScorer:
+    """
+    Turns keyword hits into emotion triggers without twitching
+
+    Each emotion keeps a score that decays exponentially per turn; a turn
+    adds the weights of its hits. An emotion triggers once its score
+    reaches the threshold, and replacing the active emotion additionally
+    needs a lead of `margin` over it. The active emotion is released when
+    its score decays below `release`.
+
+    Decay is applied lazily from the turn each score was last touched, so
+    a turn costs O(matched keywords) however long the conversation is.
+    """
+
+    def __init__(
+        self,
+        detector: EmotionDetector,
+        threshold: float = 1.5,
+        release: float = 0.5,
+        half_life: float = 2.0,
+        margin: float = 0.5
+    ):
+        """
+        Initialize scorer
+
+        Args:
+            detector: Compiled detector rules (weights and priority order)
+            threshold: Score needed to trigger an emotion
+            release: Score below which the active emotion is released
+            half_life: Turns after which a score has halved
+            margin: Lead over the active emotion's score needed to switch
+        """
+        if release > threshold:
+            raise ValueError("Release level must not exceed the trigger threshold")
+        if half_life <= 0:
+            raise ValueError("Half-life must be positive")
+
+        self.detector = detector
+        self.threshold = threshold
+        self.release = release
+        self.margin = margin
+        self.decay = 0.5 ** (1.0 / half_life)
+
+        self.turn = 0
+        self.active: Optional[EmotionType] = None
+        self._scores: Dict[EmotionType, float] = {}
+        self._turns: Dict[EmotionType, int] = {}
+
+    def score(self, emotion: EmotionType) -> float:
+        """
+        Get an emotion's decayed score at the current turn
+
+        Args:
+            emotion: Emotion
+
+        Returns:
+            Current score (0.0 if never hit)
+        """
+        stored = self._scores.get(emotion)
+        if stored is None:
+            return 0.0
+        return stored * self.decay ** (self.turn - self._turns[emotion])
+
+    def scores(self) -> Dict[EmotionType, float]:
+        """Get the decayed score of every emotion that was ever hit"""
+        return {emotion: self.score(emotion) for emotion in self._scores}
+
+    def observe(self, text: str) -> Optional[EmotionType]:
+        """
+        Score one turn of user input
+
+        Args:
+            text: Utterance
+
+        Returns:
+            Emotion to transition to now, or None to stay as is
+        """
+        return self.observe_matches(self.detector.find_matches(text))
+
+    def observe_matches(self, matches: List[KeywordMatch]) -> Optional[EmotionType]:
+        """
+        Score one turn from keyword hits (e.g. from an EmotionStream)
+
+        Args:
+            matches: Hits of this turn
+
+        Returns:
+            Emotion to transition to now, or None to stay as is
+        """
+        self.turn += 1
+        turn = self.turn
+
+        gains: Dict[EmotionType, float] = {}
+        for match in matches:
+            gains[match.emotion] = gains.get(match.emotion, 0.0) + match.weight
+        for emotion, gain in gains.items():
+            self._scores[emotion] = self.score(emotion) + gain
+            self._turns[emotion] = turn
+
+        active = self.active
+        active_score = 0.0
+        if active is not None:
+            active_score = self.score(active)
+            if active_score < self.release:
+                self.active = active = None
+                active_score = 0.0
+
+        # Scores only grow through hits, so only emotions hit this turn can newly qualify
+        needed = self.threshold if active is None else max(self.threshold, active_score + self.margin)
+        candidates = {
+            emotion: self._scores[emotion]
+            for emotion in gains
+            if emotion is not active and self._scores[emotion] >= needed
+        }
+        winner = self.detector.pick(candidates)
+        if winner is not None:
+            self.active = winner
+        return winner
+
+    def reset(self) -> None:
+        """Forget all scores (e.g. at the start of a new conversation)"""
+        self.turn = 0
+        self.active = None
+        self._scores.clear()
+        self._turns.clear()
+
+    def __repr__(self) -> str:
+        active = self.active.value if self.active else None
+        return f"EmotionScorer(turn={self.turn}, active={active})"
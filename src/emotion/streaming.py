@@ -0,0 +1,227 @@
+"""
+Emotion Stream
+Incremental emotion detection over growing ASR partial transcripts
+"""
+
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from ..state.states import EmotionType
+from .detector import EmotionDetector, KeywordMatch
+
+# (start, end, keyword id)
+Span = Tuple[int, int, int]
+
+
+@dataclass
+class StreamUpdate:
+    """
+    Result of feeding or revising a stream
+
+    Attributes:
+        matches: Keyword hits confirmed by this update
+        retracted: Previously confirmed hits withdrawn because the text changed
+    """
+    matches: List[KeywordMatch] = field(default_factory=list)
+    retracted: List[KeywordMatch] = field(default_factory=list)
+
+
+class EmotionStream:
+    """
+    Streaming detection session for one utterance
+
+    Keeps the automaton state between chunks, so each character is
+    scanned once no matter how many partials arrive, and keywords split
+    across chunks are still found. A revised partial only rescans the
+    part after the longest common prefix with the previous one.
+
+    A hit is confirmed as soon as it can no longer change: once the next
+    character rules out a longer ASCII word around it, and no longer
+    keyword that would contain it is still in progress. Confirmed hits
+    that a revision removes are reported as retracted.
+    """
+
+    def __init__(self, detector: EmotionDetector):
+        """
+        Initialize stream
+
+        Args:
+            detector: Compiled detector rules
+        """
+        self.detector = detector
+        self.automaton = detector.automaton
+        self.text = ""
+        # nodes[i] is the automaton node after the first i characters
+        self.nodes = array('i', [0])
+        # Every raw hit so far, and those not yet confirmed or discarded
+        self.hits: List[Span] = []
+        self.pending: List[Span] = []
+        # Confirmed spans with the text length they were confirmed at
+        self.confirmed: List[Tuple[Span, int]] = []
+        self.finished = False
+
+    def feed(self, chunk: str) -> StreamUpdate:
+        """
+        Append newly recognized text
+
+        Args:
+            chunk: Text following what was fed so far
+
+        Returns:
+            StreamUpdate with newly confirmed hits
+        """
+        if self.finished:
+            raise RuntimeError("Cannot feed a finished emotion stream")
+
+        automaton = self.automaton
+        step, root, outputs, lengths = automaton.step, automaton.goto[0], automaton.outputs, automaton.lengths
+        chunk = chunk.lower()
+        nodes = self.nodes
+        node = nodes[-1]
+        position = len(self.text)
+
+        for ch in chunk:
+            node = step[node].get(ch) or root.get(ch, 0)
+            position += 1
+            nodes.append(node)
+            if outputs[node]:
+                for keyword_id in outputs[node]:
+                    span = (position - lengths[keyword_id], position, keyword_id)
+                    self.hits.append(span)
+                    self.pending.append(span)
+
+        self.text += chunk
+        return StreamUpdate(matches=self._settle(final=False))
+
+    def update(self, partial: str) -> StreamUpdate:
+        """
+        Replace the transcript with a new partial hypothesis
+
+        Only the text after the common prefix with the previous partial is
+        rescanned.
+
+        Args:
+            partial: Full current hypothesis of the utterance
+
+        Returns:
+            StreamUpdate with newly confirmed and retracted hits
+        """
+        lowered = partial.lower()
+        text = self.text
+        if lowered.startswith(text):
+            common = len(text)
+        else:
+            # Binary search on prefix equality, compared in C
+            low, high = 0, min(len(text), len(lowered))
+            while low < high:
+                middle = (low + high + 1) // 2
+                if text[:middle] == lowered[:middle]:
+                    low = middle
+                else:
+                    high = middle - 1
+            common = low
+
+        retracted = self.retract_to(common) if common < len(text) else []
+        result = self.feed(lowered[common:])
+        result.retracted = retracted
+        return result
+
+    def retract_to(self, length: int) -> List[KeywordMatch]:
+        """
+        Drop the tail of the transcript after a given length
+
+        Args:
+            length: Number of characters to keep
+
+        Returns:
+            Previously confirmed hits that no longer hold
+        """
+        if length >= len(self.text):
+            return []
+
+        self.text = self.text[:length]
+        del self.nodes[length + 1:]
+        self.finished = False
+
+        # A hit confirmed after this point may have relied on removed text;
+        # every surviving hit that is not confirmed gets re-evaluated
+        kept = [(span, at) for span, at in self.confirmed if at <= length]
+        retracted = [span for span, at in self.confirmed if at > length]
+        self.confirmed = kept
+        self.hits = [span for span in self.hits if span[1] <= length]
+        kept_spans = {span for span, _ in kept}
+        self.pending = [span for span in self.hits if span not in kept_spans]
+        return self._matches(retracted)
+
+    def finish(self) -> StreamUpdate:
+        """
+        Mark the utterance complete and confirm every remaining hit
+
+        Returns:
+            StreamUpdate with the hits confirmed at the end
+        """
+        self.finished = True
+        return StreamUpdate(matches=self._settle(final=True))
+
+    def _settle(self, final: bool) -> List[KeywordMatch]:
+        """Move hits that can no longer change from pending to confirmed"""
+        if not self.pending:
+            return []
+
+        automaton = self.automaton
+        text = self.text
+        length = len(text)
+        # Hits starting at or after this may still be inside a longer keyword
+        open_start = length if final else length - automaton.open_depth[self.nodes[-1]]
+
+        ready, waiting = [], []
+        for span in self.pending:
+            start, end, keyword_id = span
+            if not final and (start >= open_start or (end == length and automaton.bounded_end[keyword_id])):
+                waiting.append(span)
+            elif automaton.on_boundary(text, start, end, keyword_id):
+                ready.append(span)
+        self.pending = waiting
+        if not ready:
+            return []
+
+        # Drop hits contained in a longer confirmed or ready hit
+        ready.sort(key=lambda span: (span[0], -span[1]))
+        covering = [span for span, _ in self.confirmed if span[1] >= ready[0][0]]
+        settled = []
+        for span in ready:
+            if any(other[0] <= span[0] and span[1] <= other[1] for other in covering):
+                continue
+            covering.append(span)
+            settled.append(span)
+            self.confirmed.append((span, length))
+        return self._matches(settled)
+
+    def _matches(self, spans: List[Span]) -> List[KeywordMatch]:
+        """Convert spans to KeywordMatch objects"""
+        detector = self.detector
+        return [
+            KeywordMatch(
+                self.automaton.keywords[keyword_id],
+                detector.keyword_emotions[keyword_id],
+                start, end,
+                detector.keyword_weights[keyword_id]
+            )
+            for start, end, keyword_id in spans
+        ]
+
+    def get_matches(self) -> List[KeywordMatch]:
+        """Get all confirmed hits, ordered by position"""
+        return self._matches(sorted(span for span, _ in self.confirmed))
+
+    def scores(self) -> Dict[EmotionType, float]:
+        """Get emotion scores of the confirmed hits"""
+        return self.detector.score_hits([span[2] for span, _ in self.confirmed])
+
+    def detect(self) -> Optional[EmotionType]:
+        """Get the emotion of the confirmed hits so far"""
+        return self.detector.pick(self.scores())
+
+    def __repr__(self) -> str:
+        return f"EmotionStream({len(self.text)} chars, {len(self.confirmed)} hits)"
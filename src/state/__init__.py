@@ -1,7 +1,18 @@
 """State management module for character state machine and transitions"""
 
-from .states import CharacterState, StateType, EmotionType
+from .states import CharacterState, StateType, EmotionType, get_character_state
 from .state_machine import StateMachine
 from .transitions import TransitionManager
+from .state_array import StateMachineArray
+from .planner import TransitionPlanner, Route, RouteHop
+from .events import EventBus, OverflowPolicy
+from .timer_wheel import TimerWheel
+from .expiry import StateExpiryScheduler
+from .event_log import StateEventLog
 
-__all__ = ["CharacterState", "StateType", "EmotionType", "StateMachine", "TransitionManager"]
+__all__ = [
+    "CharacterState", "StateType", "EmotionType", "get_character_state",
+    "StateMachine", "TransitionManager", "StateMachineArray",
+    "TransitionPlanner", "Route", "RouteHop", "EventBus", "OverflowPolicy",
+    "TimerWheel", "StateExpiryScheduler", "StateEventLog"
+]
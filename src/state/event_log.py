@@ -0,0 +1,570 @@
+"""
+State Event Log
+Append-only binary log of state changes with snapshots for fast replay
+
+Layout of the log file:
+    header   LOG_HEADER (magic, version, record size)
+    records  fixed-width RECORD entries, in commit order
+
+Snapshots are written next to the log as <log>.<record index>.snap: a
+SNAPSHOT_HEADER followed by one SNAPSHOT_ENTRY per session, holding every
+session's state after the first <record index> records.
+"""
+
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .states import CharacterState, StateType, EmotionType
+from .transition_table import STATES, NO_EMOTION, state_code, emotion_code, emotion_from_code
+from ..device.device_manager import DeviceType
+
+
+LOG_MAGIC = b"GANIMLOG"
+SNAPSHOT_MAGIC = b"GANIMSNP"
+LOG_VERSION = 2
+
+# magic, version, record size
+LOG_HEADER = struct.Struct("<8sHH4x")
+
+# session id, wall-clock timestamp (ns since the epoch), from state, to state, emotion, device
+RECORD = struct.Struct("<QQBBBB4x")
+
+# magic, version, record index, session count
+SNAPSHOT_HEADER = struct.Struct("<8sHxxQQ")
+
+# session id, timestamp (ns), state, emotion, device
+SNAPSHOT_ENTRY = struct.Struct("<QQBBBx4x")
+
+# Device code 0 means "unknown device"
+NO_DEVICE = 0
+DEVICES: Tuple[DeviceType, ...] = tuple(DeviceType)
+DEVICE_CODES: Dict[str, int] = {device._value_: code + 1 for code, device in enumerate(DEVICES)}
+
+
+class EventLogError(Exception):
+    """Raised when a log or snapshot file is malformed"""
+    pass
+
+
+@dataclass(frozen=True)
+class LogRecord:
+    """
+    One decoded state change
+
+    Attributes:
+        index: Position of the record in the log
+        session_id: Session identifier
+        timestamp: Wall-clock timestamp in nanoseconds since the epoch
+        from_state: Previous state
+        to_state: New state
+        emotion: Emotion of the new state (emotion state only)
+        device: Device the change happened on, if known
+    """
+    index: int
+    session_id: int
+    timestamp: int
+    from_state: StateType
+    to_state: StateType
+    emotion: Optional[EmotionType]
+    device: Optional[DeviceType]
+
+
+@dataclass(frozen=True)
+class SessionState:
+    """
+    A session's state at some point of the log
+
+    Attributes:
+        state_type: Current state
+        emotion: Current emotion (emotion state only)
+        device: Device of the last change, if known
+        timestamp: Wall-clock timestamp (ns since the epoch) of the last change
+    """
+    state_type: StateType
+    emotion: Optional[EmotionType]
+    device: Optional[DeviceType]
+    timestamp: int
+
+
+def _device_code(device: Optional[DeviceType]) -> int:
+    return NO_DEVICE if device is None else DEVICE_CODES[device._value_]
+
+
+def _device_from_code(code: int) -> Optional[DeviceType]:
+    return None if code == NO_DEVICE else DEVICES[code - 1]
+
+
+class StateEventLog:
+    """
+    Event-sourced log of state changes for many sessions
+
+    Appends are buffered and group-committed: one write (and fsync) per
+    group instead of per change. A background flusher commits a group
+    that is still short once its oldest record has been pending for
+    commit_interval, so a lone change is durable without waiting for
+    further appends. A group is detached from the buffer under the lock
+    and written outside it, so appends never wait on an fsync. Records
+    carry wall-clock timestamps, which stay ordered across restarts.
+    Every snapshot_interval records a snapshot of all sessions is
+    written, so rebuilding a session at any point only loads the nearest earlier snapshot and replays the tail.
+    Records are fixed width, so positions are found by arithmetic and
+    points in time by binary search.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        group_size: int = 256,
+        commit_interval: float = 0.05,
+        snapshot_interval: int = 100_000,
+        fsync: bool = True
+    ):
+        """
+        Open (or create) a log, recovering session state from it
+
+        Args:
+            path: Log file path
+            group_size: Pending records that trigger a commit
+            commit_interval: Seconds a record may stay pending before it is committed
+            snapshot_interval: Records between snapshots (0 to disable)
+            fsync: fsync the log on every commit
+        """
+        self.path = Path(path)
+        self.group_size = group_size
+        self.commit_interval = commit_interval
+        self.snapshot_interval = snapshot_interval
+        self.fsync = fsync
+
+        # _lock guards the buffer and session table; _write_lock orders commits,
+        # so file I/O happens without blocking appenders
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pending = bytearray()
+        self._pending_count = 0
+        self._in_flight = 0
+        self._pending_since = 0.0
+        self._last_timestamp = 0
+
+        # Latest state per session: (timestamp, state code, emotion code, device code)
+        self.sessions: Dict[int, Tuple[int, int, int, int]] = {}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            with open(self.path, 'wb') as f:
+                f.write(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION, RECORD.size))
+
+        self._file = open(self.path, 'r+b')
+        self._check_header()
+        self._snapshots = self._find_snapshots()
+        self.committed = self._recover()
+        self._last_snapshot = self._snapshots[-1] if self._snapshots else 0
+        self._file.seek(LOG_HEADER.size + self.committed * RECORD.size)
+
+        self._flusher: Optional[threading.Thread] = None
+        if commit_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, name="event-log-flush", daemon=True)
+            self._flusher.start()
+
+    def _check_header(self) -> None:
+        """Validate the log header"""
+        header = self._file.read(LOG_HEADER.size)
+        if len(header) < LOG_HEADER.size:
+            raise EventLogError(f"Truncated log header: {self.path}")
+        magic, version, record_size = LOG_HEADER.unpack(header)
+        if magic != LOG_MAGIC:
+            raise EventLogError(f"Not a state event log: {self.path}")
+        if version != LOG_VERSION or record_size != RECORD.size:
+            raise EventLogError(f"Unsupported log version {version}")
+
+    def _recover(self) -> int:
+        """Drop a torn trailing record and rebuild session state; returns record count"""
+        size = self.path.stat().st_size - LOG_HEADER.size
+        count = size // RECORD.size
+        if size % RECORD.size:
+            self._file.truncate(LOG_HEADER.size + count * RECORD.size)
+        # Snapshots past the end of the log describe records that were lost
+        self._snapshots = [index for index in self._snapshots if index <= count]
+
+        snapshot = self._nearest_snapshot(count)
+        if snapshot:
+            self.sessions = self._load_snapshot(snapshot)
+        for session_id, timestamp, _, to_code, emotion, device in self._iter_raw(snapshot, count):
+            self.sessions[session_id] = (timestamp, to_code, emotion, device)
+            self._last_timestamp = timestamp
+        if self.sessions and not self._last_timestamp:
+            self._last_timestamp = max(entry[0] for entry in self.sessions.values())
+        return count
+
+    def append(
+        self,
+        session_id: int,
+        from_state: StateType,
+        to_state: StateType,
+        emotion: Optional[EmotionType] = None,
+        device: Optional[DeviceType] = None
+    ) -> int:
+        """
+        Append a state change
+
+        Args:
+            session_id: Session identifier (unsigned 64-bit integer)
+            from_state: Previous state
+            to_state: New state
+            emotion: Emotion if the new state is the emotion state
+            device: Device the change happened on
+
+        Returns:
+            Index of the record in the log
+        """
+        return self.append_codes(
+            session_id, state_code(from_state), state_code(to_state),
+            emotion_code(emotion), _device_code(device)
+        )
+
+    def record(
+        self,
+        session_id: int,
+        previous: CharacterState,
+        state: CharacterState,
+        device: Optional[DeviceType] = None
+    ) -> int:
+        """
+        Append a state change given as CharacterStates
+
+        Args:
+            session_id: Session identifier
+            previous: State before the change
+            state: State after the change
+            device: Device the change happened on
+
+        Returns:
+            Index of the record in the log
+        """
+        return self.append(session_id, previous.state_type, state.state_type, state.emotion, device)
+
+    def append_codes(
+        self,
+        session_id: int,
+        from_code: int,
+        to_code: int,
+        emotion: int = NO_EMOTION,
+        device: int = NO_DEVICE
+    ) -> int:
+        """
+        Append a state change given as integer codes (see transition_table)
+
+        Returns:
+            Index of the record in the log
+        """
+        with self._lock:
+            # Wall-clock time survives restarts; the clamp keeps timestamps from
+            # going backwards when the clock is stepped, so time lookups stay a
+            # binary search
+            timestamp = max(time.time_ns(), self._last_timestamp)
+            self._last_timestamp = timestamp
+
+            self._pending += RECORD.pack(session_id, timestamp, from_code, to_code, emotion, device)
+            if not self._pending_count:
+                self._pending_since = time.monotonic()
+                self._wakeup.notify()
+            self._pending_count += 1
+            self.sessions[session_id] = (timestamp, to_code, emotion, device)
+            index = self.committed + self._in_flight + self._pending_count - 1
+
+            due = (self._pending_count >= self.group_size
+                   or time.monotonic() - self._pending_since >= self.commit_interval)
+        if due:
+            self.commit()
+        return index
+
+    def commit(self) -> None:
+        """Write all pending records now"""
+        with self._write_lock:
+            with self._lock:
+                if self._file.closed:
+                    return
+                group = self._take_group()
+            self._write_group(*group)
+
+    def _flush_loop(self) -> None:
+        """Commit pending records once the oldest has waited commit_interval"""
+        while True:
+            with self._lock:
+                if self._file.closed:
+                    return
+                if not self._pending_count:
+                    self._wakeup.wait()
+                    continue
+                remaining = self._pending_since + self.commit_interval - time.monotonic()
+                if remaining > 0:
+                    self._wakeup.wait(remaining)
+                    continue
+            try:
+                self.commit()
+            except OSError as e:
+                # The records went back to pending; retry after another interval
+                print(f"Error committing state event log: {e}")
+                with self._lock:
+                    self._wakeup.wait(self.commit_interval)
+
+    def _take_group(self) -> Tuple[bytes, int, Optional[Dict[int, Tuple[int, int, int, int]]]]:
+        """
+        Detach the pending records for writing (lock held)
+
+        Returns:
+            Tuple of (record bytes, record count, session copy to snapshot or None)
+        """
+        data, count = bytes(self._pending), self._pending_count
+        self._pending.clear()
+        self._pending_count = 0
+        self._in_flight = count
+
+        # The session table already reflects exactly these records, so a
+        # snapshot due at the end of the group is copied now
+        sessions = None
+        if self.snapshot_interval and self.committed + count - self._last_snapshot >= self.snapshot_interval:
+            sessions = dict(self.sessions)
+        return data, count, sessions
+
+    def _write_group(
+        self,
+        data: bytes,
+        count: int,
+        sessions: Optional[Dict[int, Tuple[int, int, int, int]]]
+    ) -> None:
+        """Write a detached group and its snapshot (write lock held, lock not held)"""
+        if count:
+            try:
+                # Overwrite anything a failed earlier write left behind
+                self._file.seek(LOG_HEADER.size + self.committed * RECORD.size)
+                self._file.write(data)
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+            except OSError:
+                with self._lock:
+                    self._pending[:0] = data
+                    self._pending_count += count
+                    self._in_flight = 0
+                raise
+
+        with self._lock:
+            self.committed += count
+            self._in_flight = 0
+        if sessions is not None:
+            self._write_snapshot(self.committed, sessions)
+
+    def snapshot(self) -> Path:
+        """
+        Commit pending records and snapshot every session
+
+        Returns:
+            Snapshot file path
+        """
+        with self._write_lock:
+            with self._lock:
+                data, count, sessions = self._take_group()
+                if sessions is None and self._last_snapshot != self.committed + count:
+                    sessions = dict(self.sessions)
+            self._write_group(data, count, sessions)
+            return self._snapshot_path(self.committed)
+
+    def _write_snapshot(self, index: int, sessions: Dict[int, Tuple[int, int, int, int]]) -> None:
+        """Write a snapshot of sessions as of a record index (write lock held)"""
+        path = self._snapshot_path(index)
+        temp_path = path.with_name(f".{path.name}.tmp")
+
+        data = bytearray(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, LOG_VERSION, index, len(sessions)))
+        pack = SNAPSHOT_ENTRY.pack
+        for session_id, (timestamp, state, emotion, device) in sessions.items():
+            data += pack(session_id, timestamp, state, emotion, device)
+
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+        self._snapshots.append(index)
+        self._last_snapshot = index
+
+    def _snapshot_path(self, index: int) -> Path:
+        return self.path.with_name(f"{self.path.name}.{index:012d}.snap")
+
+    def _find_snapshots(self) -> List[int]:
+        """Record indexes of existing snapshots, ascending"""
+        prefix = f"{self.path.name}."
+        indexes = []
+        for path in self.path.parent.glob(f"{self.path.name}.*.snap"):
+            number = path.name[len(prefix):-len(".snap")]
+            if number.isdigit():
+                indexes.append(int(number))
+        return sorted(indexes)
+
+    def _nearest_snapshot(self, index: int) -> int:
+        """Latest snapshot at or before a record index (0 for none)"""
+        best = 0
+        for snapshot in self._snapshots:
+            if snapshot <= index:
+                best = snapshot
+        return best
+
+    def _load_snapshot(self, index: int) -> Dict[int, Tuple[int, int, int, int]]:
+        """Read a snapshot into a session dict"""
+        data = self._snapshot_path(index).read_bytes()
+        magic, version, snapshot_index, count = SNAPSHOT_HEADER.unpack_from(data, 0)
+        if magic != SNAPSHOT_MAGIC or snapshot_index != index:
+            raise EventLogError(f"Malformed snapshot: {self._snapshot_path(index)}")
+
+        sessions = {}
+        for session_id, timestamp, state, emotion, device in SNAPSHOT_ENTRY.iter_unpack(
+            memoryview(data)[SNAPSHOT_HEADER.size:SNAPSHOT_HEADER.size + count * SNAPSHOT_ENTRY.size]
+        ):
+            sessions[session_id] = (timestamp, state, emotion, device)
+        return sessions
+
+    def _iter_raw(self, start: int, stop: int, chunk: int = 4096) -> Iterator[Tuple[int, ...]]:
+        """Raw record tuples in [start, stop), read in chunks"""
+        with open(self.path, 'rb') as f:
+            position = start
+            while position < stop:
+                count = min(chunk, stop - position)
+                f.seek(LOG_HEADER.size + position * RECORD.size)
+                data = f.read(count * RECORD.size)
+                count = len(data) // RECORD.size
+                if not count:
+                    return
+                yield from RECORD.iter_unpack(data[:count * RECORD.size])
+                position += count
+
+    def read_records(self, start: int = 0, stop: Optional[int] = None) -> Iterator[LogRecord]:
+        """
+        Iterate committed records
+
+        Args:
+            start: First record index
+            stop: Record index to stop before (defaults to the end)
+
+        Yields:
+            LogRecord objects in log order
+        """
+        stop = self.committed if stop is None else min(stop, self.committed)
+        for offset, raw in enumerate(self._iter_raw(start, stop)):
+            session_id, timestamp, from_code, to_code, emotion, device = raw
+            yield LogRecord(
+                start + offset, session_id, timestamp, STATES[from_code], STATES[to_code],
+                emotion_from_code(emotion), _device_from_code(device)
+            )
+
+    def history(self, session_id: int, start: int = 0, stop: Optional[int] = None) -> List[LogRecord]:
+        """
+        Get one session's committed changes
+
+        Args:
+            session_id: Session identifier
+            start: First record index to scan
+            stop: Record index to stop before
+
+        Returns:
+            LogRecord objects for the session, oldest first
+        """
+        return [record for record in self.read_records(start, stop) if record.session_id == session_id]
+
+    def position_at(self, timestamp: int) -> int:
+        """
+        Get the number of committed records with timestamp <= a given time
+
+        Args:
+            timestamp: Wall-clock timestamp in nanoseconds since the epoch
+
+        Returns:
+            Record index just past the last record at or before the time
+        """
+        low, high = 0, self.committed
+        with open(self.path, 'rb') as f:
+            while low < high:
+                middle = (low + high) // 2
+                f.seek(LOG_HEADER.size + middle * RECORD.size + 8)
+                (record_time,) = struct.unpack("<Q", f.read(8))
+                if record_time <= timestamp:
+                    low = middle + 1
+                else:
+                    high = middle
+        return low
+
+    def rebuild(
+        self,
+        session_id: int,
+        position: Optional[int] = None,
+        timestamp: Optional[int] = None
+    ) -> Optional[SessionState]:
+        """
+        Rebuild a session's state at a point of the log
+
+        Loads the nearest snapshot at or before the point and replays only
+        the records after it.
+
+        Args:
+            session_id: Session identifier
+            position: Number of records to apply (defaults to all committed)
+            timestamp: Rebuild as of this wall-clock time (ns since the epoch) instead of a position
+
+        Returns:
+            SessionState, or None if the session had no changes by then
+        """
+        if timestamp is not None:
+            position = self.position_at(timestamp)
+        position = self.committed if position is None else min(position, self.committed)
+
+        snapshot = self._nearest_snapshot(position)
+        entry = self._load_snapshot(snapshot).get(session_id) if snapshot else None
+
+        for raw in self._iter_raw(snapshot, position):
+            if raw[0] == session_id:
+                entry = (raw[1], raw[3], raw[4], raw[5])
+
+        if entry is None:
+            return None
+        record_time, state, emotion, device = entry
+        return SessionState(STATES[state], emotion_from_code(emotion), _device_from_code(device), record_time)
+
+    def get_session(self, session_id: int) -> Optional[SessionState]:
+        """Get a session's latest state, including pending records"""
+        entry = self.sessions.get(session_id)
+        if entry is None:
+            return None
+        record_time, state, emotion, device = entry
+        return SessionState(STATES[state], emotion_from_code(emotion), _device_from_code(device), record_time)
+
+    def close(self) -> None:
+        """Commit pending records, stop the flusher and close the log"""
+        with self._write_lock:
+            with self._lock:
+                if self._file.closed:
+                    return
+                group = self._take_group()
+            self._write_group(*group)
+            with self._lock:
+                self._file.close()
+                self._wakeup.notify_all()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join()
+
+    def __enter__(self) -> "StateEventLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.committed + self._in_flight + self._pending_count
+
+    def __repr__(self) -> str:
+        return f"StateEventLog({self.path.name}, {len(self)} records, {len(self.sessions)} sessions)"
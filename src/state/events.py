@@ -0,0 +1,325 @@
+"""
+Event Bus
+Asynchronous state callback dispatch on a thread pool
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+
+class OverflowPolicy(Enum):
+    """What to do when a subscriber's queue is full"""
+    DROP_OLDEST = "drop_oldest"    # Discard the oldest queued event
+    DROP_NEWEST = "drop_newest"    # Discard the event being published
+    BLOCK = "block"                # Publisher waits for space (backpressure)
+
+
+class Subscription:
+    """
+    One callback with its own bounded queue and latency metrics
+
+    Events for a subscription are delivered in publish order, one at a
+    time, so a callback never runs concurrently with itself.
+    """
+
+    def __init__(
+        self,
+        topic: Hashable,
+        callback: Callable[[Any], None],
+        max_queue: int = 100,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        timeout: Optional[float] = None
+    ):
+        """
+        Initialize subscription
+
+        Args:
+            topic: Topic the callback listens to
+            callback: Callback called with each event payload
+            max_queue: Maximum number of pending events
+            policy: Overflow policy when the queue is full
+            timeout: Seconds an event may wait before it is skipped as stale;
+                     calls running longer are counted as timeouts
+        """
+        if max_queue <= 0:
+            raise ValueError("Subscription queue size must be positive")
+
+        self.topic = topic
+        self.callback = callback
+        self.name = getattr(callback, '__qualname__', repr(callback))
+        if max_queue < 1:
+            raise ValueError("Subscription queue size must be positive")
+
+        self.max_queue = max_queue
+        self.policy = policy
+        self.timeout = timeout
+
+        self.queue: Deque[Tuple[Any, float]] = deque()
+        self.condition = threading.Condition()
+        self.scheduled = False
+
+        self.delivered = 0
+        self.dropped = 0
+        self.expired = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.total_wait = 0.0
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get delivery counters and latencies (seconds)"""
+        with self.condition:
+            delivered = self.delivered
+            return {
+                'topic': getattr(self.topic, 'value', self.topic),
+                'callback': self.name,
+                'pending': len(self.queue),
+                'delivered': delivered,
+                'dropped': self.dropped,
+                'expired': self.expired,
+                'errors': self.errors,
+                'timeouts': self.timeouts,
+                'avg_latency': self.total_latency / delivered if delivered else 0.0,
+                'max_latency': self.max_latency,
+                'avg_queue_wait': self.total_wait / delivered if delivered else 0.0
+            }
+
+    def __repr__(self) -> str:
+        return f"Subscription({self.name}, pending={len(self.queue)})"
+
+
+class EventBus:
+    """
+    Publish/subscribe bus that runs callbacks off the publishing thread
+
+    publish() only appends to each subscriber's bounded queue and, if the
+    subscriber is idle, schedules a drain on the thread pool. Publishing
+    cost is therefore independent of how slow subscribers are, a failing
+    subscriber only affects its own queue, and a slow one holds at most one
+    pool worker at a time.
+
+    A running callback cannot be interrupted: the timeout only skips events
+    that waited too long and counts overrunning calls. Subscribers that
+    hang keep their workers, so max_workers of them hung at once stall
+    delivery to every other subscription.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_queue: int = 100,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        timeout: Optional[float] = None
+    ):
+        """
+        Initialize event bus
+
+        Args:
+            max_workers: Thread pool size (an upper bound on concurrently running callbacks)
+            max_queue: Default per-subscriber queue size (at least 1)
+            policy: Default overflow policy
+            timeout: Default per-callback timeout in seconds (None for no limit)
+        """
+        if max_queue < 1:
+            raise ValueError("Subscription queue size must be positive")
+
+        self.max_queue = max_queue
+        self.policy = policy
+        self.timeout = timeout
+        self.subscriptions: Dict[Hashable, List[Subscription]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="event-bus")
+        self._idle = threading.Condition()
+        self._active = 0
+        self._closed = False
+
+    def subscribe(
+        self,
+        topic: Hashable,
+        callback: Callable[[Any], None],
+        max_queue: Optional[int] = None,
+        policy: Optional[OverflowPolicy] = None,
+        timeout: Optional[float] = None
+    ) -> Subscription:
+        """
+        Subscribe a callback to a topic
+
+        Args:
+            topic: Topic to listen to (e.g. a StateType)
+            callback: Callback called with each event payload
+            max_queue: Queue size, at least 1 (defaults to the bus setting)
+            policy: Overflow policy (defaults to the bus setting)
+            timeout: Callback timeout (defaults to the bus setting)
+
+        Returns:
+            Subscription, usable with unsubscribe() and for metrics
+        """
+        subscription = Subscription(
+            topic,
+            callback,
+            self.max_queue if max_queue is None else max_queue,
+            policy or self.policy,
+            self.timeout if timeout is None else timeout
+        )
+        # Copy on write so publish() can iterate without a lock
+        self.subscriptions[topic] = self.subscriptions.get(topic, []) + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscription; queued events for it are discarded"""
+        remaining = [s for s in self.subscriptions.get(subscription.topic, []) if s is not subscription]
+        if remaining:
+            self.subscriptions[subscription.topic] = remaining
+        else:
+            self.subscriptions.pop(subscription.topic, None)
+        with subscription.condition:
+            subscription.queue.clear()
+            subscription.condition.notify_all()
+
+    def publish(self, topic: Hashable, payload: Any) -> int:
+        """
+        Queue an event for every subscriber of a topic
+
+        Args:
+            topic: Event topic
+            payload: Value passed to the callbacks
+
+        Returns:
+            Number of subscribers the event was queued for
+        """
+        subscriptions = self.subscriptions.get(topic)
+        if not subscriptions or self._closed:
+            return 0
+
+        now = time.monotonic()
+        queued = 0
+        for subscription in subscriptions:
+            if self._enqueue(subscription, payload, now):
+                queued += 1
+        return queued
+
+    def _enqueue(self, subscription: Subscription, payload: Any, now: float) -> bool:
+        """Add an event to a subscription queue, applying its overflow policy"""
+        with subscription.condition:
+            queue = subscription.queue
+            if len(queue) >= subscription.max_queue:
+                if subscription.policy is OverflowPolicy.DROP_NEWEST:
+                    subscription.dropped += 1
+                    return False
+                if subscription.policy is OverflowPolicy.DROP_OLDEST:
+                    queue.popleft()
+                    subscription.dropped += 1
+                else:
+                    while len(queue) >= subscription.max_queue and not self._closed:
+                        subscription.condition.wait()
+
+            queue.append((payload, now))
+            if subscription.scheduled:
+                return True
+            subscription.scheduled = True
+
+        with self._idle:
+            self._active += 1
+        try:
+            self._executor.submit(self._drain, subscription)
+        except BaseException:
+            # Undo the scheduling so flush() does not wait for a drain that
+            # never runs and a later publish can schedule one
+            with subscription.condition:
+                subscription.scheduled = False
+            with self._idle:
+                self._active -= 1
+                self._idle.notify_all()
+            if self._closed:
+                return False
+            raise
+        return True
+
+    def _drain(self, subscription: Subscription) -> None:
+        """Deliver queued events to one subscriber until its queue is empty"""
+        try:
+            while True:
+                with subscription.condition:
+                    if not subscription.queue:
+                        subscription.scheduled = False
+                        return
+                    payload, published_at = subscription.queue.popleft()
+                    subscription.condition.notify()
+
+                started = time.monotonic()
+                wait = started - published_at
+                if subscription.timeout is not None and wait > subscription.timeout:
+                    with subscription.condition:
+                        subscription.expired += 1
+                    continue
+
+                error = False
+                try:
+                    subscription.callback(payload)
+                except Exception as e:
+                    error = True
+                    print(f"Error in state callback {subscription.name}: {e}")
+                latency = time.monotonic() - started
+
+                with subscription.condition:
+                    subscription.delivered += 1
+                    subscription.errors += error
+                    subscription.total_latency += latency
+                    subscription.total_wait += wait
+                    if latency > subscription.max_latency:
+                        subscription.max_latency = latency
+                    if subscription.timeout is not None and latency > subscription.timeout:
+                        subscription.timeouts += 1
+        finally:
+            with self._idle:
+                self._active -= 1
+                self._idle.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued event has been delivered
+
+        Args:
+            timeout: Maximum seconds to wait (None to wait indefinitely)
+
+        Returns:
+            True if all queues drained in time
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._active == 0, timeout)
+
+    def get_metrics(self) -> List[Dict[str, Any]]:
+        """Get metrics for every subscription"""
+        return [
+            subscription.get_metrics()
+            for subscriptions in list(self.subscriptions.values())
+            for subscription in subscriptions
+        ]
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Stop accepting events and shut down the thread pool
+
+        Args:
+            wait: Deliver already queued events before returning
+        """
+        self._closed = True
+        for subscriptions in list(self.subscriptions.values()):
+            for subscription in subscriptions:
+                with subscription.condition:
+                    subscription.condition.notify_all()
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> "EventBus":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        count = sum(len(s) for s in self.subscriptions.values())
+        return f"EventBus({count} subscriptions)"
@@ -0,0 +1,141 @@
+"""
+State Expiry
+Automatically ends timed states when their clip finishes, for many sessions
+"""
+
+import time
+from typing import Dict, Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, only needed for this module
+    np = None
+
+from .states import StateType, get_state_config
+from .transition_table import STATES, EMOTIONS, state_code
+from .state_array import StateMachineArray, TRANSITION_OK
+from .timer_wheel import TimerWheel
+
+
+# Non-looping states and the state each one returns to when its clip ends
+EXPIRY_TARGETS: Dict[StateType, StateType] = {
+    StateType.EMOTION: StateType.LISTENING,
+    StateType.SPEAKING: StateType.LISTENING,
+    StateType.ENTERING: StateType.LISTENING,
+    StateType.LEAVING: StateType.EMPTY,
+}
+
+
+def _compile_durations():
+    """Clip duration for every (state code, emotion code) pair"""
+    durations = np.zeros((len(STATES), len(EMOTIONS) + 1), dtype=np.float64)
+    for code, state in enumerate(STATES):
+        durations[code, :] = get_state_config(state).get('duration', 0.0)
+    emotion = state_code(StateType.EMOTION)
+    for code, emotion_type in enumerate(EMOTIONS, start=1):
+        durations[emotion, code] = get_state_config(StateType.EMOTION, emotion_type).get('duration', 5.0)
+    return durations
+
+
+class StateExpiryScheduler:
+    """
+    Returns sessions of a StateMachineArray to their resting state on clip end
+
+    Entering a timed state (see EXPIRY_TARGETS) schedules one timer per
+    session on a hierarchical timer wheel; advance() fires everything due
+    as a single batch transition. A timer whose session has moved on by
+    the time it fires is discarded, so manual transitions never race with
+    expiry.
+    """
+
+    def __init__(self, array: StateMachineArray, tick: float = 0.1, start: Optional[float] = None):
+        """
+        Initialize scheduler and hook it into the array's callbacks
+
+        Args:
+            array: Sessions to manage
+            tick: Timer resolution in seconds
+            start: Start time of the wheel (defaults to now)
+        """
+        if np is None:
+            raise ImportError("StateExpiryScheduler requires numpy (pip install numpy)")
+
+        self.array = array
+        self.wheel = TimerWheel(tick=tick, start=start)
+        self.durations = _compile_durations()
+        self.targets = np.arange(len(STATES), dtype=np.uint8)
+        self.timed = np.zeros(len(STATES), dtype=bool)
+        for state, target in EXPIRY_TARGETS.items():
+            self.targets[state_code(state)] = state_code(target)
+            self.timed[state_code(state)] = True
+        self.expired = 0
+
+        for state in EXPIRY_TARGETS:
+            array.register_callback(state, self._on_enter)
+
+    def _on_enter(self, session_ids, emotion_codes) -> None:
+        """Schedule expiry for sessions that just entered a timed state"""
+        # Callbacks run after the whole batch, so a session may already have
+        # left the state it entered; schedule by the state it is in now
+        states = self.array.states[session_ids]
+        timed = self.timed[states]
+        session_ids, states = session_ids[timed], states[timed]
+        if not len(session_ids):
+            return
+        entered = self.array.entered_at[session_ids]
+        deadlines = entered + self.durations[states, self.array.emotions[session_ids]]
+
+        self.wheel.schedule_many(
+            session_ids.tolist(), deadlines.tolist(), list(zip(states.tolist(), entered.tolist()))
+        )
+
+    def cancel(self, session_id: int) -> bool:
+        """
+        Cancel a session's pending expiry
+
+        Args:
+            session_id: Session id
+
+        Returns:
+            True if an expiry was pending
+        """
+        return self.wheel.cancel(session_id)
+
+    def advance(self, now: Optional[float] = None):
+        """
+        Fire every expiry due by now as one batch transition
+
+        Args:
+            now: Current time (defaults to now)
+
+        Returns:
+            Array of session ids that were transitioned
+        """
+        now = time.time() if now is None else now
+        fired = self.wheel.advance(now)
+        if not fired:
+            return np.empty(0, dtype=np.int64)
+
+        session_ids = np.fromiter((sid for sid, _ in fired), dtype=np.int64, count=len(fired))
+        expected = np.fromiter((payload[0] for _, payload in fired), dtype=np.uint8, count=len(fired))
+        entered = np.fromiter((payload[1] for _, payload in fired), dtype=np.float64, count=len(fired))
+
+        # Skip sessions that left the timed state (or re-entered it) since scheduling
+        current = (session_ids < self.array.size)
+        current[current] &= (
+            (self.array.states[session_ids[current]] == expected[current])
+            & (self.array.entered_at[session_ids[current]] == entered[current])
+        )
+        session_ids = session_ids[current]
+
+        results = self.array.apply_transitions(session_ids, self.targets[expected[current]], now=now)
+        session_ids = session_ids[results == TRANSITION_OK]
+        self.expired += len(session_ids)
+        return session_ids
+
+    def pending(self) -> int:
+        """Get number of scheduled expiries"""
+        return len(self.wheel)
+
+    def __repr__(self) -> str:
+        return f"StateExpiryScheduler({len(self.wheel)} pending, {self.expired} expired)"
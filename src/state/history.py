@@ -0,0 +1,169 @@
+"""
+State History
+Fixed-capacity ring buffer of compact state records
+"""
+
+import time
+from array import array
+from typing import Iterator, List, Optional, Tuple
+from .states import CharacterState, StateType, EmotionType, LOOPING_STATES, get_character_state
+from .transition_table import STATE_CODES, EMOTION_CODES, NO_EMOTION, STATES, EMOTIONS
+
+
+class StateHistory:
+    """
+    Bounded state history stored as (state code, emotion code, timestamp) records
+
+    Records live in preallocated typed arrays, so memory use is fixed by the
+    capacity no matter how long a session runs; once full, the oldest record
+    is overwritten. Reading history returns the shared interned states.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """
+        Initialize state history
+
+        Args:
+            capacity: Maximum number of records kept
+        """
+        if capacity <= 0:
+            raise ValueError("History capacity must be positive")
+
+        self.capacity = capacity
+        self._states = array('B', bytes(capacity))
+        self._emotions = array('B', bytes(capacity))
+        self._timestamps = array('d', bytes(8 * capacity))
+        self._next = 0
+        self._count = 0
+
+    def append(self, state: CharacterState, timestamp: Optional[float] = None) -> None:
+        """
+        Record a state
+
+        Args:
+            state: State entered
+            timestamp: Entry time (defaults to now)
+        """
+        emotion = state.emotion
+        self.append_codes(
+            STATE_CODES[state.state_type._value_],
+            NO_EMOTION if emotion is None else EMOTION_CODES[emotion._value_],
+            time.time() if timestamp is None else timestamp
+        )
+
+    def append_codes(self, state_code: int, emotion_code: int, timestamp: float) -> None:
+        """
+        Record a state by its integer codes
+
+        Args:
+            state_code: State code (see transition_table)
+            emotion_code: Emotion code, NO_EMOTION for none
+            timestamp: Entry time
+        """
+        i = self._next
+        self._states[i] = state_code
+        self._emotions[i] = emotion_code
+        self._timestamps[i] = timestamp
+
+        self._next = i + 1 if i + 1 < self.capacity else 0
+        if self._count < self.capacity:
+            self._count += 1
+
+    def extend_codes(self, state_codes: List[int], emotion_codes: List[int], timestamp: float) -> None:
+        """
+        Record several states at once, all with the same entry time
+
+        Args:
+            state_codes: State codes in order
+            emotion_codes: Matching emotion codes
+            timestamp: Entry time
+        """
+        n = len(state_codes)
+        if n > self.capacity:
+            # Only the newest records fit
+            state_codes, emotion_codes = state_codes[-self.capacity:], emotion_codes[-self.capacity:]
+            n = self.capacity
+
+        start = self._next
+        first = min(n, self.capacity - start)
+        rest = n - first
+        self._states[start:start + first] = array('B', state_codes[:first])
+        self._emotions[start:start + first] = array('B', emotion_codes[:first])
+        self._timestamps[start:start + first] = array('d', [timestamp]) * first
+        if rest:
+            self._states[:rest] = array('B', state_codes[first:])
+            self._emotions[:rest] = array('B', emotion_codes[first:])
+            self._timestamps[:rest] = array('d', [timestamp]) * rest
+
+        self._next = (start + n) % self.capacity
+        self._count = min(self._count + n, self.capacity)
+
+    def get_recent(self, limit: int = 10) -> List[CharacterState]:
+        """
+        Get most recent states, oldest first
+
+        Like slicing a list with [-limit:], a limit of 0 returns the whole
+        history.
+
+        Args:
+            limit: Maximum number of states to return
+
+        Returns:
+            List of CharacterState objects
+        """
+        return [self._materialize(i) for i in self._indices(limit)]
+
+    def get_records(self, limit: int = 10) -> List[Tuple[StateType, Optional[EmotionType], float]]:
+        """
+        Get most recent records with timestamps, oldest first
+
+        Args:
+            limit: Maximum number of records to return
+
+        Returns:
+            List of (state_type, emotion, timestamp) tuples
+        """
+        return [
+            (STATES[self._states[i]], self._decode_emotion(self._emotions[i]), self._timestamps[i])
+            for i in self._indices(limit)
+        ]
+
+    def clear(self) -> None:
+        """Drop all records (storage is kept)"""
+        self._next = 0
+        self._count = 0
+
+    def _indices(self, limit: int) -> List[int]:
+        """Buffer positions of records[-limit:], oldest first"""
+        start = self._next - self._count
+        return [(start + k) % self.capacity for k in range(self._count)[-limit:]]
+
+    def _materialize(self, i: int) -> CharacterState:
+        """Build a CharacterState from the record at buffer position i"""
+        state_type = STATES[self._states[i]]
+        return get_character_state(
+            state_type,
+            self._decode_emotion(self._emotions[i]),
+            state_type in LOOPING_STATES
+        )
+
+    @staticmethod
+    def _decode_emotion(code: int) -> Optional[EmotionType]:
+        return None if code == NO_EMOTION else EMOTIONS[code - 1]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[CharacterState]:
+        for i in self._indices(self._count):
+            yield self._materialize(i)
+
+    def __getitem__(self, index: int) -> CharacterState:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("history index out of range")
+        return self._materialize((self._next - self._count + index) % self.capacity)
+
+    def __repr__(self) -> str:
+        return f"StateHistory({self._count}/{self.capacity})"
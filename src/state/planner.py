@@ -0,0 +1,178 @@
+"""
+Transition Planner
+Precomputed shortest routes between any two states, with the clips each hop plays
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from .states import StateType, EmotionType, get_state_config
+from .transition_table import VALID_TRANSITIONS
+from .transitions import TransitionManager
+
+
+# A node of the planning graph: emotion is only set for the emotion state
+Node = Tuple[StateType, Optional[EmotionType]]
+
+
+@dataclass(frozen=True)
+class RouteHop:
+    """
+    One transition along a route
+
+    Attributes:
+        from_state: Source state
+        to_state: Target state
+        emotion: Emotion of the target state (emotion state only)
+        clip: Clip played for this hop (None for a direct cut)
+        duration: Clip duration in seconds
+    """
+    from_state: StateType
+    to_state: StateType
+    emotion: Optional[EmotionType]
+    clip: Optional[str]
+    duration: float
+
+
+@dataclass(frozen=True)
+class Route:
+    """
+    Shortest sequence of transitions between two states
+
+    Attributes:
+        hops: Transitions in order
+        clips: Clips to queue, in playback order
+        duration: Total playback duration in seconds
+    """
+    hops: Tuple[RouteHop, ...]
+    clips: Tuple[str, ...]
+    duration: float
+
+    def __len__(self) -> int:
+        return len(self.hops)
+
+
+def _hop_clip(
+    transition_manager: TransitionManager,
+    from_state: StateType,
+    to_state: StateType,
+    emotion: Optional[EmotionType]
+) -> Tuple[Optional[str], float]:
+    """Clip and duration played when taking one transition"""
+    transition = transition_manager.get_transition(from_state, to_state, emotion)
+    if transition is not None:
+        return transition.video_name, transition.duration
+
+    if to_state == StateType.EMOTION:
+        return f"emotion_{emotion.value}", get_state_config(to_state, emotion).get('duration', 5.0)
+    if to_state in (StateType.EMPTY, StateType.LEAVING):
+        return None, 0.0
+    if to_state == StateType.ENTERING:
+        return "enter", get_state_config(to_state).get('duration', 5.0)
+    return to_state.value, get_state_config(to_state).get('duration', 5.0)
+
+
+class TransitionPlanner:
+    """
+    All-pairs shortest routes over the state graph
+
+    Routes are computed once with a BFS from every node, so plan() is a
+    single dict lookup. Each emotion is its own node, which lets routes
+    end in (or leave) a specific emotion clip.
+    """
+
+    def __init__(self, transition_manager: Optional[TransitionManager] = None):
+        """
+        Initialize planner and precompute all routes
+
+        Args:
+            transition_manager: Source of transition clips (defaults to a new TransitionManager)
+        """
+        self.transition_manager = transition_manager or TransitionManager()
+        self.nodes: List[Node] = [
+            (state, None) for state in StateType if state != StateType.EMOTION
+        ] + [(StateType.EMOTION, emotion) for emotion in EmotionType]
+        self.routes: Dict[Tuple[Node, Node], Route] = {}
+        self._precompute()
+
+    def _neighbors(self, node: Node) -> List[Tuple[Node, RouteHop]]:
+        """Outgoing edges of a node"""
+        state, _ = node
+        edges = []
+        for target in VALID_TRANSITIONS.get(state, ()):
+            emotions = list(EmotionType) if target == StateType.EMOTION else [None]
+            for emotion in emotions:
+                clip, duration = _hop_clip(self.transition_manager, state, target, emotion)
+                edges.append(((target, emotion), RouteHop(state, target, emotion, clip, duration)))
+        return edges
+
+    def _precompute(self) -> None:
+        """BFS from every node, storing the route to each reachable node"""
+        adjacency = {node: self._neighbors(node) for node in self.nodes}
+
+        for source in self.nodes:
+            parents: Dict[Node, Tuple[Node, RouteHop]] = {}
+            seen = {source}
+            queue = deque([source])
+            while queue:
+                node = queue.popleft()
+                for neighbor, hop in adjacency[node]:
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        parents[neighbor] = (node, hop)
+                        queue.append(neighbor)
+
+            self.routes[(source, source)] = Route((), (), 0.0)
+            for target in parents:
+                hops = []
+                node = target
+                while node != source:
+                    node, hop = parents[node]
+                    hops.append(hop)
+                hops.reverse()
+                self.routes[(source, target)] = Route(
+                    hops=tuple(hops),
+                    clips=tuple(hop.clip for hop in hops if hop.clip),
+                    duration=sum(hop.duration for hop in hops)
+                )
+
+    def plan(
+        self,
+        from_state: StateType,
+        to_state: StateType,
+        emotion: Optional[EmotionType] = None,
+        from_emotion: Optional[EmotionType] = None
+    ) -> Optional[Route]:
+        """
+        Get the shortest route between two states
+
+        Args:
+            from_state: Current state
+            to_state: Target state
+            emotion: Target emotion (emotion state; defaults to NEUTRAL)
+            from_emotion: Current emotion (emotion state; defaults to NEUTRAL)
+
+        Returns:
+            Route, or None if the target is unreachable
+        """
+        return self.routes.get((self._node(from_state, from_emotion), self._node(to_state, emotion)))
+
+    @staticmethod
+    def _node(state: StateType, emotion: Optional[EmotionType]) -> Node:
+        if state == StateType.EMOTION:
+            return (state, emotion or EmotionType.NEUTRAL)
+        return (state, None)
+
+    def __repr__(self) -> str:
+        return f"TransitionPlanner({len(self.nodes)} nodes, {len(self.routes)} routes)"
+
+
+_default_planner: Optional[TransitionPlanner] = None
+
+
+def get_default_planner() -> TransitionPlanner:
+    """Get the shared planner for the default transition graph"""
+    global _default_planner
+    if _default_planner is None:
+        _default_planner = TransitionPlanner()
+    return _default_planner
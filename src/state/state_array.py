@@ -0,0 +1,260 @@
+"""
+State Machine Array
+Vectorized state engine holding many sessions in NumPy arrays
+"""
+
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, only needed for this module
+    np = None
+
+from .states import CharacterState, StateType, EmotionType, LOOPING_STATES, get_character_state
+from .transition_table import (
+    STATES, EMOTIONS, TRANSITION_MASKS, EMOTION_STATE_CODE, NO_EMOTION,
+    state_code, emotion_code, emotion_from_code
+)
+
+
+# Per-request result codes returned by apply_transitions
+TRANSITION_OK = 0
+INVALID_TRANSITION = 1
+EMOTION_REQUIRED = 2
+UNKNOWN_SESSION = 3
+UNKNOWN_STATE = 4
+
+
+def _compile_valid_matrix():
+    """Expand the shared transition bitmasks into a boolean lookup matrix"""
+    n = len(STATES)
+    matrix = np.zeros((n, n), dtype=bool)
+    for from_code, mask in enumerate(TRANSITION_MASKS):
+        for to_code in range(n):
+            matrix[from_code, to_code] = bool((mask >> to_code) & 1)
+    return matrix
+
+
+class StateMachineArray:
+    """
+    State machines for N sessions stored column-wise
+
+    Each session costs 10 bytes (state code, emotion code, entry timestamp)
+    instead of a StateMachine object. Batches of transition requests are
+    validated against the compiled transition table and applied in one
+    vectorized step. Session ids are indices 0..size-1.
+    """
+
+    def __init__(self, size: int):
+        """
+        Initialize array with all sessions in the empty state
+
+        Args:
+            size: Number of sessions
+        """
+        if np is None:
+            raise ImportError("StateMachineArray requires numpy (pip install numpy)")
+
+        self.size = size
+        self.states = np.full(size, state_code(StateType.EMPTY), dtype=np.uint8)
+        self.emotions = np.zeros(size, dtype=np.uint8)
+        self.entered_at = np.zeros(size, dtype=np.float64)
+        self.valid = _compile_valid_matrix()
+        self.state_callbacks: Dict[int, List[Callable]] = {}
+
+    def resize(self, size: int) -> None:
+        """
+        Grow the array; new sessions start empty
+
+        Args:
+            size: New number of sessions (must not shrink)
+        """
+        if size < self.size:
+            raise ValueError("StateMachineArray cannot shrink")
+        extra = size - self.size
+        self.states = np.concatenate([
+            self.states, np.full(extra, state_code(StateType.EMPTY), dtype=np.uint8)
+        ])
+        self.emotions = np.concatenate([self.emotions, np.zeros(extra, dtype=np.uint8)])
+        self.entered_at = np.concatenate([self.entered_at, np.zeros(extra, dtype=np.float64)])
+        self.size = size
+
+    def apply_transitions(
+        self,
+        session_ids,
+        target_states,
+        emotions=None,
+        now: Optional[float] = None
+    ):
+        """
+        Validate and apply a batch of transition requests
+
+        Requests for the same session are applied in batch order. Target
+        codes outside the state table, and emotion codes outside the emotion
+        table for the emotion state, fail with UNKNOWN_STATE.
+
+        Args:
+            session_ids: Array of session ids
+            target_states: Array of target state codes (see transition_table)
+            emotions: Optional array of emotion codes (NO_EMOTION for none)
+            now: Timestamp to record as entry time (defaults to now)
+
+        Returns:
+            uint8 array of per-request result codes (TRANSITION_OK, ...)
+        """
+        session_ids = np.asarray(session_ids, dtype=np.int64)
+        target_states = np.asarray(target_states, dtype=np.int64)
+        if emotions is None:
+            emotions = np.zeros(len(session_ids), dtype=np.int64)
+        else:
+            emotions = np.asarray(emotions, dtype=np.int64)
+        now = time.time() if now is None else now
+
+        results = np.full(len(session_ids), TRANSITION_OK, dtype=np.uint8)
+        known = (session_ids >= 0) & (session_ids < self.size)
+        results[~known] = UNKNOWN_SESSION
+
+        # Range-check codes before they index the transition matrix
+        bad_state = (target_states < 0) | (target_states >= len(STATES))
+        bad_emotion = (target_states == EMOTION_STATE_CODE) & ((emotions < 0) | (emotions > len(EMOTIONS)))
+        unknown_state = known & (bad_state | bad_emotion)
+        results[unknown_state] = UNKNOWN_STATE
+
+        applied = np.zeros(len(session_ids), dtype=bool)
+        stored_emotions = np.zeros(len(session_ids), dtype=np.uint8)
+        for batch in self._rounds(session_ids, known & ~unknown_state):
+            sids = session_ids[batch]
+            targets = target_states[batch]
+            emos = emotions[batch]
+
+            valid = self.valid[self.states[sids], targets]
+            to_emotion = targets == EMOTION_STATE_CODE
+            missing_emotion = valid & to_emotion & (emos == NO_EMOTION)
+            ok = valid & ~missing_emotion
+
+            round_results = np.where(valid, TRANSITION_OK, INVALID_TRANSITION).astype(np.uint8)
+            round_results[missing_emotion] = EMOTION_REQUIRED
+            results[batch] = round_results
+
+            ok_sids = sids[ok]
+            ok_emotions = np.where(to_emotion[ok], emos[ok], NO_EMOTION)
+            self.states[ok_sids] = targets[ok]
+            self.emotions[ok_sids] = ok_emotions
+            self.entered_at[ok_sids] = now
+            applied[batch] = ok
+            stored_emotions[batch[ok]] = ok_emotions
+
+        if self.state_callbacks:
+            self._trigger_callbacks(session_ids[applied], target_states[applied], stored_emotions[applied])
+
+        return results
+
+    @staticmethod
+    def _rounds(session_ids, known):
+        """
+        Split request indices into rounds with unique session ids
+
+        Round r holds each session's r-th request, so applying rounds in
+        order preserves per-session request order.
+        """
+        indices = np.nonzero(known)[0]
+        if len(indices) == 0:
+            return []
+
+        order = indices[np.argsort(session_ids[indices], kind='stable')]
+        sorted_ids = session_ids[order]
+        group_start = np.r_[True, sorted_ids[1:] != sorted_ids[:-1]]
+        starts = np.nonzero(group_start)[0]
+        rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+
+        if rank.max() == 0:
+            return [indices]
+        return [order[rank == r] for r in range(int(rank.max()) + 1)]
+
+    def transition(
+        self,
+        session_id: int,
+        target_state: StateType,
+        emotion: Optional[EmotionType] = None
+    ) -> int:
+        """
+        Apply a single transition request
+
+        Args:
+            session_id: Session id
+            target_state: Target state type
+            emotion: Optional emotion for emotion state
+
+        Returns:
+            Result code
+        """
+        results = self.apply_transitions(
+            [session_id], [state_code(target_state)], [emotion_code(emotion)]
+        )
+        return int(results[0])
+
+    def register_callback(self, state_type: StateType, callback: Callable) -> None:
+        """
+        Register a callback for sessions entering a state
+
+        The callback is called once per batch as callback(session_ids, emotion_codes)
+        with only the sessions that actually changed into the state, and
+        the emotion codes as stored (NO_EMOTION outside the emotion state).
+
+        Args:
+            state_type: State type to register callback for
+            callback: Callback function
+        """
+        self.state_callbacks.setdefault(state_code(state_type), []).append(callback)
+
+    def _trigger_callbacks(self, session_ids, target_states, emotions) -> None:
+        """Fire callbacks grouped by entered state"""
+        for code, callbacks in self.state_callbacks.items():
+            mask = target_states == code
+            if not mask.any():
+                continue
+            sids, emos = session_ids[mask], emotions[mask]
+            for callback in callbacks:
+                try:
+                    callback(sids, emos)
+                except Exception as e:
+                    print(f"Error in state callback: {e}")
+
+    def get_state(self, session_id: int) -> CharacterState:
+        """
+        Get a session's current state
+
+        Args:
+            session_id: Session id
+
+        Returns:
+            Interned CharacterState
+        """
+        state_type = STATES[int(self.states[session_id])]
+        return get_character_state(
+            state_type,
+            emotion_from_code(int(self.emotions[session_id])),
+            state_type in LOOPING_STATES
+        )
+
+    def count_by_state(self) -> Dict[StateType, int]:
+        """Get number of sessions in each state"""
+        counts = np.bincount(self.states, minlength=len(STATES))
+        return {state: int(counts[code]) for code, state in enumerate(STATES)}
+
+    @staticmethod
+    def encode_states(states: Sequence[StateType]):
+        """Convert state types to a code array"""
+        return np.array([state_code(s) for s in states], dtype=np.uint8)
+
+    @staticmethod
+    def encode_emotions(emotions: Sequence[Optional[EmotionType]]):
+        """Convert emotions to a code array"""
+        return np.array([emotion_code(e) for e in emotions], dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __repr__(self) -> str:
+        return f"StateMachineArray({self.size} sessions)"
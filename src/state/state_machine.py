@@ -3,28 +3,74 @@ State Machine
 Manages character state transitions and validates state changes
 """
 
-from typing import Optional, Callable, Dict, List
-from .states import CharacterState, StateType, EmotionType, TransitionType
+import time
+from typing import Optional, Callable, Dict, Hashable, List, Sequence, Tuple, Union
+from .states import (
+    CharacterState, StateType, EmotionType, TransitionType, LOOPING_STATES, get_character_state
+)
 from .transitions import TransitionManager
+from .transition_table import (
+    TRANSITION_MASKS, STATE_CODES, EMOTION_CODES, NO_EMOTION, EMOTION_STATE_CODE, state_from_code
+)
+from .history import StateHistory
+from .events import EventBus
+from .planner import Route, get_default_planner
+
+
+# Event topic for callbacks registered with register_batch_callback
+BATCH_EVENT = "batch"
+
+# A batch step: a target state, or (target state, emotion)
+TransitionStep = Union[StateType, Tuple[StateType, Optional[EmotionType]]]
+
+LISTENING_CODE = STATE_CODES[StateType.LISTENING._value_]
+
+# (state value, emotion value) -> (state code, emotion code, interned state),
+# so each batch step costs one dict lookup. Every state keeps its emotion,
+# as with transition_to.
+_STEPS: Dict[Tuple[str, Optional[str]], Tuple[int, int, CharacterState]] = {
+    (state._value_, emotion._value_ if emotion else None): (
+        STATE_CODES[state._value_],
+        EMOTION_CODES[emotion._value_] if emotion else NO_EMOTION,
+        get_character_state(state, emotion)
+    )
+    for state in StateType
+    for emotion in [None, *EmotionType]
+}
 
 
 class StateMachine:
     """
     State machine for managing character state transitions
 
-    Handles state validation, transition logic, and state history
+    Handles state validation, transition logic, and state history.
+    History is a fixed-capacity ring buffer, so a long-running session
+    uses constant memory.
+
+    Callbacks run inline by default. With an EventBus they run on its
+    thread pool instead, so transition_to never waits for a subscriber.
+    Bus topics are per machine (see event_topic), so several machines can
+    share one bus.
     """
 
-    def __init__(self):
-        """Initialize state machine"""
+    def __init__(self, history_capacity: int = 1000, event_bus: Optional[EventBus] = None):
+        """
+        Initialize state machine
+
+        Args:
+            history_capacity: Maximum number of states kept in history
+            event_bus: Optional bus to dispatch callbacks asynchronously
+        """
         self.current_state: Optional[CharacterState] = None
         self.previous_state: Optional[CharacterState] = None
-        self.state_history: List[CharacterState] = []
+        self.state_history = StateHistory(history_capacity)
         self.transition_manager = TransitionManager()
         self.state_callbacks: Dict[StateType, List[Callable]] = {}
+        self.event_bus = event_bus
+        self.batch_callbacks: List[Callable] = []
 
         # Initialize with empty state
-        self.current_state = CharacterState(StateType.EMPTY)
+        self.current_state = get_character_state(StateType.EMPTY)
 
     def transition_to(
         self,
@@ -49,19 +95,8 @@ class StateMachine:
         if not is_valid:
             return False, error_msg
 
-        # Get transition video if needed
-        transition = self.transition_manager.get_transition(
-            self.current_state.state_type,
-            target_state,
-            emotion
-        )
-
-        # Create new state
-        new_state = CharacterState(
-            state_type=target_state,
-            emotion=emotion,
-            loop=(target_state in [StateType.DEFAULT, StateType.LISTENING, StateType.EMPTY])
-        )
+        # Shared interned state, no allocation
+        new_state = get_character_state(target_state, emotion, target_state in LOOPING_STATES)
 
         # Update states
         self.previous_state = self.current_state
@@ -73,6 +108,76 @@ class StateMachine:
 
         return True, None
 
+    def apply_transitions(
+        self,
+        sequence: Sequence[TransitionStep]
+    ) -> tuple[bool, Optional[str]]:
+        """
+        Apply a burst of transitions atomically
+
+        The whole sequence is validated first; if any step is invalid
+        nothing changes. Otherwise history gets one bulk append, each
+        state callback is called once with the last state of its type
+        entered in the batch, and batch callbacks get every new state.
+
+        Steps commit the same states as transition_to with the same
+        arguments, including an emotion given with a non-emotion state.
+
+        Args:
+            sequence: Steps, each a StateType or a (StateType, emotion) tuple or list
+
+        Returns:
+            Tuple of (success: bool, error_message: Optional[str])
+        """
+        if not self.current_state:
+            return False, "No current state set"
+
+        current = STATE_CODES[self.current_state.state_type._value_]
+        state_codes: List[int] = []
+        emotion_codes: List[int] = []
+        states: List[CharacterState] = []
+
+        for index, step in enumerate(sequence):
+            if isinstance(step, (tuple, list)):
+                if len(step) != 2:
+                    return False, f"Step {index}: expected (state, emotion), got {step!r}"
+                target, emotion = step
+            else:
+                target, emotion = step, None
+            if not isinstance(target, StateType) or not (emotion is None or isinstance(emotion, EmotionType)):
+                return False, f"Step {index}: malformed step {step!r}"
+
+            code, emotion_code, state = _STEPS[
+                (target._value_, emotion._value_ if emotion is not None else None)
+            ]
+
+            if not (TRANSITION_MASKS[current] >> code) & 1:
+                return False, (
+                    f"Step {index}: invalid transition from "
+                    f"{state_from_code(current).value} to {target.value}"
+                )
+            if code == EMOTION_STATE_CODE:
+                if emotion is None:
+                    return False, f"Step {index}: emotion type required for emotion state"
+                if current != LISTENING_CODE:
+                    return False, f"Step {index}: cannot trigger emotion from current state"
+
+            state_codes.append(code)
+            emotion_codes.append(emotion_code)
+            states.append(state)
+            current = code
+
+        if not states:
+            return True, None
+
+        # Commit
+        self.previous_state = states[-2] if len(states) > 1 else self.current_state
+        self.current_state = states[-1]
+        self.state_history.extend_codes(state_codes, emotion_codes, time.time())
+
+        self._trigger_batch_callbacks(states)
+        return True, None
+
     def _validate_transition(
         self,
         target_state: StateType,
@@ -90,34 +195,18 @@ class StateMachine:
         """
         current = self.current_state.state_type
 
-        # Define valid transitions
-        valid_transitions = {
-            StateType.EMPTY: [StateType.ENTERING],
-            StateType.ENTERING: [StateType.LISTENING],
-            StateType.DEFAULT: [StateType.LISTENING, StateType.LEAVING],
-            StateType.LISTENING: [
-                StateType.DEFAULT,
-                StateType.SPEAKING,
-                StateType.EMOTION,
-                StateType.LEAVING
-            ],
-            StateType.SPEAKING: [StateType.LISTENING],
-            StateType.EMOTION: [StateType.LISTENING],
-            StateType.LEAVING: [StateType.EMPTY],
-        }
-
-        # Check if transition is valid
-        allowed = valid_transitions.get(current, [])
-        if target_state not in allowed:
+        # Check against the compiled transition graph
+        if not (TRANSITION_MASKS[STATE_CODES[current._value_]] >> STATE_CODES[target_state._value_]) & 1:
             return False, f"Invalid transition from {current.value} to {target_state.value}"
 
-        # Validate emotion state
-        if target_state == StateType.EMOTION and emotion is None:
-            return False, "Emotion type required for emotion state"
+        if target_state is StateType.EMOTION:
+            # Validate emotion state
+            if emotion is None:
+                return False, "Emotion type required for emotion state"
 
-        # Cannot trigger emotion from non-interactive states
-        if target_state == StateType.EMOTION and not self.current_state.can_trigger_emotion():
-            return False, "Cannot trigger emotion from current state"
+            # Cannot trigger emotion from non-interactive states
+            if not self.current_state.can_trigger_emotion():
+                return False, "Cannot trigger emotion from current state"
 
         return True, None
 
@@ -129,10 +218,76 @@ class StateMachine:
             state_type: State type to register callback for
             callback: Callback function
         """
+        if self.event_bus is not None:
+            self.event_bus.subscribe(self.event_topic(state_type), callback)
+            return
+
         if state_type not in self.state_callbacks:
             self.state_callbacks[state_type] = []
         self.state_callbacks[state_type].append(callback)
 
+    def register_batch_callback(self, callback: Callable) -> None:
+        """
+        Register a callback called once per apply_transitions with the list of new states
+
+        Args:
+            callback: Callback function
+        """
+        if self.event_bus is not None:
+            self.event_bus.subscribe(self.event_topic(BATCH_EVENT), callback)
+            return
+        self.batch_callbacks.append(callback)
+
+    def event_topic(self, topic: Hashable) -> Tuple["StateMachine", Hashable]:
+        """
+        Get the EventBus topic this machine publishes an event under
+
+        Subscribing to it directly on the bus is equivalent to
+        register_callback/register_batch_callback.
+
+        Args:
+            topic: State type, or BATCH_EVENT
+
+        Returns:
+            (machine, topic) tuple
+        """
+        return (self, topic)
+
+    def _trigger_batch_callbacks(self, states: List[CharacterState]) -> None:
+        """
+        Trigger one coalesced event for a batch
+
+        Args:
+            states: States entered, in order
+        """
+        if self.event_bus is None and not self.state_callbacks and not self.batch_callbacks:
+            return
+
+        # Last state entered of each type, in order of last entry
+        last: Dict[StateType, CharacterState] = {}
+        for state in states:
+            last.pop(state.state_type, None)
+            last[state.state_type] = state
+
+        if self.event_bus is not None:
+            for state_type, state in last.items():
+                self.event_bus.publish((self, state_type), state)
+            self.event_bus.publish((self, BATCH_EVENT), states)
+            return
+
+        for state_type, state in last.items():
+            for callback in self.state_callbacks.get(state_type, []):
+                try:
+                    callback(state)
+                except Exception as e:
+                    print(f"Error in state callback: {e}")
+
+        for callback in self.batch_callbacks:
+            try:
+                callback(states)
+            except Exception as e:
+                print(f"Error in batch callback: {e}")
+
     def _trigger_callbacks(self, state_type: StateType) -> None:
         """
         Trigger callbacks for a state
@@ -140,6 +295,13 @@ class StateMachine:
         Args:
             state_type: State type that was entered
         """
+        if self.event_bus is not None:
+            self.event_bus.publish((self, state_type), self.current_state)
+            return
+
+        if not self.state_callbacks:
+            return
+
         callbacks = self.state_callbacks.get(state_type, [])
         for callback in callbacks:
             try:
@@ -165,11 +327,11 @@ class StateMachine:
         Returns:
             List of recent states
         """
-        return self.state_history[-limit:]
+        return self.state_history.get_recent(limit)
 
     def reset(self) -> None:
         """Reset state machine to empty state"""
-        self.current_state = CharacterState(StateType.EMPTY)
+        self.current_state = get_character_state(StateType.EMPTY)
         self.previous_state = None
         self.state_history.clear()
 
@@ -186,6 +348,30 @@ class StateMachine:
         is_valid, _ = self._validate_transition(target_state, None)
         return is_valid
 
+    def plan_route(
+        self,
+        target_state: StateType,
+        emotion: Optional[EmotionType] = None
+    ) -> Optional[Route]:
+        """
+        Get the shortest route from the current state to a target state
+
+        For example, DEFAULT -> EMOTION goes through LISTENING. The route
+        lists every clip to queue and the total duration, so playback can
+        preload the whole sequence at once.
+
+        Args:
+            target_state: Target state
+            emotion: Target emotion if target is the emotion state
+
+        Returns:
+            Route, or None if the target cannot be reached
+        """
+        current = self.current_state
+        return get_default_planner().plan(
+            current.state_type, target_state, emotion, current.emotion
+        )
+
     def __repr__(self) -> str:
         current = self.current_state.state_type.value if self.current_state else "None"
         previous = self.previous_state.state_type.value if self.previous_state else "None"
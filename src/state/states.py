@@ -4,8 +4,8 @@ Defines all possible character states and emotions
 """
 
 from enum import Enum
-from typing import Optional
-from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from dataclasses import FrozenInstanceError
 
 
 class StateType(Enum):
@@ -19,6 +19,13 @@ class StateType(Enum):
     EMPTY = "empty"  # Character not present on device
 
 
+# States whose clip loops until the next transition
+LOOPING_STATES = frozenset([StateType.DEFAULT, StateType.LISTENING, StateType.EMPTY])
+
+# States that allow user interaction
+INTERACTIVE_STATES = frozenset([StateType.LISTENING, StateType.SPEAKING, StateType.EMOTION])
+
+
 class EmotionType(Enum):
     """Emotion states based on Expression Sheet"""
     NEUTRAL = "neutral"  # Neutral (same as listening)
@@ -46,26 +53,61 @@ class TransitionType(Enum):
     ENTERING_TO_LISTENING = "enter2listening"
 
 
-@dataclass
 class CharacterState:
     """
     Represents a character state with optional emotion
 
+    Instances are immutable and hashable, so they can key caches and be
+    shared freely. Use get_character_state() to obtain the canonical
+    interned instance instead of allocating a new one.
+
     Attributes:
         state_type: The main state type
         emotion: Optional emotion if in emotion state
         duration: Duration of the state in seconds
         loop: Whether the state should loop
     """
-    state_type: StateType
-    emotion: Optional[EmotionType] = None
-    duration: float = 5.0
-    loop: bool = False
 
-    def __post_init__(self):
-        """Validate state after initialization"""
-        if self.state_type == StateType.EMOTION and self.emotion is None:
-            self.emotion = EmotionType.NEUTRAL
+    __slots__ = ("state_type", "emotion", "duration", "loop", "_hash")
+
+    def __init__(
+        self,
+        state_type: StateType,
+        emotion: Optional[EmotionType] = None,
+        duration: float = 5.0,
+        loop: bool = False
+    ):
+        # Emotion state always carries an emotion
+        if state_type == StateType.EMOTION and emotion is None:
+            emotion = EmotionType.NEUTRAL
+
+        object.__setattr__(self, "state_type", state_type)
+        object.__setattr__(self, "emotion", emotion)
+        object.__setattr__(self, "duration", duration)
+        object.__setattr__(self, "loop", loop)
+        object.__setattr__(self, "_hash", hash((state_type, emotion, duration, loop)))
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if other.__class__ is not CharacterState:
+            return NotImplemented
+        return (self.state_type is other.state_type and
+                self.emotion is other.emotion and
+                self.duration == other.duration and
+                self.loop == other.loop)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self):
+        return (CharacterState, (self.state_type, self.emotion, self.duration, self.loop))
 
     def get_video_name(self) -> str:
         """
@@ -80,7 +122,7 @@ class CharacterState:
 
     def is_interactive(self) -> bool:
         """Check if state allows user interaction"""
-        return self.state_type in [StateType.LISTENING, StateType.SPEAKING, StateType.EMOTION]
+        return self.state_type in INTERACTIVE_STATES
 
     def can_trigger_emotion(self) -> bool:
         """Check if emotion can be triggered from this state"""
@@ -92,6 +134,44 @@ class CharacterState:
         return f"CharacterState({self.state_type.value})"
 
 
+# Canonical instances, one per (state_type, emotion, loop), keyed by plain
+# values so lookups avoid the Python-level Enum __hash__
+_INTERNED_STATES: Dict[Tuple[str, Optional[str], bool], CharacterState] = {}
+for _state_type in StateType:
+    for _emotion in [None, *EmotionType]:
+        for _loop in (False, True):
+            _state = CharacterState(_state_type, _emotion, loop=_loop)
+            _key = (_state_type._value_, _emotion._value_ if _emotion else None, _loop)
+            _INTERNED_STATES[_key] = _state
+del _state_type, _emotion, _loop, _state, _key
+
+
+def get_character_state(
+    state_type: StateType,
+    emotion: Optional[EmotionType] = None,
+    loop: Optional[bool] = None
+) -> CharacterState:
+    """
+    Get the canonical interned state for a combination
+
+    Repeated calls return the same object, so no allocation happens and
+    states can be compared with `is`.
+
+    Args:
+        state_type: Type of state
+        emotion: Optional emotion (emotion state defaults to NEUTRAL)
+        loop: Whether the state loops (defaults to LOOPING_STATES membership)
+
+    Returns:
+        Interned CharacterState with the default duration
+    """
+    if loop is None:
+        loop = state_type in LOOPING_STATES
+    if state_type is StateType.EMOTION and emotion is None:
+        emotion = EmotionType.NEUTRAL
+    return _INTERNED_STATES[(state_type._value_, emotion._value_ if emotion else None, loop)]
+
+
 def get_state_config(state_type: StateType, emotion: Optional[EmotionType] = None) -> dict:
     """
     Get configuration for a specific state
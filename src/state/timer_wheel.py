@@ -0,0 +1,202 @@
+"""
+Timer Wheel
+Hierarchical timing wheel with O(1) schedule and cancel
+"""
+
+import math
+import time
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class TimerWheel:
+    """
+    Hierarchical timing wheel keyed by an id (e.g. a session id)
+
+    Level 0 has one slot per tick; each higher level has slots covering a
+    whole turn of the level below. A timer is placed by a couple of
+    divisions, cancelled by a dict lookup, and moved down a level at most
+    once per level when its slot comes round, so advancing costs
+    O(ticks + due timers) no matter how many timers are pending.
+
+    A key has at most one timer: scheduling it again replaces the old one.
+    Timers never fire early; they fire on the first advance() at or after
+    their deadline.
+    """
+
+    def __init__(
+        self,
+        tick: float = 0.1,
+        slots: int = 256,
+        levels: int = 4,
+        start: Optional[float] = None
+    ):
+        """
+        Initialize timer wheel
+
+        Args:
+            tick: Resolution in seconds
+            slots: Slots per level
+            levels: Number of levels (range is tick * slots ** levels)
+            start: Time of tick 0 (defaults to now)
+        """
+        if tick <= 0 or slots < 2 or levels < 1:
+            raise ValueError("Timer wheel needs tick > 0, slots >= 2 and levels >= 1")
+
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self.start = time.time() if start is None else start
+        self.current_tick = 0
+        # wheels[level][slot] maps key -> (deadline tick, payload)
+        self.wheels: List[List[Dict[Hashable, Tuple[int, Any]]]] = [
+            [{} for _ in range(slots)] for _ in range(levels)
+        ]
+        self._spans = [slots ** level for level in range(levels + 1)]
+        self._locations: Dict[Hashable, Tuple[int, int]] = {}
+
+    def schedule(self, key: Hashable, deadline: float, payload: Any = None) -> None:
+        """
+        Schedule (or reschedule) a timer
+
+        Args:
+            key: Timer id; replaces any pending timer with the same key
+            deadline: Time the timer becomes due
+            payload: Value returned with the key when the timer fires
+        """
+        if key in self._locations:
+            self.cancel(key)
+        deadline_tick = max(math.ceil((deadline - self.start) / self.tick - 1e-9), self.current_tick + 1)
+        self._place(key, deadline_tick, payload)
+
+    def schedule_many(self, keys: List[Hashable], deadlines: List[float], payloads: List[Any]) -> None:
+        """
+        Schedule a batch of timers (same semantics as schedule)
+
+        Args:
+            keys: Timer ids
+            deadlines: Matching deadlines
+            payloads: Matching payloads
+        """
+        locations = self._locations
+        wheels, spans, slots, levels = self.wheels, self._spans, self.slots, self.levels
+        current = self.current_tick
+        limit = current + spans[levels] - 1
+        start, tick = self.start, self.tick
+
+        for key, deadline, payload in zip(keys, deadlines, payloads):
+            location = locations.get(key)
+            if location is not None:
+                del wheels[location[0]][location[1]][key]
+
+            deadline_tick = math.ceil((deadline - start) / tick - 1e-9)
+            if deadline_tick <= current:
+                deadline_tick = current + 1
+            delta = deadline_tick - current
+            level = 0
+            while level < levels - 1 and delta >= spans[level + 1]:
+                level += 1
+            slot = ((deadline_tick if deadline_tick < limit else limit) // spans[level]) % slots
+
+            wheels[level][slot][key] = (deadline_tick, payload)
+            locations[key] = (level, slot)
+
+    def _place(self, key: Hashable, deadline_tick: int, payload: Any) -> None:
+        """Put a timer in the lowest level whose range reaches its deadline"""
+        delta = deadline_tick - self.current_tick
+        spans = self._spans
+        level = 0
+        while level < self.levels - 1 and delta >= spans[level + 1]:
+            level += 1
+        # Beyond the top level's range: park in the furthest slot and re-place on cascade
+        target_tick = min(deadline_tick, self.current_tick + spans[self.levels] - 1)
+        slot = (target_tick // spans[level]) % self.slots
+
+        self.wheels[level][slot][key] = (deadline_tick, payload)
+        self._locations[key] = (level, slot)
+
+    def cancel(self, key: Hashable) -> bool:
+        """
+        Cancel a pending timer
+
+        Args:
+            key: Timer id
+
+        Returns:
+            True if a timer was pending
+        """
+        location = self._locations.pop(key, None)
+        if location is None:
+            return False
+        level, slot = location
+        del self.wheels[level][slot][key]
+        return True
+
+    def advance(self, now: float) -> List[Tuple[Hashable, Any]]:
+        """
+        Move the wheel forward and collect every timer now due
+
+        Args:
+            now: Current time
+
+        Returns:
+            List of (key, payload) for fired timers, in deadline order
+        """
+        target_tick = math.floor((now - self.start) / self.tick + 1e-9)
+        fired: List[Tuple[Hashable, Any]] = []
+        wheels, spans, slots = self.wheels, self._spans, self.slots
+        locations = self._locations
+
+        if not locations:
+            self.current_tick = max(self.current_tick, target_tick)
+            return fired
+
+        while self.current_tick < target_tick:
+            tick = self.current_tick + 1
+            self.current_tick = tick
+
+            # Cascade higher levels whose slot boundary we just crossed, top down
+            for level in range(self.levels - 1, 0, -1):
+                if tick % spans[level] == 0:
+                    bucket = wheels[level][(tick // spans[level]) % slots]
+                    if bucket:
+                        entries = list(bucket.items())
+                        bucket.clear()
+                        for key, (deadline_tick, payload) in entries:
+                            self._place(key, deadline_tick, payload)
+
+            bucket = wheels[0][tick % slots]
+            if bucket:
+                entries = list(bucket.items())
+                bucket.clear()
+                for key, (deadline_tick, payload) in entries:
+                    if deadline_tick > tick:
+                        # Parked beyond the wheel's range (e.g. a single level): not due yet
+                        self._place(key, deadline_tick, payload)
+                        continue
+                    del locations[key]
+                    fired.append((key, payload))
+
+        return fired
+
+    def next_deadline(self) -> Optional[float]:
+        """
+        Get the earliest pending deadline (scans the wheel; for diagnostics)
+
+        Returns:
+            Time of the earliest timer, or None if nothing is pending
+        """
+        ticks = [
+            deadline_tick
+            for level in self.wheels for bucket in level if bucket
+            for deadline_tick, _ in bucket.values()
+        ]
+        return self.start + min(ticks) * self.tick if ticks else None
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._locations
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def __repr__(self) -> str:
+        return f"TimerWheel({len(self._locations)} timers, tick={self.tick}s)"
@@ -0,0 +1,86 @@
+"""
+Transition Table
+Valid-transition graph compiled once into integer codes and bitmasks
+
+The table is module-level and shared by every StateMachine, so validating
+a transition is two indexed lookups and a bit test, with no allocation.
+"""
+
+from typing import Dict, Optional, Tuple
+from .states import StateType, EmotionType
+
+
+# Source of truth for which state changes are allowed
+VALID_TRANSITIONS: Dict[StateType, Tuple[StateType, ...]] = {
+    StateType.EMPTY: (StateType.ENTERING,),
+    StateType.ENTERING: (StateType.LISTENING,),
+    StateType.DEFAULT: (StateType.LISTENING, StateType.LEAVING),
+    StateType.LISTENING: (
+        StateType.DEFAULT,
+        StateType.SPEAKING,
+        StateType.EMOTION,
+        StateType.LEAVING,
+    ),
+    StateType.SPEAKING: (StateType.LISTENING,),
+    StateType.EMOTION: (StateType.LISTENING,),
+    StateType.LEAVING: (StateType.EMPTY,),
+}
+
+# Integer codes, in enum definition order
+STATES: Tuple[StateType, ...] = tuple(StateType)
+EMOTIONS: Tuple[EmotionType, ...] = tuple(EmotionType)
+
+# Keyed by the enum's plain value string: str hashes are cached, whereas
+# hashing an Enum member goes through a Python-level __hash__
+STATE_CODES: Dict[str, int] = {state._value_: code for code, state in enumerate(STATES)}
+
+# Emotion code 0 means "no emotion"
+NO_EMOTION = 0
+EMOTION_CODES: Dict[str, int] = {emotion._value_: code + 1 for code, emotion in enumerate(EMOTIONS)}
+
+# TRANSITION_MASKS[from_code] has bit to_code set if from -> to is allowed
+TRANSITION_MASKS: Tuple[int, ...] = tuple(
+    sum(1 << STATE_CODES[target._value_] for target in VALID_TRANSITIONS.get(state, ()))
+    for state in STATES
+)
+
+EMOTION_STATE_CODE = STATE_CODES[StateType.EMOTION._value_]
+
+
+def state_code(state_type: StateType) -> int:
+    """Get integer code of a state type"""
+    return STATE_CODES[state_type._value_]
+
+
+def emotion_code(emotion: Optional[EmotionType]) -> int:
+    """Get integer code of an emotion (NO_EMOTION for None)"""
+    return NO_EMOTION if emotion is None else EMOTION_CODES[emotion._value_]
+
+
+def state_from_code(code: int) -> StateType:
+    """Get state type from its integer code"""
+    return STATES[code]
+
+
+def emotion_from_code(code: int) -> Optional[EmotionType]:
+    """Get emotion from its integer code (None for NO_EMOTION)"""
+    return None if code == NO_EMOTION else EMOTIONS[code - 1]
+
+
+def is_valid_transition(from_state: StateType, to_state: StateType) -> bool:
+    """
+    Check if the graph allows from_state -> to_state
+
+    Args:
+        from_state: Source state
+        to_state: Target state
+
+    Returns:
+        True if the transition is in the graph
+    """
+    return (TRANSITION_MASKS[STATE_CODES[from_state._value_]] >> STATE_CODES[to_state._value_]) & 1 == 1
+
+
+def is_valid_code_transition(from_code: int, to_code: int) -> bool:
+    """Check the graph using integer state codes"""
+    return (TRANSITION_MASKS[from_code] >> to_code) & 1 == 1
@@ -3,8 +3,15 @@ Transition Manager
 Handles smooth transitions between character states using first/last frame control
 """
 
-from typing import Optional, Dict, Tuple
+from typing import Any, Optional, Dict, Set, Tuple
 from .states import StateType, EmotionType, TransitionType
+from .transition_table import is_valid_transition
+
+
+# States entered or left with a direct cut/overlay instead of a transition video:
+# emotion clips share first/last frames with listening, speaking is listening
+# with a lip sync overlay
+DIRECT_CUT_STATES = frozenset({StateType.EMOTION._value_, StateType.SPEAKING._value_})
 
 
 class Transition:
@@ -37,6 +44,29 @@ class Transition:
         self.duration = duration
         self.description = description
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Transition":
+        """Create transition from a config dictionary"""
+        return cls(
+            from_state=StateType(data['from']),
+            to_state=StateType(data['to']),
+            transition_type=TransitionType(data['type']),
+            video_name=data['video'],
+            duration=data.get('duration', 5.0),
+            description=data.get('description', "")
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert transition to a config dictionary"""
+        return {
+            'from': self.from_state.value,
+            'to': self.to_state.value,
+            'type': self.transition_type.value,
+            'video': self.video_name,
+            'duration': self.duration,
+            'description': self.description
+        }
+
     def __repr__(self) -> str:
         return f"Transition({self.from_state.value} -> {self.to_state.value})"
 
@@ -46,12 +76,65 @@ class TransitionManager:
     Manages transitions between character states
 
     Key principle: Use first/last frame control to ensure seamless transitions
+
+    Outgoing/incoming adjacency indexes and the set of state pairs that need
+    a transition video are kept up to date by add_transition, so lookups
+    cost O(degree) instead of a scan over every edge.
     """
 
-    def __init__(self):
-        """Initialize transition manager with predefined transitions"""
+    def __init__(self, load_defaults: bool = True):
+        """
+        Initialize transition manager
+
+        Args:
+            load_defaults: Register the predefined transitions
+        """
         self.transitions: Dict[Tuple[StateType, StateType], Transition] = {}
-        self._initialize_transitions()
+        self.outgoing: Dict[StateType, Dict[StateType, Transition]] = {}
+        self.incoming: Dict[StateType, Dict[StateType, Transition]] = {}
+        # (from value, to value) pairs keyed by plain strings, see transition_table
+        self.requires_video: Set[Tuple[str, str]] = set()
+        if load_defaults:
+            self._initialize_transitions()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "TransitionManager":
+        """
+        Build transition clip metadata from the "transitions" section of a config
+
+        The config only describes the clips, durations and descriptions of
+        transitions. Which state changes are allowed is fixed by the compiled
+        graph in transition_table (VALID_TRANSITIONS), so every configured
+        transition must be an edge of that graph.
+
+        Args:
+            config: Configuration dictionary with a list of transitions
+                    ({"from", "to", "type", "video", "duration", "description"})
+
+        Returns:
+            Transition manager (predefined transitions if section is missing)
+
+        Raises:
+            ValueError: If a configured transition is not allowed by the graph
+        """
+        section = config.get('transitions')
+        if not section:
+            return cls()
+
+        manager = cls(load_defaults=False)
+        for item in section:
+            transition = Transition.from_dict(item)
+            if not is_valid_transition(transition.from_state, transition.to_state):
+                raise ValueError(
+                    f"Configured transition {transition.from_state.value} -> "
+                    f"{transition.to_state.value} is not in the state graph"
+                )
+            manager._register(transition)
+        return manager
+
+    def to_config(self) -> Dict[str, Any]:
+        """Convert transition graph to a config dictionary"""
+        return {'transitions': [trans.to_dict() for trans in self.transitions.values()]}
 
     def _initialize_transitions(self) -> None:
         """Initialize all valid transitions"""
@@ -130,15 +213,24 @@ class TransitionManager:
             duration: Duration in seconds
             description: Description
         """
-        key = (from_state, to_state)
-        self.transitions[key] = Transition(
+        self._register(Transition(
             from_state,
             to_state,
             transition_type,
             video_name,
             duration,
             description
-        )
+        ))
+
+    def _register(self, transition: Transition) -> None:
+        """Store a transition and update the adjacency indexes"""
+        from_state, to_state = transition.from_state, transition.to_state
+        self.transitions[(from_state, to_state)] = transition
+        self.outgoing.setdefault(from_state, {})[to_state] = transition
+        self.incoming.setdefault(to_state, {})[from_state] = transition
+
+        if from_state._value_ not in DIRECT_CUT_STATES and to_state._value_ not in DIRECT_CUT_STATES:
+            self.requires_video.add((from_state._value_, to_state._value_))
 
     def get_transition(
         self,
@@ -157,16 +249,11 @@ class TransitionManager:
         Returns:
             Transition object or None if direct cut
         """
-        # Emotion transitions are direct cuts (first/last frame matching)
-        if to_state == StateType.EMOTION or from_state == StateType.EMOTION:
+        # Emotion transitions are direct cuts (first/last frame matching),
+        # speaking transitions are direct overlays
+        if (from_state._value_, to_state._value_) not in self.requires_video:
             return None
-
-        # Speaking transitions are direct overlays
-        if to_state == StateType.SPEAKING or from_state == StateType.SPEAKING:
-            return None
-
-        key = (from_state, to_state)
-        return self.transitions.get(key)
+        return self.outgoing[from_state][to_state]
 
     def requires_transition_video(
         self,
@@ -183,8 +270,7 @@ class TransitionManager:
         Returns:
             True if transition video is needed
         """
-        transition = self.get_transition(from_state, to_state)
-        return transition is not None
+        return (from_state._value_, to_state._value_) in self.requires_video
 
     def get_all_transitions(self) -> list[Transition]:
         """Get all registered transitions"""
@@ -200,10 +286,7 @@ class TransitionManager:
         Returns:
             List of transitions from this state
         """
-        return [
-            trans for (from_st, _), trans in self.transitions.items()
-            if from_st == state
-        ]
+        return list(self.outgoing.get(state, {}).values())
 
     def get_transitions_to(self, state: StateType) -> list[Transition]:
         """
@@ -215,10 +298,7 @@ class TransitionManager:
         Returns:
             List of transitions to this state
         """
-        return [
-            trans for (_, to_st), trans in self.transitions.items()
-            if to_st == state
-        ]
+        return list(self.incoming.get(state, {}).values())
 
     def __repr__(self) -> str:
         return f"TransitionManager({len(self.transitions)} transitions)"
@@ -2,6 +2,12 @@
 
 from .generator import VideoGenerator, VideoGenerationRequest
 from .prompts import PromptGenerator
+from .templates import PromptTemplate, TemplateLibrary
+from .export import PromptExportResult, export_profiles
+from .sweep import PromptSweep, PromptVariant, SweepEstimate
 from .processor import VideoProcessor
+from .renditions import Rendition, RenditionLadder
 
-__all__ = ["VideoGenerator", "VideoGenerationRequest", "PromptGenerator", "VideoProcessor"]
+__all__ = ["VideoGenerator", "VideoGenerationRequest", "PromptGenerator", "PromptTemplate", "TemplateLibrary",
+           "PromptExportResult", "export_profiles", "PromptSweep", "PromptVariant", "SweepEstimate",
+           "VideoProcessor", "Rendition", "RenditionLadder"]
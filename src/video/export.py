@@ -0,0 +1,245 @@
+"""
+Prompt Export
+Change-aware prompt file export and packed multi-character prompt exports
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from ..character.profile import CharacterProfile
+from .templates import TemplateLibrary
+
+
+@dataclass
+class PromptExportResult:
+    """
+    Outcome of an export
+
+    Attributes:
+        written: Files (or records) whose content changed and were written
+        unchanged: Files (or records) left untouched
+        removed: Records deleted because their character no longer produces them
+    """
+    written: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    def __repr__(self) -> str:
+        return (f"PromptExportResult({len(self.written)} written, {len(self.unchanged)} unchanged, "
+                f"{len(self.removed)} removed)")
+
+
+def _temp_file(path: Path, mode: str = 'wb'):
+    """Uniquely named temporary file next to a target, left in place on close"""
+    return tempfile.NamedTemporaryFile(
+        mode, encoding='utf-8' if 'b' not in mode else None,
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False
+    )
+
+
+def _replace(temp_path: str, path: Path) -> None:
+    """Move a finished temporary file over the target, keeping the target's permissions"""
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+    os.chmod(temp_path, mode)
+    os.replace(temp_path, path)
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """
+    Atomically write a text file unless it already holds this content
+
+    The new content goes to a uniquely named temporary file in the same
+    directory that then replaces the target, so readers never see a
+    partial file and concurrent exports never share a temporary file.
+
+    Args:
+        path: Target file
+        content: Text content
+
+    Returns:
+        True if the file was written
+    """
+    data = content.encode('utf-8')
+    try:
+        # Only same-size files need their content compared
+        if os.stat(path).st_size == len(data):
+            with open(path, 'rb') as f:
+                if f.read() == data:
+                    return False
+    except FileNotFoundError:
+        pass
+
+    with _temp_file(path) as f:
+        f.write(data)
+    try:
+        _replace(f.name, path)
+    finally:
+        Path(f.name).unlink(missing_ok=True)
+    return True
+
+
+def export_prompt_files(files: Dict[str, str], output_dir: str, workers: int = 8) -> PromptExportResult:
+    """
+    Export prompt files, writing only those whose content changed
+
+    Args:
+        files: Prompt text per path relative to output_dir
+        output_dir: Output directory
+        workers: Threads checking and writing files in parallel
+
+    Returns:
+        PromptExportResult with relative paths
+    """
+    root = Path(output_dir)
+    for directory in {(root / name).parent for name in files}:
+        directory.mkdir(parents=True, exist_ok=True)
+
+    names = list(files)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        changed = list(pool.map(lambda name: write_if_changed(root / name, files[name]), names))
+
+    result = PromptExportResult()
+    for name, was_written in zip(names, changed):
+        (result.written if was_written else result.unchanged).append(name)
+    return result
+
+
+def _character_id(profile: CharacterProfile) -> str:
+    """Character id of a profile, falling back to its nickname"""
+    return str(profile.get_character_info().get('id', profile.nickname))
+
+
+def export_profiles(
+    profiles: Iterable[CharacterProfile],
+    output_path: str,
+    templates: Optional[TemplateLibrary] = None
+) -> PromptExportResult:
+    """
+    Export the prompts of many characters into one packed file
+
+    A ".jsonl" path gets one line per character
+    ({"character_id", "nickname", "prompts": {path: text}}), streamed to a
+    temporary file and only moved over the target if its content hash
+    differs. A ".sqlite"/".db" path gets a prompts table upserted in one
+    transaction, where only prompts whose hash changed are rewritten and
+    prompts an exported character no longer produces are deleted.
+
+    Characters are keyed by id (or nickname if the profile has no id), so
+    two profiles resolving to the same id raise ValueError and leave the
+    target untouched.
+
+    Args:
+        profiles: Character profiles
+        output_path: Packed output file
+        templates: Prompt templates passed to each PromptGenerator
+
+    Returns:
+        PromptExportResult with character ids (JSONL) or "<character id>/<path>" (SQLite)
+    """
+    from .prompts import PromptGenerator
+
+    def rendered():
+        for profile in profiles:
+            yield _character_id(profile), profile, PromptGenerator(profile, templates).get_prompt_files()
+
+    path = Path(output_path)
+    if path.suffix.lower() == '.jsonl':
+        return _export_jsonl(rendered(), path)
+    if path.suffix.lower() in ('.sqlite', '.db'):
+        return _export_sqlite(rendered(), path)
+    raise ValueError(f"Unsupported prompt export format: {path.suffix} (use .jsonl, .sqlite or .db)")
+
+
+def _export_jsonl(rendered, path: Path) -> PromptExportResult:
+    """Write a JSONL export, replacing the target only if its content changed"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    character_ids: List[str] = []
+    seen = set()
+    f = _temp_file(path, 'w')
+    try:
+        with f:
+            for character_id, profile, files in rendered:
+                if character_id in seen:
+                    raise ValueError(f"Duplicate character id in prompt export: {character_id}")
+                seen.add(character_id)
+                line = json.dumps(
+                    {'character_id': character_id, 'nickname': profile.nickname, 'prompts': files},
+                    ensure_ascii=False
+                ) + "\n"
+                digest.update(line.encode('utf-8'))
+                f.write(line)
+                character_ids.append(character_id)
+
+        if path.exists() and _hash_file(path) == digest.digest():
+            return PromptExportResult(unchanged=character_ids)
+        _replace(f.name, path)
+        return PromptExportResult(written=character_ids)
+    finally:
+        Path(f.name).unlink(missing_ok=True)
+
+
+def _export_sqlite(rendered, path: Path) -> PromptExportResult:
+    """Upsert prompts into a SQLite export, rewriting only changed rows and deleting stale ones"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    result = PromptExportResult()
+    seen = set()
+    connection = sqlite3.connect(str(path))
+    try:
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS prompts ("
+                "character_id TEXT NOT NULL, name TEXT NOT NULL, prompt TEXT NOT NULL, "
+                "sha256 TEXT NOT NULL, PRIMARY KEY (character_id, name))"
+            )
+            for character_id, _, files in rendered:
+                if character_id in seen:
+                    raise ValueError(f"Duplicate character id in prompt export: {character_id}")
+                seen.add(character_id)
+                existing = dict(connection.execute(
+                    "SELECT name, sha256 FROM prompts WHERE character_id = ?", (character_id,)
+                ))
+                rows = []
+                for name, prompt in files.items():
+                    digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+                    key = f"{character_id}/{name}"
+                    if existing.get(name) == digest:
+                        result.unchanged.append(key)
+                    else:
+                        rows.append((character_id, name, prompt, digest))
+                        result.written.append(key)
+                connection.executemany(
+                    "INSERT INTO prompts (character_id, name, prompt, sha256) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (character_id, name) DO UPDATE SET "
+                    "prompt = excluded.prompt, sha256 = excluded.sha256",
+                    rows
+                )
+
+                stale = sorted(existing.keys() - files.keys())
+                connection.executemany(
+                    "DELETE FROM prompts WHERE character_id = ? AND name = ?",
+                    [(character_id, name) for name in stale]
+                )
+                result.removed.extend(f"{character_id}/{name}" for name in stale)
+    finally:
+        connection.close()
+    return result
+
+
+def _hash_file(path: Path) -> bytes:
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
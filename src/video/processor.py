@@ -3,8 +3,9 @@ Video Processor
 Handles post-processing of generated videos
 """
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pathlib import Path
+from .renditions import Rendition
 
 
 class VideoProcessor:
@@ -16,6 +17,7 @@ class VideoProcessor:
     - Format conversion
     - Frame extraction
     - Video concatenation
+    - Per-device rendition encoding
     """
 
     def __init__(self):
@@ -260,6 +262,67 @@ class VideoProcessor:
             'message': 'Cropping prepared (mock mode)'
         }
 
+    def create_renditions(
+        self,
+        video_path: str,
+        renditions: List[Rendition],
+        output_dir: str
+    ) -> Dict[str, Any]:
+        """
+        Encode several renditions of a clip from a single decode
+
+        The input is decoded once and the frames are split into one
+        scale/encode branch per rendition, instead of running a separate
+        ffmpeg process (and decode) for every output.
+
+        Args:
+            video_path: Input video path
+            renditions: Renditions to produce
+            output_dir: Directory for rendition outputs
+
+        Returns:
+            Processing result with the ffmpeg command and output paths
+        """
+        print(f"[VideoProcessor] Creating {len(renditions)} renditions for: {video_path}")
+
+        stem = Path(video_path).stem
+        outputs: Dict[str, str] = {}
+
+        split_labels = "".join(f"[s{i}]" for i in range(len(renditions)))
+        filters = [f"[0:v]split={len(renditions)}{split_labels}"]
+        for i, rendition in enumerate(renditions):
+            filters.append(
+                f"[s{i}]scale={rendition.width}:{rendition.height},"
+                f"fps={rendition.frame_rate}[v{i}]"
+            )
+
+        command = ["ffmpeg", "-y", "-i", video_path, "-filter_complex", ";".join(filters)]
+        for i, rendition in enumerate(renditions):
+            output_path = str(Path(output_dir) / f"{stem}_{rendition.name}.mp4")
+            outputs[rendition.name] = output_path
+            command += [
+                "-map", f"[v{i}]",
+                "-map", "0:a?",
+                "-c:v", "libx264",
+                "-profile:v", rendition.profile,
+                "-b:v", rendition.video_bitrate,
+                "-pix_fmt", "yuv420p",
+                "-c:a", "aac",
+            ]
+            if rendition.faststart:
+                command += ["-movflags", "+faststart"]
+            command.append(output_path)
+
+        # In production, run the command with subprocess
+
+        return {
+            'success': True,
+            'input': video_path,
+            'outputs': outputs,
+            'command': command,
+            'message': 'Rendition encoding prepared (mock mode)'
+        }
+
     def validate_video(self, video_path: str) -> Dict[str, Any]:
         """
         Validate video file exists and has correct format
@@ -3,28 +3,223 @@ Prompt Generator
 Generates prompts for AI video generation based on character state
 """
 
-from typing import Dict, Optional
-from pathlib import Path
-from ..state.states import StateType, EmotionType, CharacterState
+import os
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+from ..state.states import StateType, EmotionType, CharacterState, get_character_state
 from ..character.profile import CharacterProfile
+from .templates import TemplateLibrary, state_template_name, transition_template_name
+from .export import PromptExportResult, export_prompt_files
+
+
+# Action/pose description per state
+STATE_ACTIONS: Dict[StateType, str] = {
+    StateType.DEFAULT: (
+        "girl looking to the left side, facing left, "
+        "two arms behind back, body still, "
+        "occasionally blinks, hair gently blown by wind"
+    ),
+    StateType.LISTENING: (
+        "create a 5s video, girl's hair naturally blown by wind, "
+        "blinks occasionally"
+    ),
+    StateType.SPEAKING: (
+        "girl is speaking, hair naturally blown by wind, "
+        "occasionally blinks, head can naturally tilt slightly, "
+        "very small movements"
+    ),
+    StateType.LEAVING: (
+        "girl quickly leaves the frame, runs out from the right side, "
+        "only pure white background left, smooth natural motion, "
+        "no distortion, smooth running pose"
+    ),
+    StateType.ENTERING: (
+        "create a 5s video, first frame has no person, "
+        "only pure white background, then person peeks from left edge, "
+        "then walks into frame, facing camera, "
+        "throughout process person's frame proportion unchanged, "
+        "person details remain consistent"
+    ),
+}
+
+# Action/pose description per emotion of the emotion state
+EMOTION_ACTIONS: Dict[EmotionType, str] = {
+    EmotionType.NEUTRAL: STATE_ACTIONS[StateType.LISTENING],
+    EmotionType.HAPPY: (
+        "create a 5s video, girl happily smiles, blushing, "
+        "tilts head, camera fixed"
+    ),
+    EmotionType.SHY: (
+        "Shot 1: girl hears something and looks down shyly, blushing. "
+        "Shot 2: girl returns from shy to calm state"
+    ),
+    EmotionType.SURPRISED: (
+        "girl looks like she was frightened by something, "
+        "surprised expression, body jolts, steps back two steps, "
+        "shoulders raised, looks around nervously"
+    ),
+    EmotionType.SMUG: (
+        "girl crosses arms in front of chest, "
+        "confident and proud look, then lowers arms"
+    ),
+    EmotionType.ANGRY: (
+        "girl is angry, teeth clenched, frowning, "
+        "then returns to calm"
+    ),
+    EmotionType.CONFUSED: (
+        "girl frowns, serious expression, very confused look, "
+        "one hand on chin, as if thinking about something, "
+        "camera fixed"
+    ),
+    EmotionType.SAD: (
+        "girl frowns, takes a deep breath, "
+        "slightly lowers head, eyes looking down"
+    ),
+    EmotionType.SLEEPY: (
+        "girl looks very tired, eyes about to close, "
+        "head drooping down, body slightly swaying"
+    ),
+}
+
+# Motion description per transition that has its own clip
+TRANSITION_ACTIONS: Dict[Tuple[StateType, StateType], str] = {
+    (StateType.DEFAULT, StateType.LISTENING): (
+        "girl turns from left side to front, looking at camera, "
+        "hands at body sides, smooth natural motion, "
+        "no distortion, no frame skipping"
+    ),
+    (StateType.LISTENING, StateType.DEFAULT): (
+        "girl turns from front to left side, hands behind back, "
+        "smooth natural motion, no distortion, no frame skipping"
+    ),
+}
+
+MOTION_PARTS = (
+    "camera fixed, no camera movement",
+    "smooth animation, no distortion, no frame skipping",
+)
+
+TECHNICAL_PARTS = (
+    "9:16 aspect ratio",
+    "high quality, 2K resolution",
+    "24fps",
+    "clear face details",
+)
+
+# (state value, emotion value or None)
+StateKey = Tuple[str, Optional[str]]
+
+
+def compose_state_prompt(
+    base_appearance: str,
+    state_type: StateType,
+    action: str,
+    include_technical: bool = True
+) -> str:
+    """
+    Assemble a state prompt from its appearance and action
+
+    Args:
+        base_appearance: Appearance prefix
+        state_type: State the clip shows
+        action: Action/pose description
+        include_technical: Include technical parameters
+
+    Returns:
+        Complete prompt string
+    """
+    prompt_parts = [
+        base_appearance,
+        action,
+        "white background" if state_type != StateType.DEFAULT else "",
+        *MOTION_PARTS
+    ]
+    if include_technical:
+        prompt_parts.extend(TECHNICAL_PARTS)
+    return ", ".join(filter(None, prompt_parts))
+
+
+@dataclass(frozen=True)
+class PromptTable:
+    """
+    Every state and transition prompt of one profile, rendered up front
+
+    Tables are keyed by enum values, so lookups avoid the Python-level
+    Enum __hash__.
+
+    Attributes:
+        base_appearance: Appearance prefix shared by all prompts
+        actions: Action description per (state, emotion)
+        states: Prompt per (state, emotion), with technical parameters
+        states_plain: Prompt per (state, emotion), without technical parameters
+        transitions: Prompt per (from state, to state)
+    """
+    base_appearance: str
+    actions: Mapping[StateKey, str]
+    states: Mapping[StateKey, str]
+    states_plain: Mapping[StateKey, str]
+    transitions: Mapping[Tuple[str, str], str]
 
 
 class PromptGenerator:
     """
     Generates prompts for video generation based on character states
 
-    Combines character appearance, state requirements, and technical parameters
+    Combines character appearance, state requirements, and technical parameters.
+    All state and transition prompts are rendered once per profile revision
+    into a PromptTable, so generating a prompt is a dictionary lookup.
+
+    With a TemplateLibrary, actions come from template files (e.g.
+    prompts/emotions/happy.txt) where they exist, falling back to the
+    built-in STATE_ACTIONS/EMOTION_ACTIONS/TRANSITION_ACTIONS; the table is
+    rebuilt when a template changes.
     """
 
-    def __init__(self, character_profile: CharacterProfile):
+    def __init__(self, character_profile: CharacterProfile, templates: Optional[TemplateLibrary] = None):
         """
         Initialize prompt generator
 
         Args:
             character_profile: Character profile with appearance info
+            templates: Template files overriding the built-in action texts
         """
-        self.profile = character_profile
-        self.base_appearance = self._get_base_appearance()
+        self._profile = character_profile
+        self.templates = templates
+        self._table: Optional[PromptTable] = None
+        self._table_revision = -1
+        self._table_generation = -1
+
+    @property
+    def profile(self) -> CharacterProfile:
+        """Character profile prompts are generated for"""
+        return self._profile
+
+    @profile.setter
+    def profile(self, character_profile: CharacterProfile) -> None:
+        self._profile = character_profile
+        self._table = None
+
+    @property
+    def table(self) -> PromptTable:
+        """Prompt table of the current profile, rebuilt when the profile changed"""
+        table = self._table
+        generation = self.templates.refresh() if self.templates is not None else 0
+        if (table is None or self._table_revision != self._profile.revision
+                or self._table_generation != generation):
+            self._table_revision = self._profile.revision
+            self._table_generation = generation
+            table = self._table = self._compile_table()
+        return table
+
+    @property
+    def base_appearance(self) -> str:
+        """Base appearance description from character profile"""
+        return self.table.base_appearance
+
+    def invalidate(self) -> None:
+        """Drop the prompt table so it is rebuilt on next use"""
+        self._table = None
 
     def _get_base_appearance(self) -> str:
         """Get base appearance description from character profile"""
@@ -36,6 +231,47 @@ class PromptGenerator:
             f"{appearance.get('hairstyle', '')}"
         )
 
+    def _action(self, template_name: Optional[str], default: str) -> str:
+        """Render an action template if it exists, else use the built-in text"""
+        if self.templates is None or template_name is None:
+            return default
+        template = self.templates.lookup(template_name)
+        return default if template is None else template.render(self._profile)
+
+    def _compile_table(self) -> PromptTable:
+        """Render every (state, emotion) and transition prompt of the profile"""
+        base_appearance = self._get_base_appearance()
+
+        actions: Dict[StateKey, str] = {}
+        states: Dict[StateKey, str] = {}
+        states_plain: Dict[StateKey, str] = {}
+        for state_type in StateType:
+            for emotion in [None, *EmotionType]:
+                key = (state_type._value_, emotion._value_ if emotion else None)
+                if state_type == StateType.EMOTION:
+                    action = EMOTION_ACTIONS.get(emotion, "") if emotion else ""
+                else:
+                    action = STATE_ACTIONS.get(state_type, "")
+                action = self._action(state_template_name(state_type, emotion), action)
+
+                actions[key] = action
+                states_plain[key] = compose_state_prompt(base_appearance, state_type, action, False)
+                states[key] = compose_state_prompt(base_appearance, state_type, action, True)
+
+        transitions = {
+            (from_state._value_, to_state._value_):
+                f"{base_appearance}, {self._action(transition_template_name(from_state, to_state), action)}"
+            for (from_state, to_state), action in TRANSITION_ACTIONS.items()
+        }
+
+        return PromptTable(
+            base_appearance=base_appearance,
+            actions=MappingProxyType(actions),
+            states=MappingProxyType(states),
+            states_plain=MappingProxyType(states_plain),
+            transitions=MappingProxyType(transitions)
+        )
+
     def generate_state_prompt(
         self,
         state: CharacterState,
@@ -51,29 +287,10 @@ class PromptGenerator:
         Returns:
             Complete prompt string
         """
-        # Get state-specific action/pose
-        action = self._get_state_action(state)
-
-        # Build prompt parts
-        prompt_parts = [
-            self.base_appearance,
-            action,
-            "white background" if state.state_type != StateType.DEFAULT else "",
-            "camera fixed, no camera movement",
-            "smooth animation, no distortion, no frame skipping"
-        ]
-
-        if include_technical:
-            prompt_parts.extend([
-                "9:16 aspect ratio",
-                "high quality, 2K resolution",
-                "24fps",
-                "clear face details"
-            ])
-
-        # Filter empty parts and join
-        prompt = ", ".join(filter(None, prompt_parts))
-        return prompt
+        table = self.table
+        prompts = table.states if include_technical else table.states_plain
+        emotion = state.emotion
+        return prompts[(state.state_type._value_, emotion._value_ if emotion else None)]
 
     def _get_state_action(self, state: CharacterState) -> str:
         """
@@ -85,77 +302,8 @@ class PromptGenerator:
         Returns:
             Action description string
         """
-        actions = {
-            StateType.DEFAULT: (
-                "girl looking to the left side, facing left, "
-                "two arms behind back, body still, "
-                "occasionally blinks, hair gently blown by wind"
-            ),
-            StateType.LISTENING: (
-                "create a 5s video, girl's hair naturally blown by wind, "
-                "blinks occasionally"
-            ),
-            StateType.SPEAKING: (
-                "girl is speaking, hair naturally blown by wind, "
-                "occasionally blinks, head can naturally tilt slightly, "
-                "very small movements"
-            ),
-            StateType.LEAVING: (
-                "girl quickly leaves the frame, runs out from the right side, "
-                "only pure white background left, smooth natural motion, "
-                "no distortion, smooth running pose"
-            ),
-            StateType.ENTERING: (
-                "create a 5s video, first frame has no person, "
-                "only pure white background, then person peeks from left edge, "
-                "then walks into frame, facing camera, "
-                "throughout process person's frame proportion unchanged, "
-                "person details remain consistent"
-            ),
-        }
-
-        # Handle emotion states
-        if state.state_type == StateType.EMOTION and state.emotion:
-            emotion_actions = {
-                EmotionType.NEUTRAL: actions[StateType.LISTENING],
-                EmotionType.HAPPY: (
-                    "create a 5s video, girl happily smiles, blushing, "
-                    "tilts head, camera fixed"
-                ),
-                EmotionType.SHY: (
-                    "Shot 1: girl hears something and looks down shyly, blushing. "
-                    "Shot 2: girl returns from shy to calm state"
-                ),
-                EmotionType.SURPRISED: (
-                    "girl looks like she was frightened by something, "
-                    "surprised expression, body jolts, steps back two steps, "
-                    "shoulders raised, looks around nervously"
-                ),
-                EmotionType.SMUG: (
-                    "girl crosses arms in front of chest, "
-                    "confident and proud look, then lowers arms"
-                ),
-                EmotionType.ANGRY: (
-                    "girl is angry, teeth clenched, frowning, "
-                    "then returns to calm"
-                ),
-                EmotionType.CONFUSED: (
-                    "girl frowns, serious expression, very confused look, "
-                    "one hand on chin, as if thinking about something, "
-                    "camera fixed"
-                ),
-                EmotionType.SAD: (
-                    "girl frowns, takes a deep breath, "
-                    "slightly lowers head, eyes looking down"
-                ),
-                EmotionType.SLEEPY: (
-                    "girl looks very tired, eyes about to close, "
-                    "head drooping down, body slightly swaying"
-                ),
-            }
-            return emotion_actions.get(state.emotion, "")
-
-        return actions.get(state.state_type, "")
+        emotion = state.emotion
+        return self.table.actions[(state.state_type._value_, emotion._value_ if emotion else None)]
 
     def generate_transition_prompt(
         self,
@@ -172,22 +320,7 @@ class PromptGenerator:
         Returns:
             Transition prompt string
         """
-        transition_prompts = {
-            (StateType.DEFAULT, StateType.LISTENING): (
-                f"{self.base_appearance}, "
-                "girl turns from left side to front, looking at camera, "
-                "hands at body sides, smooth natural motion, "
-                "no distortion, no frame skipping"
-            ),
-            (StateType.LISTENING, StateType.DEFAULT): (
-                f"{self.base_appearance}, "
-                "girl turns from front to left side, hands behind back, "
-                "smooth natural motion, no distortion, no frame skipping"
-            ),
-        }
-
-        key = (from_state, to_state)
-        return transition_prompts.get(key, "")
+        return self.table.transitions.get((from_state._value_, to_state._value_), "")
 
     def generate_image_prompt(self, with_background: bool = False) -> str:
         """
@@ -228,37 +361,40 @@ class PromptGenerator:
 
         return ", ".join(filter(None, parts))
 
-    def save_prompts_to_file(self, output_dir: str) -> None:
+    def get_prompt_files(self) -> Dict[str, str]:
         """
-        Save all prompts to text files
+        Get every prompt keyed by its export file path
 
-        Args:
-            output_dir: Directory to save prompt files
+        Returns:
+            Prompt text per path (character_image.txt, <state>_state.txt, emotions/<emotion>.txt)
         """
-        output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
-
-        # Save image prompt
-        with open(output_path / "character_image.txt", 'w', encoding='utf-8') as f:
-            f.write(self.generate_image_prompt(with_background=True))
-
-        # Save state prompts
+        files = {"character_image.txt": self.generate_image_prompt(with_background=True)}
         for state_type in StateType:
-            state = CharacterState(state_type)
-            prompt = self.generate_state_prompt(state)
-            filename = f"{state_type.value}_state.txt"
-            with open(output_path / filename, 'w', encoding='utf-8') as f:
-                f.write(prompt)
-
-        # Save emotion prompts
-        emotions_dir = output_path / "emotions"
-        emotions_dir.mkdir(exist_ok=True)
+            files[f"{state_type.value}_state.txt"] = self.generate_state_prompt(get_character_state(state_type))
         for emotion in EmotionType:
-            state = CharacterState(StateType.EMOTION, emotion=emotion)
-            prompt = self.generate_state_prompt(state)
-            filename = f"{emotion.value}.txt"
-            with open(emotions_dir / filename, 'w', encoding='utf-8') as f:
-                f.write(prompt)
+            state = get_character_state(StateType.EMOTION, emotion)
+            files[f"emotions/{emotion.value}.txt"] = self.generate_state_prompt(state)
+        return files
+
+    def save_prompts_to_file(self, output_dir: str, workers: int = 8) -> PromptExportResult:
+        """
+        Save all prompts to text files
+
+        Files whose content is unchanged are not rewritten; changed files
+        are replaced atomically. Rendered prompts must not go into the
+        template directory they are rendered from, or the next render would
+        read them back as templates.
+
+        Args:
+            output_dir: Directory to save prompt files (e.g. output/prompts)
+            workers: Threads writing files in parallel
+
+        Returns:
+            PromptExportResult listing written and unchanged files
+        """
+        if self.templates is not None and os.path.abspath(output_dir) == os.path.abspath(self.templates.root):
+            raise ValueError(f"Cannot export prompts into the template directory: {output_dir}")
+        return export_prompt_files(self.get_prompt_files(), output_dir, workers=workers)
 
     def __repr__(self) -> str:
         return f"PromptGenerator(character='{self.profile.nickname}')"
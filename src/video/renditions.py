@@ -0,0 +1,165 @@
+"""
+Rendition Ladder
+Defines per-device output renditions and builds single-decode encode plans
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any
+from ..device.device_manager import DeviceType
+
+
+@dataclass(frozen=True)
+class Rendition:
+    """
+    A single encoded output target
+
+    Attributes:
+        name: Rendition name, used as the output file suffix
+        width: Output width in pixels
+        height: Output height in pixels
+        video_bitrate: Target video bitrate (ffmpeg notation, e.g. "800k")
+        frame_rate: Output frame rate
+        profile: H.264 profile (baseline/main/high)
+        faststart: Move the moov atom to the front for progressive web playback
+    """
+    name: str
+    width: int
+    height: int
+    video_bitrate: str
+    frame_rate: int = 24
+    profile: str = "high"
+    faststart: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Rendition":
+        """Create rendition from a config dictionary"""
+        return cls(
+            name=data['name'],
+            width=int(data['width']),
+            height=int(data['height']),
+            video_bitrate=str(data['video_bitrate']),
+            frame_rate=int(data.get('frame_rate', 24)),
+            profile=data.get('profile', 'high'),
+            faststart=bool(data.get('faststart', False))
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert rendition to dictionary"""
+        return {
+            'name': self.name,
+            'width': self.width,
+            'height': self.height,
+            'video_bitrate': self.video_bitrate,
+            'frame_rate': self.frame_rate,
+            'profile': self.profile,
+            'faststart': self.faststart
+        }
+
+
+# Default ladder: low-end hardware gets a small baseline-profile stream,
+# web gets faststart files that can start playing before fully downloaded
+DEFAULT_LADDER: Dict[DeviceType, List[Rendition]] = {
+    DeviceType.HARDWARE: [
+        Rendition("480p", 544, 960, "600k", profile="baseline"),
+    ],
+    DeviceType.MOBILE: [
+        Rendition("720p", 720, 1280, "1500k", profile="main"),
+        Rendition("480p", 544, 960, "600k", profile="baseline"),
+    ],
+    DeviceType.DESKTOP: [
+        Rendition("1080p", 1088, 1920, "4000k"),
+    ],
+    DeviceType.WEB: [
+        Rendition("720p_web", 720, 1280, "1500k", profile="main", faststart=True),
+        Rendition("480p_web", 544, 960, "600k", profile="baseline", faststart=True),
+    ],
+}
+
+
+class RenditionLadder:
+    """
+    Maps device types to the renditions they should download
+
+    The first rendition listed for a device is its preferred one.
+    """
+
+    def __init__(self, ladder: Optional[Dict[DeviceType, List[Rendition]]] = None):
+        """
+        Initialize rendition ladder
+
+        Args:
+            ladder: Mapping of device type to renditions (defaults to DEFAULT_LADDER)
+        """
+        self.ladder: Dict[DeviceType, List[Rendition]] = dict(ladder or DEFAULT_LADDER)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RenditionLadder":
+        """
+        Build ladder from the "renditions" section of video_params.json
+
+        Args:
+            config: Full video parameters dictionary
+
+        Returns:
+            Rendition ladder (default ladder if section is missing)
+        """
+        section = config.get('renditions')
+        if not section:
+            return cls()
+
+        ladder = {
+            DeviceType(device): [Rendition.from_dict(item) for item in items]
+            for device, items in section.items()
+        }
+        return cls(ladder)
+
+    def get_renditions(self, device_type: DeviceType) -> List[Rendition]:
+        """Get renditions for a device type"""
+        return self.ladder.get(device_type, [])
+
+    def unique_renditions(self) -> List[Rendition]:
+        """
+        Get every distinct rendition across all devices
+
+        Renditions shared by several devices are encoded only once.
+
+        Returns:
+            List of unique renditions, in first-seen order
+        """
+        seen: Dict[str, Rendition] = {}
+        for renditions in self.ladder.values():
+            for rendition in renditions:
+                existing = seen.get(rendition.name)
+                if existing is not None and existing != rendition:
+                    raise ValueError(f"Conflicting definitions for rendition: {rendition.name}")
+                seen[rendition.name] = rendition
+        return list(seen.values())
+
+    def build_manifest(self, clip_outputs: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Build per-device manifest from encoded clip outputs
+
+        Args:
+            clip_outputs: Mapping of clip name to {rendition name: output path}
+
+        Returns:
+            Manifest dictionary keyed by device type
+        """
+        devices = {}
+        for device_type, renditions in self.ladder.items():
+            clips = {}
+            for clip_name, outputs in clip_outputs.items():
+                available = [r.name for r in renditions if r.name in outputs]
+                if available:
+                    clips[clip_name] = {name: outputs[name] for name in available}
+
+            devices[device_type.value] = {
+                'preferred_rendition': renditions[0].name if renditions else None,
+                'renditions': [r.to_dict() for r in renditions],
+                'clips': clips
+            }
+
+        return {'devices': devices}
+
+    def __repr__(self) -> str:
+        return f"RenditionLadder({len(self.ladder)} devices, {len(self.unique_renditions())} renditions)"
@@ -0,0 +1,281 @@
+"""
+Prompt Sweep
+Lazily enumerates prompt variants over profile fields and state actions
+"""
+
+import hashlib
+from collections.abc import Mapping
+from dataclasses import dataclass
+from itertools import product
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..state.states import CharacterState, StateType, EmotionType, get_character_state, get_state_config
+from ..character.profile import CharacterProfile
+from .generator import VideoGenerator, VideoGenerationRequest
+from .prompts import PromptGenerator, compose_state_prompt
+from .templates import PromptTemplate, TemplateLibrary
+
+
+SWEEP_SECTIONS = ("appearance", "character")
+
+
+@dataclass(frozen=True)
+class PromptVariant:
+    """
+    One combination of a sweep
+
+    Attributes:
+        index: Position in the sweep's cartesian product
+        state: State the clip shows
+        overrides: (field path, value) pairs applied to the profile
+        action: Action wording used instead of the default, if varied
+        prompt: Rendered prompt
+    """
+    index: int
+    state: CharacterState
+    overrides: Tuple[Tuple[str, Any], ...]
+    action: Optional[str]
+    prompt: str
+
+    @property
+    def label(self) -> str:
+        """File-name friendly identifier (e.g. happy_0007)"""
+        return f"{self.state.get_video_name()}_{self.index:04d}"
+
+
+@dataclass(frozen=True)
+class SweepEstimate:
+    """
+    Rough size and cost of a sweep before submitting it
+
+    Attributes:
+        combinations: Variants in the cartesian product
+        unique: Variants with distinct prompt text
+        duplicates: Variants whose prompt repeats an earlier one
+        video_seconds: Seconds of video the unique variants generate
+        cost: video_seconds times the cost per second
+    """
+    combinations: int
+    unique: int
+    duplicates: int
+    video_seconds: float
+    cost: float
+
+
+class PromptSweep:
+    """
+    Cartesian product of profile field values, states and action wordings
+
+    Variants are generated lazily, one profile combination at a time, so a
+    sweep never materializes the full product. Variants of a state whose
+    prompt renders to text already produced for that state (e.g. when a
+    varied field does not appear in its prompt) are reported once by
+    unique() and only unique prompts are submitted.
+    """
+
+    def __init__(
+        self,
+        profile: CharacterProfile,
+        states: Optional[List[CharacterState]] = None,
+        templates: Optional[TemplateLibrary] = None
+    ):
+        """
+        Initialize sweep
+
+        Args:
+            profile: Base character profile
+            states: States to generate (defaults to every state and emotion clip)
+            templates: Prompt templates for the default action wording
+        """
+        self.profile = profile
+        self.templates = templates
+        if states is None:
+            states = [get_character_state(state_type) for state_type in StateType
+                      if state_type not in (StateType.EMOTION, StateType.EMPTY)]
+            states += [get_character_state(StateType.EMOTION, emotion) for emotion in EmotionType]
+        self.states = list(states)
+        self.fields: Dict[str, List[Any]] = {}
+        self.actions: Dict[CharacterState, List[PromptTemplate]] = {}
+
+    def vary(self, field: str, values: Iterable[Any]) -> "PromptSweep":
+        """
+        Sweep a profile field
+
+        Args:
+            field: Dotted path, e.g. "appearance.clothing" or "appearance.art_style"
+            values: Values to try
+
+        Returns:
+            This sweep, for chaining
+        """
+        section, _, rest = field.partition(".")
+        if section not in SWEEP_SECTIONS or not rest:
+            raise ValueError(f"Sweep field must be appearance.<field> or character.<field>: {field}")
+        values = list(values)
+        if not values:
+            raise ValueError(f"No values to sweep for {field}")
+        self.fields[field] = values
+        return self
+
+    def vary_action(self, state: CharacterState, actions: Iterable[str]) -> "PromptSweep":
+        """
+        Sweep the action wording of a state
+
+        Args:
+            state: State whose action is varied (added to the sweep if missing)
+            actions: Action texts; may use {appearance.*}/{character.*} placeholders
+
+        Returns:
+            This sweep, for chaining
+        """
+        templates = [PromptTemplate(action) for action in actions]
+        if not templates:
+            raise ValueError(f"No actions to sweep for {state}")
+        self.actions[state] = templates
+        if state not in self.states:
+            self.states.append(state)
+        return self
+
+    def __len__(self) -> int:
+        """Number of variants in the cartesian product"""
+        profiles = 1
+        for values in self.fields.values():
+            profiles *= len(values)
+        per_profile = sum(len(self.actions.get(state, ())) or 1 for state in self.states)
+        return profiles * per_profile
+
+    def variants(self) -> Iterator[PromptVariant]:
+        """
+        Generate every variant of the product, duplicates included
+
+        Yields:
+            PromptVariant in product order
+        """
+        index = 0
+        names = list(self.fields)
+        for values in product(*self.fields.values()):
+            overrides = tuple(zip(names, values))
+            profile = _apply_overrides(self.profile, overrides)
+            generator = PromptGenerator(profile, self.templates)
+
+            for state in self.states:
+                actions = self.actions.get(state)
+                if not actions:
+                    yield PromptVariant(index, state, overrides, None, generator.generate_state_prompt(state))
+                    index += 1
+                    continue
+                base_appearance = generator.base_appearance
+                for template in actions:
+                    action = template.render(profile)
+                    prompt = compose_state_prompt(base_appearance, state.state_type, action)
+                    yield PromptVariant(index, state, overrides, action, prompt)
+                    index += 1
+
+    def unique(self) -> Iterator[PromptVariant]:
+        """
+        Generate variants with distinct prompt text only
+
+        Within a state, variants with the same prompt and clip duration
+        would generate the same video. Different states are never merged,
+        even when their prompts match (e.g. the neutral emotion and
+        listening), since each needs its own clip. Only a 16-byte digest
+        per distinct prompt is kept in memory.
+
+        Yields:
+            First variant of each distinct prompt per state
+        """
+        seen = set()
+        for variant in self.variants():
+            key = f"{variant.state.get_video_name()}\0{_duration(variant.state)}\0{variant.prompt}"
+            digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+            if digest not in seen:
+                seen.add(digest)
+                yield variant
+
+    def estimate(self, cost_per_second: float = 1.0) -> SweepEstimate:
+        """
+        Count unique prompts and the video they would generate
+
+        Args:
+            cost_per_second: Cost of one second of generated video
+
+        Returns:
+            SweepEstimate
+        """
+        unique = 0
+        seconds = 0.0
+        for variant in self.unique():
+            unique += 1
+            seconds += _duration(variant.state)
+        combinations = len(self)
+        return SweepEstimate(combinations, unique, combinations - unique, seconds, seconds * cost_per_second)
+
+    def submit(
+        self,
+        generator: VideoGenerator,
+        output_dir: str,
+        cost_per_second: float = 1.0,
+        max_cost: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Send unique prompts to the video generator
+
+        Args:
+            generator: Video generator
+            output_dir: Directory for generated clips (<label>.mp4)
+            cost_per_second: Cost of one second of generated video
+            max_cost: Refuse to submit a sweep estimated above this cost
+
+        Returns:
+            Generation result per submitted variant, with its label and overrides
+        """
+        estimate = self.estimate(cost_per_second)
+        if max_cost is not None and estimate.cost > max_cost:
+            raise ValueError(
+                f"Sweep estimated at {estimate.cost:.2f} ({estimate.unique} unique prompts) "
+                f"exceeds max cost {max_cost:.2f}"
+            )
+
+        output_path = Path(output_dir)
+        results = []
+        for variant in self.unique():
+            request = VideoGenerationRequest(
+                prompt=variant.prompt,
+                state=variant.state,
+                duration=_duration(variant.state),
+                model=generator.default_model
+            )
+            is_valid, error = generator.validate_request(request)
+            if not is_valid:
+                results.append({'success': False, 'label': variant.label, 'error': error})
+                continue
+            result = generator.generate_video(request, str(output_path / f"{variant.label}.mp4"))
+            result.update(label=variant.label, overrides=dict(variant.overrides), action=variant.action)
+            results.append(result)
+        return results
+
+    def __repr__(self) -> str:
+        return f"PromptSweep({len(self.fields)} fields, {len(self.actions)} actions, {len(self)} variants)"
+
+
+def _duration(state: CharacterState) -> float:
+    """Clip duration of a state"""
+    return float(get_state_config(state.state_type, state.emotion).get('duration', 5.0))
+
+
+def _apply_overrides(profile: CharacterProfile, overrides: Tuple[Tuple[str, Any], ...]) -> CharacterProfile:
+    """Copy of a profile with field overrides, sharing every untouched section"""
+    variant = CharacterProfile()
+    variant.config_path = profile.config_path
+    data = dict(profile.data)
+    for field, value in overrides:
+        section, *keys = field.split(".")
+        node = data[section] = dict(data.get(section, {}))
+        for key in keys[:-1]:
+            child = node.get(key)
+            node[key] = dict(child) if isinstance(child, Mapping) else {}
+            node = node[key]
+        node[keys[-1]] = value
+    variant.data = data
+    return variant
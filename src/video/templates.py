@@ -0,0 +1,251 @@
+"""
+Prompt Templates
+File-backed prompt templates with {appearance.*}/{character.*} placeholders
+"""
+
+import hashlib
+import os
+import re
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from ..state.states import StateType, EmotionType
+from ..character.profile import CharacterProfile
+
+
+# {section.field} or {section.field.subfield}; other braces are literal text
+PLACEHOLDER = re.compile(r"\{(appearance|character)((?:\.[A-Za-z0-9_]+)+)\}")
+
+# Literal text or (section, field path)
+TemplatePart = Union[str, Tuple[str, Tuple[str, ...]]]
+
+# Template files of states whose clip is described under transitions/
+STATE_TEMPLATE_NAMES: Dict[StateType, str] = {
+    StateType.DEFAULT: "default_state",
+    StateType.LISTENING: "listening_state",
+    StateType.SPEAKING: "speaking_state",
+    StateType.ENTERING: "transitions/enter",
+    StateType.LEAVING: "transitions/leave",
+}
+
+
+def state_template_name(state_type: StateType, emotion: Optional[EmotionType] = None) -> Optional[str]:
+    """
+    Get the template name of a state's action
+
+    Args:
+        state_type: State type
+        emotion: Emotion of the emotion state
+
+    Returns:
+        Name relative to the template root without ".txt", or None if the state has no template
+    """
+    if state_type == StateType.EMOTION:
+        return f"emotions/{emotion.value}" if emotion else None
+    return STATE_TEMPLATE_NAMES.get(state_type)
+
+
+def transition_template_name(from_state: StateType, to_state: StateType) -> str:
+    """Get the template name of a transition's motion (e.g. transitions/default2listening)"""
+    return f"transitions/{from_state.value}2{to_state.value}"
+
+
+class PromptTemplate:
+    """
+    Prompt text compiled into literal parts and placeholders
+
+    Placeholders name a field of the profile's appearance or character
+    section, e.g. {appearance.clothing} or {character.personality.traits}.
+    Missing fields render as empty text and lists are joined with ", ".
+    """
+
+    __slots__ = ("text", "parts", "fields")
+
+    def __init__(self, text: str):
+        """
+        Compile template
+
+        Args:
+            text: Template text
+        """
+        self.text = text
+        parts: List[TemplatePart] = []
+        position = 0
+        for match in PLACEHOLDER.finditer(text):
+            if match.start() > position:
+                parts.append(text[position:match.start()])
+            parts.append((match.group(1), tuple(match.group(2)[1:].split("."))))
+            position = match.end()
+        if position < len(text):
+            parts.append(text[position:])
+        self.parts = tuple(parts)
+        self.fields = tuple(part for part in self.parts if not isinstance(part, str))
+
+    def render(self, profile: CharacterProfile) -> str:
+        """
+        Fill placeholders from a profile
+
+        Args:
+            profile: Character profile
+
+        Returns:
+            Rendered text
+        """
+        if not self.fields:
+            return self.text
+
+        sections = {
+            'appearance': profile.get_appearance_info(),
+            'character': profile.get_character_info(),
+        }
+        rendered = []
+        for part in self.parts:
+            if isinstance(part, str):
+                rendered.append(part)
+                continue
+            value: Any = sections[part[0]]
+            for key in part[1]:
+                value = value.get(key) if isinstance(value, Mapping) else None
+            if isinstance(value, (list, tuple)):
+                value = ", ".join(str(item) for item in value)
+            rendered.append("" if value is None else str(value))
+        return "".join(rendered)
+
+    def __repr__(self) -> str:
+        return f"PromptTemplate({len(self.parts)} parts, {len(self.fields)} placeholders)"
+
+
+class _Entry:
+    """Cached template file: stat signature, content hash and compiled template"""
+
+    __slots__ = ("signature", "digest", "template")
+
+    def __init__(self):
+        self.signature: Optional[Tuple[int, int]] = None
+        self.digest: Optional[str] = None
+        self.template: Optional[PromptTemplate] = None
+
+
+class TemplateLibrary:
+    """
+    Prompt templates loaded lazily from a directory tree (prompts/ by default)
+
+    A template is read and compiled the first time it is asked for. Loaded
+    templates are revalidated at most once per check_interval: a file
+    whose mtime or size changed is re-read, and only recompiled if its
+    content hash changed too. Each effective change bumps `generation`,
+    which PromptGenerator uses to rebuild its prompt table.
+    """
+
+    def __init__(self, root: str = "prompts", check_interval: float = 1.0):
+        """
+        Initialize library
+
+        Args:
+            root: Template directory; name "emotions/happy" is <root>/emotions/happy.txt
+            check_interval: Minimum seconds between revalidations (0 checks on every use)
+        """
+        self.root = Path(root)
+        self.check_interval = check_interval
+        self.generation = 0
+        self._entries: Dict[str, _Entry] = {}
+        self._checked_at = time.monotonic()
+
+    def get(self, name: str) -> Optional[PromptTemplate]:
+        """
+        Get a compiled template
+
+        Args:
+            name: Template name relative to the root, without ".txt"
+
+        Returns:
+            Compiled template, or None if the file does not exist
+        """
+        self.refresh()
+        return self.lookup(name)
+
+    def lookup(self, name: str) -> Optional[PromptTemplate]:
+        """
+        Get a compiled template without revalidating loaded ones
+
+        Args:
+            name: Template name relative to the root, without ".txt"
+
+        Returns:
+            Compiled template, or None if the file does not exist
+        """
+        entry = self._entries.get(name)
+        if entry is None:
+            entry = self._entries[name] = _Entry()
+            self._revalidate(name, entry)
+        return entry.template
+
+    def render(self, name: str, profile: CharacterProfile) -> Optional[str]:
+        """
+        Render a template for a profile
+
+        Args:
+            name: Template name
+            profile: Character profile
+
+        Returns:
+            Rendered text, or None if the template does not exist
+        """
+        template = self.get(name)
+        return template.render(profile) if template is not None else None
+
+    def refresh(self, force: bool = False) -> int:
+        """
+        Revalidate loaded templates if check_interval has passed
+
+        Args:
+            force: Revalidate regardless of check_interval
+
+        Returns:
+            Current generation
+        """
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return self.generation
+        self._checked_at = now
+
+        changed = False
+        for name, entry in self._entries.items():
+            changed |= self._revalidate(name, entry)
+        if changed:
+            self.generation += 1
+        return self.generation
+
+    def _revalidate(self, name: str, entry: _Entry) -> bool:
+        """Reload a template file if it changed; True if its content changed"""
+        path = self.root / f"{name}.txt"
+        try:
+            stat = os.stat(path)
+        except OSError:
+            if entry.signature is None and entry.template is None:
+                return False
+            entry.signature = entry.digest = entry.template = None
+            return True
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == entry.signature:
+            return False
+        entry.signature = signature
+
+        with open(path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+        if digest == entry.digest:
+            return False
+
+        entry.digest = digest
+        entry.template = PromptTemplate(content.decode('utf-8').strip())
+        return True
+
+    def __len__(self) -> int:
+        return sum(1 for entry in self._entries.values() if entry.template is not None)
+
+    def __repr__(self) -> str:
+        return f"TemplateLibrary('{self.root}', {len(self)} loaded, generation={self.generation})"
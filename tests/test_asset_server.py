@@ -0,0 +1,154 @@
+"""
+Tests for the asset server, including a concurrent load test
+"""
+
+import asyncio
+import hashlib
+import random
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.assets import AssetServer, BundleWriter
+from src.assets.server import parse_range
+
+
+CLIP_DATA = bytes(random.Random(7).getrandbits(8) for _ in range(256 * 1024))
+
+
+async def fetch(port, path, headers=None):
+    """Send one GET and return (status, headers, body)"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    lines = [f"GET {path} HTTP/1.1", "Host: localhost", "Connection: close"]
+    lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+    await writer.drain()
+
+    head = await reader.readuntil(b"\r\n\r\n")
+    status_line, *header_lines = head.decode().strip().split("\r\n")
+    response_headers = {}
+    for line in header_lines:
+        key, _, value = line.partition(":")
+        response_headers[key.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(response_headers.get('content-length', 0)))
+    writer.close()
+    await writer.wait_closed()
+    return int(status_line.split()[1]), response_headers, body
+
+
+def run_with_server(source, scenario):
+    """Start a server on a free port, run scenario(port), then shut down"""
+    async def runner():
+        server = AssetServer(str(source), port=0)
+        _, port = await server.start()
+        try:
+            return await scenario(port)
+        finally:
+            await server.close()
+    return asyncio.run(runner())
+
+
+@pytest.fixture
+def clip_dir(tmp_path):
+    """Directory with one clip"""
+    (tmp_path / "listening.mp4").write_bytes(CLIP_DATA)
+    return tmp_path
+
+
+class TestAssetServer:
+    """Test HTTP semantics of the asset server"""
+
+    def test_range_and_etag(self, clip_dir):
+        """Test 206 partial responses and strong content-hash ETag"""
+        async def scenario(port):
+            status, headers, body = await fetch(port, "/listening.mp4", {"Range": "bytes=100-199"})
+            assert status == 206
+            assert body == CLIP_DATA[100:200]
+            assert headers['content-range'] == f"bytes 100-199/{len(CLIP_DATA)}"
+            assert headers['etag'] == f'"{hashlib.sha256(CLIP_DATA).hexdigest()}"'
+
+            status, _, body = await fetch(port, "/listening.mp4", {"If-None-Match": headers['etag']})
+            assert status == 304 and body == b""
+
+            status, _, _ = await fetch(port, "/listening.mp4", {"Range": f"bytes={len(CLIP_DATA)}-"})
+            assert status == 416
+
+            status, _, _ = await fetch(port, "/../etc/passwd")
+            assert status == 404
+
+        run_with_server(clip_dir, scenario)
+
+    def test_bundle_source(self, clip_dir, tmp_path):
+        """Test clips are served straight out of a bundle"""
+        writer = BundleWriter()
+        writer.add_clip('listening', str(clip_dir / "listening.mp4"))
+        bundle_path = tmp_path / "character.bundle"
+        writer.write(str(bundle_path))
+
+        async def scenario(port):
+            status, _, body = await fetch(port, "/listening", {"Range": "bytes=-10"})
+            assert status == 206
+            assert body == CLIP_DATA[-10:]
+            status, _, body = await fetch(port, "/listening.mp4")
+            assert status == 200 and body == CLIP_DATA
+
+        run_with_server(bundle_path, scenario)
+
+    def test_concurrent_clients(self, clip_dir):
+        """Load test: many concurrent clients fetching random ranges"""
+        rng = random.Random(42)
+        ranges = []
+        for _ in range(200):
+            start = rng.randrange(len(CLIP_DATA))
+            ranges.append((start, min(len(CLIP_DATA) - 1, start + rng.randrange(1, 64 * 1024))))
+
+        async def scenario(port):
+            results = await asyncio.gather(*[
+                fetch(port, "/listening.mp4", {"Range": f"bytes={start}-{end}"})
+                for start, end in ranges
+            ])
+            for (start, end), (status, _, body) in zip(ranges, results):
+                assert status in (200, 206)
+                assert body == CLIP_DATA[start:end + 1]
+
+        run_with_server(clip_dir, scenario)
+
+    def test_internal_error_returns_500(self, clip_dir):
+        """Test a failing request gets a 500 and the server keeps serving"""
+        async def runner():
+            server = AssetServer(str(clip_dir), port=0)
+            _, port = await server.start()
+            get_file_etag = server._get_file_etag
+
+            async def failing(path, stat):
+                raise RuntimeError("boom")
+
+            try:
+                server._get_file_etag = failing
+                status, headers, _ = await fetch(port, "/listening.mp4")
+                assert status == 500 and headers['connection'] == "close"
+
+                server._get_file_etag = get_file_etag
+                status, _, body = await fetch(port, "/listening.mp4")
+                assert status == 200 and body == CLIP_DATA
+            finally:
+                await server.close()
+
+        asyncio.run(runner())
+
+
+def test_parse_range():
+    """Test Range header parsing"""
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-5", 100) == (95, 99)
+    assert parse_range("bytes=0-500", 100) == (0, 99)
+    assert parse_range("bytes=200-", 100) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=0-1,5-6", 100)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
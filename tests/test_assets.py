@@ -0,0 +1,170 @@
+"""
+Unit tests for asset packaging
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.assets import (
+    BundleWriter, BundleReader, BundleError, AssetManifest, AssetAvailability, clips_for_state
+)
+from src.state import StateType, EmotionType, CharacterState
+
+
+@pytest.fixture
+def clip_dir(tmp_path):
+    """Create a few fake clip files"""
+    clips = {
+        'listening': b"listening" * 1000,
+        'enter': b"enter" * 333,
+        'emotion_happy': b"\x00\x01happy" * 50,
+    }
+    for name, data in clips.items():
+        (tmp_path / f"{name}.mp4").write_bytes(data)
+    (tmp_path / "listening_first.png").write_bytes(b"PNGFIRST")
+    return tmp_path, clips
+
+
+class TestBundle:
+    """Test bundle packing and memory-mapped access"""
+
+    def test_round_trip(self, clip_dir, tmp_path):
+        """Test clips read back byte-identical with page-aligned offsets"""
+        directory, clips = clip_dir
+        writer = BundleWriter()
+        for name in clips:
+            first = directory / f"{name}_first.png"
+            writer.add_clip(name, str(directory / f"{name}.mp4"), first_thumb=str(first))
+        bundle_path = tmp_path / "character.bundle"
+        writer.write(str(bundle_path))
+
+        with BundleReader(str(bundle_path)) as reader:
+            assert len(reader) == 3
+            for name, data in clips.items():
+                entry = reader.get_entry(name)
+                assert entry.offset % reader.page_size == 0
+                view = reader.open_clip(name)
+                assert bytes(view) == data
+                view.release()
+                assert reader.verify(name)
+
+            thumb = reader.get_thumbnail('listening', 'first')
+            assert bytes(thumb) == b"PNGFIRST"
+            thumb.release()
+            assert reader.get_thumbnail('enter', 'last') is None
+
+    def test_missing_clip(self, clip_dir, tmp_path):
+        """Test unknown clip lookup raises KeyError"""
+        directory, _ = clip_dir
+        writer = BundleWriter()
+        writer.add_clip('enter', str(directory / "enter.mp4"))
+        bundle_path = tmp_path / "one.bundle"
+        writer.write(str(bundle_path))
+
+        with BundleReader(str(bundle_path)) as reader:
+            with pytest.raises(KeyError):
+                reader.open_clip('listening')
+
+    def test_rejects_non_bundle(self, tmp_path):
+        """Test reading a non-bundle file fails cleanly"""
+        path = tmp_path / "bad.bundle"
+        path.write_bytes(b"x" * 128)
+        with pytest.raises(BundleError):
+            BundleReader(str(path))
+
+
+    def test_rejects_truncated_bundle(self, clip_dir, tmp_path):
+        """Test a bundle cut anywhere in its index or payload fails with BundleError"""
+        directory, clips = clip_dir
+        writer = BundleWriter()
+        for name in clips:
+            first = directory / f"{name}_first.png"
+            writer.add_clip(name, str(directory / f"{name}.mp4"), first_thumb=str(first))
+        bundle_path = tmp_path / "character.bundle"
+        entries = writer.write(str(bundle_path))
+        data = bundle_path.read_bytes()
+        clip_end = max(entry.offset + entry.length for entry in entries)
+        thumb_end = max(sum(entry.first_thumb) for entry in entries)
+
+        truncated = tmp_path / "truncated.bundle"
+        for size in (70, 64 + 100, clip_end - 1, thumb_end - 1):
+            truncated.write_bytes(data[:size])
+            with pytest.raises(BundleError):
+                BundleReader(str(truncated))
+
+class TestManifest:
+    """Test content-hash manifests and delta sync"""
+
+    def test_diff_only_changed_clips(self, clip_dir):
+        """Test a device only downloads clips whose content changed"""
+        directory, _ = clip_dir
+        old = AssetManifest.from_directory("hoorii_001", str(directory))
+        assert old.diff(old).is_empty
+
+        (directory / "emotion_happy.mp4").write_bytes(b"regenerated")
+        (directory / "listening.mp4").write_bytes(b"regenerated too")
+        new = AssetManifest.from_directory("hoorii_001", str(directory))
+
+        diff = new.diff(old)
+        assert diff.changed == ["listening", "emotion_happy"]
+        assert diff.unchanged == 1
+        assert new.version != old.version
+
+    def test_download_order(self, clip_dir):
+        """Test fresh devices get listening first, preferred clips before it"""
+        directory, _ = clip_dir
+        manifest = AssetManifest.from_directory("hoorii_001", str(directory))
+
+        assert manifest.diff(None).changed == ["listening", "enter", "emotion_happy"]
+
+        preferred = clips_for_state(StateType.ENTERING)
+        assert manifest.diff(None, preferred).changed[0] == "enter"
+
+    def test_round_trip(self, clip_dir, tmp_path):
+        """Test manifest save/load and removed clips"""
+        directory, _ = clip_dir
+        manifest = AssetManifest.from_directory("hoorii_001", str(directory))
+        manifest.save(str(tmp_path / "manifest.json"))
+        loaded = AssetManifest.load(str(tmp_path / "manifest.json"))
+        assert loaded.entries == manifest.entries
+
+        del manifest.entries['enter']
+        assert manifest.diff(loaded).removed == ["enter"]
+
+
+class TestAvailability:
+    """Test progressive publishing and fallback resolution"""
+
+    def test_usable_on_partial_set(self, tmp_path):
+        """Test character is usable once listening and enter are published"""
+        availability = AssetAvailability(str(tmp_path))
+        availability.publish("listening", "listening.mp4")
+        assert not availability.is_usable()
+        availability.publish("enter", "enter.mp4")
+        assert availability.is_usable()
+        assert not availability.is_complete()
+        assert (tmp_path / "availability.json").exists()
+
+    def test_emotion_fallbacks(self):
+        """Test missing emotions fall back to neutral, then listening"""
+        availability = AssetAvailability()
+        happy = CharacterState(StateType.EMOTION, emotion=EmotionType.HAPPY)
+
+        availability.publish("listening", "listening.mp4")
+        assert availability.resolve_clip(happy) == "listening"
+
+        availability.publish("emotion_neutral", "emotion_neutral.mp4")
+        assert availability.resolve_clip(happy) == "emotion_neutral"
+
+        availability.publish("emotion_happy", "emotion_happy.mp4")
+        assert availability.resolve_clip(happy) == "emotion_happy"
+
+        assert availability.resolve_clip(CharacterState(StateType.SPEAKING)) == "listening"
+        assert availability.resolve_clip(CharacterState(StateType.ENTERING)) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
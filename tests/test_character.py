@@ -0,0 +1,122 @@
+"""
+Unit tests for character profiles
+"""
+
+import json
+import os
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.character import CharacterProfile, ProfileStore
+from src.state import StateType, get_character_state
+from src.video import PromptGenerator, PromptSweep
+
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "character_config.json"
+
+
+def write_profile(path, nickname, clothing="black hoodie"):
+    """Write a minimal profile with a fresh mtime"""
+    data = {
+        "character": {"id": path.stem, "nickname": nickname, "personality": {"traits": ["calm"]}},
+        "appearance": {"art_style": "anime", "clothing": clothing, "face": "round", "hairstyle": "bob"},
+    }
+    path.write_text(json.dumps(data), encoding='utf-8')
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestFrozenProfile:
+    """Test read-only shared profiles"""
+
+    def test_freeze(self):
+        """Test frozen profiles reject edits but still render prompts"""
+        profile = CharacterProfile(str(CONFIG_PATH)).freeze()
+        with pytest.raises(TypeError):
+            profile.data['appearance']['clothing'] = "red"
+        with pytest.raises(TypeError):
+            profile.mark_changed()
+        with pytest.raises(TypeError):
+            profile.data = {}
+        with pytest.raises(TypeError):
+            profile.frozen = False
+        assert profile.frozen and profile.nickname == "HooRii"
+        assert profile.personality_traits == ("tsundere", "mischievous", "cute", "clever")
+        assert json.dumps(profile.to_dict())
+
+        prompt = PromptGenerator(profile).generate_state_prompt(get_character_state(StateType.LISTENING))
+        assert "Black skirt" in prompt
+
+    def test_sweep_over_frozen_profile(self):
+        """Test sweeps copy frozen profiles instead of editing them"""
+        profile = CharacterProfile(str(CONFIG_PATH)).freeze()
+        listening = get_character_state(StateType.LISTENING)
+        sweep = PromptSweep(profile, states=[listening]).vary("character.personality.traits", [["shy"]])
+        assert len(list(sweep.variants())) == 1
+        assert profile.personality_traits[0] == "tsundere"
+
+
+class TestProfileStore:
+    """Test lazily loaded, LRU-cached profiles"""
+
+    def test_shared_instance(self, tmp_path):
+        """Test every lookup of a character returns the same frozen object"""
+        write_profile(tmp_path / "mika.json", "Mika")
+        store = ProfileStore(str(tmp_path), check_interval=0)
+
+        profile = store.get("mika")
+        assert profile.frozen and profile.nickname == "Mika"
+        assert store.get("mika") is profile
+        assert store.load(str(tmp_path / "mika.json")) is profile
+        assert store.get_stats()['misses'] == 1
+
+    def test_revalidation(self, tmp_path):
+        """Test an edited file yields a new profile and leaves the old one intact"""
+        path = tmp_path / "mika.json"
+        write_profile(path, "Mika")
+        store = ProfileStore(str(tmp_path), check_interval=0)
+        old = store.get("mika")
+
+        write_profile(path, "Mika", clothing="red coat!")
+        new = store.get("mika")
+        assert new is not old
+        assert new.get_appearance_info()['clothing'] == "red coat!"
+        assert old.get_appearance_info()['clothing'] == "black hoodie"
+        assert store.get_stats()['reloads'] == 1
+
+        throttled = ProfileStore(str(tmp_path), check_interval=60)
+        cached = throttled.get("mika")
+        write_profile(path, "Mika", clothing="green scarf")
+        assert throttled.get("mika") is cached
+
+    def test_lru_eviction(self, tmp_path):
+        """Test the least recently used profile is evicted at capacity"""
+        for name in ("a", "b", "c"):
+            write_profile(tmp_path / f"{name}.json", name.upper())
+        store = ProfileStore(str(tmp_path), capacity=2)
+
+        first = store.get("a")
+        store.get("b")
+        store.get("a")
+        store.get("c")
+        assert len(store) == 2
+        assert store.get_stats()['evictions'] == 1
+        assert store.get("a") is first
+
+    def test_resolution(self, tmp_path):
+        """Test registered paths, missing files and unsafe ids"""
+        store = ProfileStore(str(tmp_path))
+        store.register("hoorii_001", str(CONFIG_PATH))
+        assert store.get("hoorii_001").nickname == "HooRii"
+
+        with pytest.raises(FileNotFoundError):
+            store.get("missing")
+        with pytest.raises(ValueError):
+            store.get("../secrets")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
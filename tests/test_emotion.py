@@ -0,0 +1,302 @@
+"""
+Unit tests for emotion detection
+"""
+
+import json
+import os
+import pytest
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.emotion import (
+    EmotionDetector, KeywordAutomaton, EmotionStream, EmotionScorer, classify_logs, ReloadingDetector
+)
+from src.emotion.batch import classify_chunk, read_messages
+from src.state import StateMachine, StateType, EmotionType
+
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "emotion_keywords.json"
+
+
+@pytest.fixture(scope="module")
+def detector():
+    """Detector compiled from the shipped rules"""
+    return EmotionDetector.from_file(str(CONFIG_PATH))
+
+
+class TestKeywordAutomaton:
+    """Test Aho-Corasick matching"""
+
+    def test_overlapping_keywords(self):
+        """Test every occurrence of overlapping keywords is reported"""
+        automaton = KeywordAutomaton(["he", "she", "his", "hers"])
+        _, hits = automaton.scan("ushers")
+        found = {(end - automaton.lengths[k], automaton.keywords[k]) for end, k in hits}
+        assert found == {(1, "she"), (2, "he"), (2, "hers")}
+
+    def test_chunked_scan_matches_whole_scan(self):
+        """Test resuming from the returned node finds keywords across chunks"""
+        automaton = KeywordAutomaton(["不好意思", "意思"])
+        text = "真是不好意思啊"
+        node, first = automaton.scan(text[:4])
+        _, second = automaton.scan(text[4:], node, offset=4)
+        assert first + second == automaton.scan(text)[1]
+
+
+class TestEmotionDetector:
+    """Test emotion detection from keyword rules"""
+
+    def test_chinese_without_spaces(self, detector):
+        """Test Chinese keywords match inside running text"""
+        assert detector.detect("哈哈今天太好了") == EmotionType.HAPPY
+        assert detector.detect("我今天好累想睡觉") == EmotionType.SLEEPY
+
+    def test_longer_keyword_wins(self, detector):
+        """Test a keyword contained in a longer hit is ignored"""
+        assert detector.detect("你这是什么意思") == EmotionType.CONFUSED
+        assert detector.detect("我有点困惑") == EmotionType.CONFUSED
+
+    def test_resolve_spans(self, detector):
+        """Test raw scan hits resolve to the spans find_matches reports"""
+        text = "你这是什么意思"
+        _, hits = detector.automaton.scan(text)
+        spans = detector.resolve_spans(text, hits)
+        keywords = [detector.automaton.keywords[keyword_id] for _, _, keyword_id in spans]
+        assert keywords == [match.keyword for match in detector.find_matches(text)] == ["什么意思"]
+
+    def test_english_word_boundaries(self, detector):
+        """Test English keywords match whole words, case-insensitively"""
+        assert detector.detect("That was EASY") == EmotionType.SMUG
+        assert detector.detect("I feel uneasy") is None
+        assert detector.detect("nothing to see here") is None
+
+    def test_priority_order_breaks_ties(self, detector):
+        """Test equal scores resolve by priority_order"""
+        assert detector.detect("wow, awesome") == EmotionType.SURPRISED
+        assert detector.detect("awesome, great, wow") == EmotionType.HAPPY
+
+    def test_weights(self):
+        """Test emotion weights scale scores"""
+        detector = EmotionDetector({
+            'emotion_triggers': {
+                'happy': {'keywords': ["yay"], 'weight': 1.0, 'description': ""},
+                'sad': {'keywords': ["sigh"], 'weight': 2.5, 'description': ""},
+            },
+            'priority_order': ["happy", "sad"]
+        })
+        assert detector.scores("yay yay sigh") == {EmotionType.HAPPY: 2.0, EmotionType.SAD: 2.5}
+        assert detector.detect("yay yay sigh") == EmotionType.SAD
+
+    def test_drives_state_machine(self, detector):
+        """Test the detected emotion can be passed to the state machine"""
+        machine = StateMachine()
+        machine.transition_to(StateType.ENTERING)
+        machine.transition_to(StateType.LISTENING)
+        success, _ = machine.transition_to(StateType.EMOTION, detector.detect("不好意思，脸红了"))
+        assert success
+        assert machine.current_state.emotion == EmotionType.SHY
+
+
+class TestEmotionStream:
+    """Test streaming detection over ASR partials"""
+
+    def test_keyword_across_chunks(self, detector):
+        """Test a keyword split over two chunks is found"""
+        stream = EmotionStream(detector)
+        assert stream.feed("我真的不好").matches == []
+        update = stream.feed("意思")
+        assert [m.keyword for m in update.matches] == ["不好意思"]
+        assert stream.detect() == EmotionType.SHY
+
+    def test_waits_for_longer_keyword(self, detector):
+        """Test a hit is held while a longer keyword containing it is in progress"""
+        stream = EmotionStream(detector)
+        assert stream.update("你这是什么").matches == []
+        assert [m.keyword for m in stream.update("你这是什么意思").matches] == ["什么意思"]
+
+    def test_retracts_revised_tail(self, detector):
+        """Test a revised partial withdraws hits from the replaced text"""
+        stream = EmotionStream(detector)
+        stream.update("你这是什么意思")
+        update = stream.update("你这是什么东西")
+        assert [m.keyword for m in update.retracted] == ["什么意思"]
+        assert [m.keyword for m in update.matches] == ["什么"]
+        assert stream.detect() == EmotionType.SURPRISED
+
+    def test_english_boundary_waits_for_next_char(self, detector):
+        """Test an English keyword at the end of a chunk waits for the next character"""
+        stream = EmotionStream(detector)
+        assert stream.feed("that was easy").matches == []
+        assert stream.feed("going").matches == []
+        assert stream.finish().matches == []
+
+        stream = EmotionStream(detector)
+        stream.feed("that was easy")
+        assert [m.keyword for m in stream.finish().matches] == ["easy"]
+
+    def test_matches_batch_detection(self, detector):
+        """Test the confirmed hits after finish equal a one-shot scan"""
+        text = "wow 真的吗？什么意思，我好困惑，哈哈 that's awesome"
+        stream = EmotionStream(detector)
+        for end in range(1, len(text) + 1, 3):
+            stream.update(text[:end])
+        stream.update(text)
+        stream.finish()
+        assert stream.get_matches() == detector.find_matches(text)
+
+
+class TestEmotionScorer:
+    """Test decayed scoring with hysteresis"""
+
+    def test_single_hit_does_not_trigger(self, detector):
+        """Test one hit stays below the threshold, a repeat crosses it"""
+        scorer = EmotionScorer(detector, threshold=1.5, half_life=2.0)
+        assert scorer.observe("哈哈") is None
+        assert scorer.observe("太好了") == EmotionType.HAPPY
+        assert scorer.active == EmotionType.HAPPY
+        assert scorer.score(EmotionType.HAPPY) == pytest.approx(1.0 + 0.5 ** 0.5)
+
+    def test_decay_without_hits(self, detector):
+        """Test scores halve every half-life and release the active emotion"""
+        scorer = EmotionScorer(detector, threshold=1.5, release=0.5, half_life=1.0)
+        assert scorer.observe("哈哈 太好了") == EmotionType.HAPPY
+        scorer.observe("嗯")
+        assert scorer.score(EmotionType.HAPPY) == pytest.approx(1.0)
+        scorer.observe("嗯")
+        scorer.observe("嗯")
+        assert scorer.active is None
+
+    def test_hysteresis_blocks_twitching(self, detector):
+        """Test a competing emotion needs a lead over the active one"""
+        scorer = EmotionScorer(detector, threshold=1.5, half_life=4.0, margin=1.0)
+        assert scorer.observe("哈哈 太好了 棒") == EmotionType.HAPPY
+        assert scorer.observe("好累 好困") is None
+        assert scorer.active == EmotionType.HAPPY
+        assert scorer.observe("好累 好困 想睡觉 好疲惫") == EmotionType.SLEEPY
+
+
+class TestBatchClassification:
+    """Test offline classification of conversation logs"""
+
+    @pytest.fixture
+    def config(self):
+        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @pytest.fixture
+    def log_file(self, tmp_path):
+        path = tmp_path / "log.jsonl"
+        lines = [
+            {"role": "user", "text": "哈哈 太好了"},
+            {"role": "assistant", "text": "哈哈"},
+            {"role": "user", "text": "好累 但是 哈哈"},
+            {"role": "user", "text": "今天去上班"},
+            {"role": "user"},
+        ]
+        path.write_text(
+            "\n".join(json.dumps(line, ensure_ascii=False) for line in lines) + "\nnot json\n",
+            encoding='utf-8'
+        )
+        return path
+
+    def test_read_messages_csv(self, tmp_path):
+        """Test CSV logs are read by header"""
+        path = tmp_path / "log.csv"
+        path.write_text("role,text\nuser,哈哈\nassistant,好的\n", encoding='utf-8')
+        assert list(read_messages(str(path), role="user")) == ["哈哈", None]
+
+    def test_winners_match_detect(self, config):
+        """Test batch winners use the detector's own scoring and tie-break"""
+        detector = EmotionDetector(config)
+        texts = ["哈哈 太好了", "好累 但是 哈哈", "你这是什么意思", "今天去上班", "好困 哈哈"]
+        report = classify_chunk(detector, texts)
+
+        expected = {}
+        for text in texts:
+            emotion = detector.detect(text)
+            if emotion is not None:
+                expected[emotion.value] = expected.get(emotion.value, 0) + 1
+        assert report.emotion_counts == expected
+
+    def test_report_counts(self, config, log_file):
+        """Test counts, hit rate and co-occurrence of a small log"""
+        report = classify_logs([str(log_file)], config, role="user", chunk_size=2, workers=0)
+        assert report.messages == 3
+        assert report.skipped == 3
+        assert report.matched == 2
+        assert report.hit_rate == pytest.approx(2 / 3)
+        assert report.emotion_counts == {"happy": 2}
+        assert report.hit_counts["happy"] == 3
+        assert report.cooccurrence == {("happy", "sleepy"): 1}
+        assert report.keyword_hits["哈哈"] == 2
+
+    def test_process_pool_matches_inline(self, config, log_file):
+        """Test the process pool gives the same report as inline classification"""
+        inline = classify_logs([str(log_file)], config, chunk_size=2, workers=0)
+        pooled = classify_logs([str(log_file)], config, chunk_size=2, workers=2)
+        assert pooled == inline
+
+
+class TestReloadingDetector:
+    """Test hot reloading of emotion rules"""
+
+    @staticmethod
+    def write_rules(path, keywords, description="Happy"):
+        """Write a one-emotion rules file with a fresh mtime"""
+        rules = {"emotion_triggers": {"happy": {"keywords": keywords, "weight": 1.0}}}
+        if description is not None:
+            rules["emotion_triggers"]["happy"]["description"] = description
+        path.write_text(json.dumps(rules, ensure_ascii=False), encoding='utf-8')
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_reload_swaps_version(self, tmp_path):
+        """Test an edit is picked up and in-flight streams keep the old rules"""
+        path = tmp_path / "rules.json"
+        self.write_rules(path, ["哈哈"])
+        reloader = ReloadingDetector(str(path))
+        stream = EmotionStream(reloader.detector)
+
+        assert reloader.detect("耶") is None
+        assert reloader.check() is False
+
+        self.write_rules(path, ["哈哈", "耶"])
+        assert reloader.check() is True
+        assert reloader.version == 2
+        assert reloader.detect("耶") == EmotionType.HAPPY
+
+        stream.feed("耶")
+        assert stream.finish().matches == []
+
+    def test_invalid_edit_keeps_rules(self, tmp_path):
+        """Test rules failing validation are rejected"""
+        path = tmp_path / "rules.json"
+        self.write_rules(path, ["哈哈"])
+        reloader = ReloadingDetector(str(path))
+
+        self.write_rules(path, ["耶"], description=None)
+        assert reloader.check() is False
+        assert "description" in reloader.last_error
+        assert reloader.version == 1
+        assert reloader.detect("哈哈") == EmotionType.HAPPY
+
+        path.write_text("{not json", encoding='utf-8')
+        assert reloader.check() is False
+        assert reloader.version == 1
+
+    def test_background_watcher(self, tmp_path):
+        """Test the watcher thread swaps rules and reports them"""
+        path = tmp_path / "rules.json"
+        self.write_rules(path, ["哈哈"])
+        reloaded = []
+        with ReloadingDetector(str(path), interval=0.01, on_reload=reloaded.append) as reloader:
+            self.write_rules(path, ["耶"])
+            deadline = time.time() + 5.0
+            while reloader.version == 1 and time.time() < deadline:
+                time.sleep(0.01)
+
+        assert [version.version for version in reloaded] == [2]
+        assert reloader.detect("耶") == EmotionType.HAPPY
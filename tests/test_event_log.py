@@ -0,0 +1,151 @@
+"""
+Unit tests for the state event log
+"""
+
+import pytest
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.state import StateType, EmotionType, StateEventLog
+from src.state.event_log import EventLogError, LOG_HEADER, RECORD
+from src.device import DeviceType
+
+
+TURN = [
+    (StateType.LISTENING, StateType.SPEAKING, None),
+    (StateType.SPEAKING, StateType.LISTENING, None),
+    (StateType.LISTENING, StateType.EMOTION, EmotionType.HAPPY),
+    (StateType.EMOTION, StateType.LISTENING, None),
+]
+
+
+def fill(log, sessions=3, turns=10):
+    """Append interleaved turns for several sessions"""
+    for _ in range(turns):
+        for from_state, to_state, emotion in TURN:
+            for session_id in range(sessions):
+                log.append(session_id, from_state, to_state, emotion, DeviceType.MOBILE)
+
+
+class TestStateEventLog:
+    """Test append, group commit, snapshots and replay"""
+
+    def test_group_commit_and_read(self, tmp_path):
+        """Test records are buffered until a group is full"""
+        log = StateEventLog(str(tmp_path / "state.log"), group_size=4, commit_interval=60, fsync=False)
+        log.append(7, StateType.EMPTY, StateType.ENTERING)
+        log.append(7, StateType.ENTERING, StateType.LISTENING, device=DeviceType.WEB)
+        assert log.committed == 0
+        assert len(log) == 2
+
+        log.append(7, StateType.LISTENING, StateType.EMOTION, EmotionType.SHY)
+        log.append(7, StateType.EMOTION, StateType.LISTENING)
+        assert log.committed == 4
+
+        records = list(log.read_records())
+        assert [r.to_state for r in records] == [
+            StateType.ENTERING, StateType.LISTENING, StateType.EMOTION, StateType.LISTENING
+        ]
+        assert records[1].device == DeviceType.WEB
+        assert records[2].emotion == EmotionType.SHY
+        assert all(a.timestamp <= b.timestamp for a, b in zip(records, records[1:]))
+        log.close()
+
+    def test_lone_record_committed_after_interval(self, tmp_path):
+        """Test a single pending record becomes durable without another append"""
+        path = tmp_path / "state.log"
+        log = StateEventLog(str(path), group_size=256, commit_interval=0.05, fsync=False)
+        log.append(7, StateType.EMPTY, StateType.ENTERING)
+
+        deadline = time.monotonic() + 5
+        while log.committed == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert log.committed == 1
+        assert path.stat().st_size == LOG_HEADER.size + RECORD.size
+        log.close()
+        assert not log._flusher.is_alive()
+
+    def test_rebuild_from_snapshot_matches_replay(self, tmp_path):
+        """Test rebuilding at any position equals a full replay"""
+        log = StateEventLog(str(tmp_path / "state.log"), group_size=8, snapshot_interval=16, fsync=False)
+        fill(log)
+        log.commit()
+        assert len(list(tmp_path.glob("state.log.*.snap"))) >= 2
+
+        records = list(log.read_records())
+        for position in (0, 5, 16, 17, 50, len(records)):
+            expected = None
+            for record in records[:position]:
+                if record.session_id == 1:
+                    expected = (record.to_state, record.emotion)
+            state = log.rebuild(1, position)
+            assert (state and (state.state_type, state.emotion)) == expected
+
+        assert log.position_at(records[20].timestamp) >= 21
+        log.close()
+
+    def test_reopen_recovers_sessions_and_drops_torn_record(self, tmp_path):
+        """Test reopening restores state and truncates a partial record"""
+        path = tmp_path / "state.log"
+        with StateEventLog(str(path), snapshot_interval=10, fsync=False) as log:
+            fill(log, turns=3)
+            log.append(2, StateType.LISTENING, StateType.EMOTION, EmotionType.SAD)
+        with open(path, 'ab') as f:
+            f.write(b"\x01" * (RECORD.size // 2))
+
+        with StateEventLog(str(path), fsync=False) as log:
+            assert log.committed == 37
+            assert path.stat().st_size == LOG_HEADER.size + 37 * RECORD.size
+            assert log.get_session(2).emotion == EmotionType.SAD
+            assert log.get_session(0).state_type == StateType.LISTENING
+
+    def test_rejects_foreign_file(self, tmp_path):
+        """Test opening a non-log file fails"""
+        path = tmp_path / "other.log"
+        path.write_bytes(b"not a log file at all")
+        with pytest.raises(EventLogError):
+            StateEventLog(str(path))
+
+    def test_timestamps_are_wall_clock_across_reopen(self, tmp_path):
+        """Test timestamps keep increasing after the log is reopened"""
+        path = tmp_path / "state.log"
+        before = time.time_ns()
+        with StateEventLog(str(path), fsync=False) as log:
+            log.append(1, StateType.EMPTY, StateType.ENTERING)
+        with StateEventLog(str(path), fsync=False) as log:
+            log.append(1, StateType.ENTERING, StateType.LISTENING)
+            log.commit()
+            first, second = (record.timestamp for record in log.read_records())
+        assert before <= first <= second <= time.time_ns()
+
+    def test_append_not_blocked_by_fsync(self, tmp_path, monkeypatch):
+        """Test appends proceed while a commit is waiting on fsync"""
+        import threading
+        from src.state import event_log
+
+        syncing, release = threading.Event(), threading.Event()
+
+        def slow_fsync(fd):
+            syncing.set()
+            release.wait(5)
+
+        monkeypatch.setattr(event_log.os, "fsync", slow_fsync)
+        log = StateEventLog(str(tmp_path / "state.log"), group_size=2, commit_interval=60)
+        log.append(1, StateType.EMPTY, StateType.ENTERING)
+        committer = threading.Thread(target=log.append, args=(1, StateType.ENTERING, StateType.LISTENING))
+        committer.start()
+        assert syncing.wait(5)
+
+        started = time.monotonic()
+        assert log.append(2, StateType.EMPTY, StateType.ENTERING) == 2
+        assert time.monotonic() - started < 1
+        assert log.committed == 0
+
+        release.set()
+        committer.join()
+        assert log.committed == 2
+        log.close()
+        assert len(log) == 3
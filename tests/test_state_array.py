@@ -0,0 +1,147 @@
+"""
+Unit tests for the vectorized multi-session state engine
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+np = pytest.importorskip("numpy")
+
+from src.state import StateMachineArray, StateType, EmotionType
+from src.state.expiry import StateExpiryScheduler
+from src.state.state_array import (
+    TRANSITION_OK, INVALID_TRANSITION, EMOTION_REQUIRED, UNKNOWN_SESSION, UNKNOWN_STATE
+)
+
+
+def encode(*states):
+    return StateMachineArray.encode_states(states)
+
+
+class TestStateMachineArray:
+    """Test batched validate-and-apply"""
+
+    def setup_method(self):
+        """Create four sessions, all listening"""
+        self.array = StateMachineArray(4)
+        ids = np.arange(4)
+        self.array.apply_transitions(ids, encode(*[StateType.ENTERING] * 4))
+        self.array.apply_transitions(ids, encode(*[StateType.LISTENING] * 4))
+
+    def test_batch_result_codes(self):
+        """Test each request gets its own result code"""
+        results = self.array.apply_transitions(
+            [0, 1, 2, 9],
+            encode(StateType.SPEAKING, StateType.ENTERING, StateType.EMOTION, StateType.SPEAKING),
+        )
+        assert list(results) == [TRANSITION_OK, INVALID_TRANSITION, EMOTION_REQUIRED, UNKNOWN_SESSION]
+        assert self.array.get_state(0).state_type == StateType.SPEAKING
+        assert self.array.get_state(1).state_type == StateType.LISTENING
+
+    def test_emotion_transition(self):
+        """Test emotion codes are stored with the state"""
+        emotions = StateMachineArray.encode_emotions([EmotionType.SHY])
+        results = self.array.apply_transitions([3], encode(StateType.EMOTION), emotions)
+        assert results[0] == TRANSITION_OK
+        assert self.array.get_state(3).emotion == EmotionType.SHY
+
+    def test_out_of_range_codes(self):
+        """Test bad target and emotion codes fail per request without aborting the batch"""
+        emotion_state = StateMachineArray.encode_states([StateType.EMOTION])[0]
+        speaking = StateMachineArray.encode_states([StateType.SPEAKING])[0]
+        results = self.array.apply_transitions([0, 1, 2], [99, emotion_state, speaking], [0, 99, 0])
+        assert list(results) == [UNKNOWN_STATE, UNKNOWN_STATE, TRANSITION_OK]
+        assert self.array.get_state(0).state_type == StateType.LISTENING
+        assert self.array.get_state(1).state_type == StateType.LISTENING
+        assert self.array.get_state(2).state_type == StateType.SPEAKING
+
+    def test_callbacks_receive_stored_emotions(self):
+        """Test callbacks see the emotion actually stored, not the requested one"""
+        calls = []
+        self.array.register_callback(StateType.SPEAKING, lambda ids, emos: calls.append(list(emos)))
+        emotions = StateMachineArray.encode_emotions([EmotionType.HAPPY])
+        self.array.apply_transitions([0], encode(StateType.SPEAKING), emotions)
+        assert calls == [[0]]
+        assert self.array.get_state(0).emotion is None
+
+    def test_same_session_applied_in_order(self):
+        """Test repeated session ids in one batch apply sequentially"""
+        results = self.array.apply_transitions(
+            [0, 1, 0, 0],
+            encode(StateType.SPEAKING, StateType.DEFAULT, StateType.LISTENING, StateType.DEFAULT),
+        )
+        assert list(results) == [TRANSITION_OK] * 4
+        assert self.array.get_state(0).state_type == StateType.DEFAULT
+        assert self.array.count_by_state()[StateType.DEFAULT] == 2
+
+    def test_callbacks_only_for_changed_sessions(self):
+        """Test callbacks receive only sessions that entered the state"""
+        calls = []
+        self.array.register_callback(StateType.SPEAKING, lambda ids, emos: calls.append(list(ids)))
+        self.array.apply_transitions(
+            [0, 1, 2], encode(StateType.SPEAKING, StateType.ENTERING, StateType.SPEAKING)
+        )
+        assert calls == [[0, 2]]
+
+
+class TestStateExpiryScheduler:
+    """Test automatic expiry of timed states"""
+
+    def setup_method(self):
+        """Create listening sessions with an expiry scheduler"""
+        self.array = StateMachineArray(4)
+        self.expiry = StateExpiryScheduler(self.array, tick=0.1, start=0.0)
+        ids = np.arange(4)
+        self.array.apply_transitions(ids, encode(*[StateType.ENTERING] * 4), now=0.0)
+        assert len(self.expiry.advance(5.0)) == 4
+        assert self.array.count_by_state()[StateType.LISTENING] == 4
+
+    def test_emotion_durations(self):
+        """Test shy lasts 10s and other emotions 5s"""
+        self.array.apply_transitions(
+            [0, 1],
+            encode(StateType.EMOTION, StateType.EMOTION),
+            StateMachineArray.encode_emotions([EmotionType.SHY, EmotionType.HAPPY]),
+            now=10.0
+        )
+        assert list(self.expiry.advance(15.0)) == [1]
+        assert self.array.get_state(0).emotion == EmotionType.SHY
+        assert list(self.expiry.advance(20.0)) == [0]
+        assert self.array.get_state(0).state_type == StateType.LISTENING
+
+    def test_leaving_returns_to_empty(self):
+        """Test leaving expires to empty"""
+        self.array.apply_transitions([2], encode(StateType.LEAVING), now=10.0)
+        self.expiry.advance(15.0)
+        assert self.array.get_state(2).state_type == StateType.EMPTY
+
+    def test_stale_timer_is_discarded(self):
+        """Test a session that moved on is not transitioned by its old timer"""
+        self.array.apply_transitions([3], encode(StateType.SPEAKING), now=10.0)
+        self.array.apply_transitions([3], encode(StateType.LISTENING), now=11.0)
+        self.array.apply_transitions([3], encode(StateType.DEFAULT), now=12.0)
+        assert len(self.expiry.advance(20.0)) == 0
+        assert self.array.get_state(3).state_type == StateType.DEFAULT
+
+    def test_entered_and_left_in_one_batch(self):
+        """Test no expiry is armed for a timed state left within the same batch"""
+        array = StateMachineArray(1)
+        expiry = StateExpiryScheduler(array, tick=0.1, start=0.0)
+        array.apply_transitions([0, 0], encode(StateType.ENTERING, StateType.LISTENING), now=0.0)
+        assert expiry.pending() == 0
+        assert len(expiry.advance(10.0)) == 0
+        assert expiry.expired == 0
+
+    def test_rejected_expiry_not_counted(self):
+        """Test an expiry whose transition is rejected is neither returned nor counted"""
+        listening = StateMachineArray.encode_states([StateType.LISTENING])[0]
+        self.expiry.wheel.schedule(0, 12.0, (int(listening), float(self.array.entered_at[0])))
+        assert len(self.expiry.advance(20.0)) == 0
+        assert self.expiry.expired == 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
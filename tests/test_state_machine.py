@@ -4,11 +4,22 @@ Unit tests for state machine
 
 import pytest
 import sys
+import threading
+import time
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.state import StateMachine, StateType, EmotionType, CharacterState
+from dataclasses import FrozenInstanceError
+from src.state import (
+    StateMachine, StateType, EmotionType, CharacterState, get_character_state, TransitionPlanner,
+    TransitionManager, EventBus, OverflowPolicy
+)
+from src.state.timer_wheel import TimerWheel
+from src.state.transition_table import (
+    VALID_TRANSITIONS, is_valid_transition, state_code, state_from_code,
+    emotion_code, emotion_from_code
+)
 
 
 class TestStateMachine:
@@ -80,6 +91,33 @@ class TestStateMachine:
         history = self.state_machine.get_state_history()
         assert len(history) >= 3
 
+    def test_state_history_is_bounded(self):
+        """Test history keeps only the most recent states once full"""
+        machine = StateMachine(history_capacity=4)
+        machine.transition_to(StateType.ENTERING)
+        machine.transition_to(StateType.LISTENING)
+        for _ in range(10):
+            machine.transition_to(StateType.SPEAKING)
+            machine.transition_to(StateType.LISTENING)
+        machine.transition_to(StateType.EMOTION, EmotionType.SAD)
+
+        assert len(machine.state_history) == 4
+        history = machine.get_state_history(10)
+        assert [s.state_type for s in history] == [
+            StateType.LISTENING, StateType.SPEAKING, StateType.LISTENING, StateType.EMOTION
+        ]
+        assert history[-1].emotion == EmotionType.SAD
+        assert machine.state_history[-1].emotion == EmotionType.SAD
+
+        records = machine.state_history.get_records(2)
+        assert records[0][0] == StateType.LISTENING
+        assert records[0][2] <= records[1][2]
+
+        # Limits behave like list slicing with [-limit:], as before the ring buffer
+        full = list(machine.state_history)
+        for limit in (0, 1, 3, 10, -1):
+            assert machine.get_state_history(limit) == full[-limit:]
+
     def test_can_transition_to(self):
         """Test checking if transition is possible"""
         # From EMPTY, can go to ENTERING
@@ -99,6 +137,326 @@ class TestStateMachine:
         assert len(self.state_machine.state_history) == 0
 
 
+class TestTransitionTable:
+    """Test compiled transition table"""
+
+    def test_table_matches_graph(self):
+        """Test every (from, to) pair agrees with the transition graph"""
+        for from_state in StateType:
+            for to_state in StateType:
+                expected = to_state in VALID_TRANSITIONS.get(from_state, ())
+                assert is_valid_transition(from_state, to_state) is expected
+
+    def test_codes_round_trip(self):
+        """Test state and emotion integer codes"""
+        for state_type in StateType:
+            assert state_from_code(state_code(state_type)) is state_type
+        for emotion in list(EmotionType) + [None]:
+            assert emotion_from_code(emotion_code(emotion)) is emotion
+
+
+class TestTransitionManager:
+    """Test transition adjacency indexes"""
+
+    def test_adjacency_indexes(self):
+        """Test outgoing/incoming lookups match the registered edges"""
+        manager = TransitionManager()
+        assert {t.video_name for t in manager.get_transitions_from(StateType.LISTENING)} == {
+            "listening2default", "listening2leave"
+        }
+        assert {t.video_name for t in manager.get_transitions_to(StateType.LEAVING)} == {
+            "listening2leave", "default2leave"
+        }
+        assert manager.get_transitions_from(StateType.SPEAKING) == []
+
+    def test_requires_video(self):
+        """Test precomputed requires_video lookup"""
+        manager = TransitionManager()
+        assert manager.requires_transition_video(StateType.DEFAULT, StateType.LISTENING)
+        assert not manager.requires_transition_video(StateType.LISTENING, StateType.SPEAKING)
+        assert manager.get_transition(StateType.LISTENING, StateType.EMOTION, EmotionType.HAPPY) is None
+
+    def test_from_config_roundtrip(self):
+        """Test loading the graph from config"""
+        config = TransitionManager().to_config()
+        config['transitions'] = config['transitions'][:2]
+        manager = TransitionManager.from_config(config)
+        assert len(manager.get_all_transitions()) == 2
+        assert manager.get_transition(StateType.DEFAULT, StateType.LISTENING).video_name == "default2listening"
+        assert not manager.requires_transition_video(StateType.EMPTY, StateType.ENTERING)
+        assert len(TransitionManager.from_config({}).get_all_transitions()) == 5
+
+    def test_from_config_rejects_edges_outside_graph(self):
+        """Test config cannot describe transitions the state graph forbids"""
+        config = {'transitions': [
+            {'from': 'empty', 'to': 'speaking', 'type': 'empty2enter', 'video': 'x'}
+        ]}
+        with pytest.raises(ValueError):
+            TransitionManager.from_config(config)
+
+
+class TestApplyTransitions:
+    """Test atomic batch transitions"""
+
+    TURN = [
+        StateType.SPEAKING,
+        StateType.LISTENING,
+        (StateType.EMOTION, EmotionType.HAPPY),
+        StateType.LISTENING,
+        (StateType.EMOTION, EmotionType.SHY),
+    ]
+
+    def setup_method(self):
+        """Setup a machine in the listening state"""
+        self.machine = StateMachine(history_capacity=8)
+        self.machine.transition_to(StateType.ENTERING)
+        self.machine.transition_to(StateType.LISTENING)
+
+    def test_batch_commits_and_records_history(self):
+        """Test a valid burst updates state and history"""
+        success, error = self.machine.apply_transitions(self.TURN)
+        assert success, error
+        assert self.machine.current_state.emotion == EmotionType.SHY
+        assert self.machine.previous_state.state_type == StateType.LISTENING
+        assert len(self.machine.state_history) == 7
+
+        # Wraps around the ring buffer
+        assert self.machine.apply_transitions([StateType.LISTENING, StateType.SPEAKING])[0]
+        history = self.machine.get_state_history(8)
+        assert len(history) == 8
+        assert [s.state_type for s in history[-3:]] == [
+            StateType.EMOTION, StateType.LISTENING, StateType.SPEAKING
+        ]
+        assert history[0] == get_character_state(StateType.LISTENING)
+
+    def test_batch_is_atomic(self):
+        """Test an invalid step leaves the machine unchanged"""
+        before = self.machine.current_state
+        success, error = self.machine.apply_transitions([StateType.SPEAKING, StateType.DEFAULT])
+        assert not success
+        assert error.startswith("Step 1")
+        assert self.machine.current_state is before
+        assert len(self.machine.state_history) == 2
+
+        success, error = self.machine.apply_transitions([StateType.EMOTION])
+        assert not success
+        assert "emotion type required" in error
+
+    def test_batch_matches_transition_to(self):
+        """Test list steps and emotions on non-emotion states commit the same states"""
+        single = StateMachine()
+        single.transition_to(StateType.ENTERING)
+        single.transition_to(StateType.LISTENING)
+        single.transition_to(StateType.SPEAKING, EmotionType.HAPPY)
+
+        success, error = self.machine.apply_transitions([[StateType.SPEAKING, EmotionType.HAPPY]])
+        assert success, error
+        assert self.machine.current_state is single.current_state
+        assert self.machine.get_state_history(1) == single.get_state_history(1)
+
+    def test_malformed_steps(self):
+        """Test malformed steps return an error instead of raising"""
+        for step in [(StateType.SPEAKING,), ("speaking", None), (StateType.SPEAKING, "happy"), None]:
+            success, error = self.machine.apply_transitions([step])
+            assert not success
+            assert error.startswith("Step 0")
+        assert self.machine.current_state.state_type == StateType.LISTENING
+
+    def test_batch_callbacks_are_coalesced(self):
+        """Test each callback fires once per batch"""
+        entered = []
+        batches = []
+        self.machine.register_callback(StateType.EMOTION, entered.append)
+        self.machine.register_callback(StateType.LISTENING, entered.append)
+        self.machine.register_batch_callback(batches.append)
+
+        self.machine.apply_transitions(self.TURN)
+        assert entered == [get_character_state(StateType.LISTENING),
+                           get_character_state(StateType.EMOTION, EmotionType.SHY)]
+        assert len(batches) == 1 and len(batches[0]) == 5
+
+
+class TestEventBus:
+    """Test asynchronous callback dispatch"""
+
+    def test_slow_callback_does_not_block_transition(self):
+        """Test transition_to returns before a slow subscriber finishes"""
+        release = threading.Event()
+        received = []
+
+        def slow(state):
+            release.wait(5)
+            received.append(state.state_type)
+
+        with EventBus() as bus:
+            machine = StateMachine(event_bus=bus)
+            machine.register_callback(StateType.ENTERING, slow)
+
+            started = time.monotonic()
+            assert machine.transition_to(StateType.ENTERING)[0]
+            assert time.monotonic() - started < 0.5
+            assert received == []
+
+            release.set()
+            assert bus.flush(5)
+        assert received == [StateType.ENTERING]
+
+    def test_shared_bus_keeps_machines_apart(self):
+        """Test subscribers of one machine never see another machine's events"""
+        first, second = [], []
+        with EventBus() as bus:
+            machine_a = StateMachine(event_bus=bus)
+            machine_b = StateMachine(event_bus=bus)
+            machine_a.register_callback(StateType.ENTERING, first.append)
+            bus.subscribe(machine_b.event_topic(StateType.ENTERING), second.append)
+
+            machine_b.transition_to(StateType.ENTERING)
+            assert bus.flush(5)
+            assert first == [] and len(second) == 1
+
+            machine_a.transition_to(StateType.ENTERING)
+            assert bus.flush(5)
+        assert first == [machine_a.current_state] and len(second) == 1
+
+    def test_failed_schedule_is_undone(self):
+        """Test a pool that refuses work leaves no phantom drain behind"""
+        bus = EventBus()
+        subscription = bus.subscribe("topic", lambda _: None)
+        bus._executor.shutdown()
+
+        with pytest.raises(RuntimeError):
+            bus.publish("topic", 1)
+        assert not subscription.scheduled
+        assert bus.flush(0.1)
+
+        bus.close()
+        assert bus.publish("topic", 2) == 0
+
+    def test_queue_size_validated(self):
+        """Test an explicit zero queue size is rejected instead of defaulted"""
+        with pytest.raises(ValueError):
+            EventBus(max_queue=0)
+        with EventBus() as bus:
+            with pytest.raises(ValueError):
+                bus.subscribe("topic", lambda _: None, max_queue=0)
+            assert bus.subscribe("topic", lambda _: None).max_queue == bus.max_queue
+
+    def test_drop_oldest_policy(self):
+        """Test a full queue discards the oldest events"""
+        gate = threading.Event()
+        received = []
+
+        with EventBus(max_queue=2) as bus:
+            bus.subscribe("topic", lambda _: gate.wait(5))
+            subscription = bus.subscribe("topic", received.append, policy=OverflowPolicy.DROP_OLDEST)
+            bus.subscribe("other", lambda _: None)
+
+            # Block the worker on the first event, then overflow the queue
+            with subscription.condition:
+                for i in range(5):
+                    bus.publish("topic", i)
+            gate.set()
+            assert bus.flush(5)
+
+        assert received[-2:] == [3, 4]
+        assert subscription.get_metrics()['dropped'] == 3
+
+    def test_errors_are_isolated_and_measured(self):
+        """Test a failing callback does not affect other subscribers"""
+        received = []
+
+        def failing(_):
+            raise RuntimeError("boom")
+
+        with EventBus() as bus:
+            bus.subscribe("topic", failing)
+            bus.subscribe("topic", received.append)
+            for i in range(3):
+                bus.publish("topic", i)
+            assert bus.flush(5)
+            metrics = {m['callback']: m for m in bus.get_metrics()}
+
+        assert received == [0, 1, 2]
+        assert metrics['TestEventBus.test_errors_are_isolated_and_measured.<locals>.failing']['errors'] == 3
+        assert all(m['delivered'] == 3 for m in metrics.values())
+
+
+class TestTimerWheel:
+    """Test hierarchical timer wheel"""
+
+    def test_fires_at_deadline_across_levels(self):
+        """Test timers on every level fire on time, never early"""
+        wheel = TimerWheel(tick=1.0, slots=4, levels=3, start=0.0)
+        deadlines = {"a": 2, "b": 5, "c": 17, "d": 40, "e": 200}
+        for key, deadline in deadlines.items():
+            wheel.schedule(key, deadline)
+
+        fired_at = {}
+        for now in range(1, 201):
+            for key, _ in wheel.advance(now):
+                fired_at[key] = now
+        assert fired_at == deadlines
+        assert len(wheel) == 0
+
+    def test_single_level_never_fires_early(self):
+        """Test a deadline beyond a one-level wheel's range waits for its tick"""
+        wheel = TimerWheel(tick=1.0, slots=4, levels=1, start=0.0)
+        wheel.schedule('a', 100.0)
+        fired_at = {}
+        for now in range(1, 101):
+            for key, _ in wheel.advance(now):
+                fired_at[key] = now
+        assert fired_at == {'a': 100}
+
+    def test_cancel_and_reschedule(self):
+        """Test cancel removes a timer and rescheduling replaces it"""
+        wheel = TimerWheel(tick=0.5, start=100.0)
+        wheel.schedule(1, 101.0, "first")
+        wheel.schedule(2, 101.0)
+        wheel.schedule(1, 103.0, "second")
+        assert wheel.cancel(2)
+        assert not wheel.cancel(2)
+
+        assert wheel.advance(102.0) == []
+        assert wheel.advance(103.0) == [(1, "second")]
+
+
+class TestTransitionPlanner:
+    """Test precomputed shortest routes"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.planner = TransitionPlanner()
+
+    def test_route_through_listening(self):
+        """Test DEFAULT -> EMOTION is routed through LISTENING with its clips"""
+        route = self.planner.plan(StateType.DEFAULT, StateType.EMOTION, EmotionType.SHY)
+        assert [hop.to_state for hop in route.hops] == [StateType.LISTENING, StateType.EMOTION]
+        assert route.clips == ("default2listening", "emotion_shy")
+        assert route.duration == 15.0
+
+    def test_route_needs_entering(self):
+        """Test EMPTY -> LISTENING goes through ENTERING"""
+        route = self.planner.plan(StateType.EMPTY, StateType.LISTENING)
+        assert route.clips[0] == "enter"
+        assert len(route) == 2
+
+    def test_every_route_is_valid(self):
+        """Test applying every planned route succeeds on a real state machine"""
+        route = self.planner.plan(StateType.EMPTY, StateType.EMOTION, EmotionType.ANGRY)
+        machine = StateMachine()
+        for hop in route.hops:
+            success, error = machine.transition_to(hop.to_state, hop.emotion)
+            assert success, error
+        assert machine.current_state.emotion == EmotionType.ANGRY
+
+    def test_state_machine_plan_route(self):
+        """Test planning from the machine's current state"""
+        machine = StateMachine()
+        assert machine.plan_route(StateType.EMPTY).hops == ()
+        assert machine.plan_route(StateType.SPEAKING).clips == ("enter", "listening", "speaking")
+
+
 class TestCharacterState:
     """Test character state class"""
 
@@ -137,6 +495,31 @@ class TestCharacterState:
         default = CharacterState(StateType.DEFAULT)
         assert default.can_trigger_emotion() is False
 
+    def test_states_are_immutable(self):
+        """Test states cannot be modified and are hashable"""
+        state = CharacterState(StateType.EMOTION, emotion=EmotionType.HAPPY)
+        with pytest.raises(FrozenInstanceError):
+            state.emotion = EmotionType.SAD
+        assert {state: 1}[CharacterState(StateType.EMOTION, emotion=EmotionType.HAPPY)] == 1
+
+    def test_interned_states(self):
+        """Test the factory returns one shared instance per combination"""
+        happy = get_character_state(StateType.EMOTION, EmotionType.HAPPY)
+        assert happy is get_character_state(StateType.EMOTION, EmotionType.HAPPY)
+        assert get_character_state(StateType.EMOTION) is get_character_state(StateType.EMOTION, EmotionType.NEUTRAL)
+        assert get_character_state(StateType.LISTENING).loop is True
+        assert get_character_state(StateType.LISTENING, loop=False) == CharacterState(StateType.LISTENING)
+
+    def test_transitions_reuse_interned_states(self):
+        """Test the state machine does not allocate new states per transition"""
+        machine = StateMachine()
+        machine.transition_to(StateType.ENTERING)
+        machine.transition_to(StateType.LISTENING)
+        first = machine.current_state
+        machine.transition_to(StateType.SPEAKING)
+        machine.transition_to(StateType.LISTENING)
+        assert machine.current_state is first
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
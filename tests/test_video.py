@@ -0,0 +1,340 @@
+"""
+Unit tests for video processing helpers
+"""
+
+import json
+import os
+import pytest
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.character import CharacterProfile
+from src.device import DeviceType
+from src.state import StateType, EmotionType, get_character_state
+from src.video import (
+    PromptGenerator, PromptTemplate, TemplateLibrary, VideoProcessor, Rendition, RenditionLadder, export_profiles,
+    PromptSweep, VideoGenerator
+)
+
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "character_config.json"
+PROMPTS_DIR = Path(__file__).parent.parent / "prompts"
+
+
+class TestRenditions:
+    """Test rendition ladder and single-decode encoding plans"""
+
+    def test_shared_renditions_encoded_once(self):
+        """Test renditions used by several devices appear once"""
+        ladder = RenditionLadder()
+        names = [r.name for r in ladder.unique_renditions()]
+        assert len(names) == len(set(names))
+        assert "480p" in names
+
+    def test_single_decode_command(self):
+        """Test all renditions come from one ffmpeg input"""
+        renditions = [
+            Rendition("720p", 720, 1280, "1500k"),
+            Rendition("480p", 544, 960, "600k", faststart=True),
+        ]
+        result = VideoProcessor().create_renditions("clips/listening.mp4", renditions, "out")
+        command = result['command']
+
+        assert command.count("-i") == 1
+        assert "split=2" in command[command.index("-filter_complex") + 1]
+        assert result['outputs']['480p'].endswith("listening_480p.mp4")
+        assert command.count("+faststart") == 1
+
+    def test_device_manifest(self):
+        """Test manifest only lists renditions each device uses"""
+        ladder = RenditionLadder()
+        manifest = ladder.build_manifest({
+            'listening': {'480p': 'a_480p.mp4', '1080p': 'a_1080p.mp4'}
+        })
+        hardware = manifest['devices'][DeviceType.HARDWARE.value]
+        assert hardware['clips']['listening'] == {'480p': 'a_480p.mp4'}
+        assert manifest['devices'][DeviceType.DESKTOP.value]['preferred_rendition'] == "1080p"
+
+
+class TestPromptGenerator:
+    """Test precompiled prompt tables"""
+
+    @pytest.fixture
+    def generator(self):
+        return PromptGenerator(CharacterProfile(str(CONFIG_PATH)))
+
+    def test_table_covers_every_state(self, generator):
+        """Test every state prompt is rendered once and reused"""
+        happy = get_character_state(StateType.EMOTION, EmotionType.HAPPY)
+        prompt = generator.generate_state_prompt(happy)
+        assert prompt.startswith(generator.base_appearance)
+        assert "happily smiles" in prompt and prompt.endswith("clear face details")
+        assert generator.generate_state_prompt(happy) is prompt
+        assert "2K" not in generator.generate_state_prompt(happy, include_technical=False)
+
+        default = generator.generate_state_prompt(get_character_state(StateType.DEFAULT))
+        assert "white background" not in default
+        assert generator.generate_transition_prompt(StateType.DEFAULT, StateType.LISTENING).startswith(
+            generator.base_appearance
+        )
+        assert generator.generate_transition_prompt(StateType.SPEAKING, StateType.EMPTY) == ""
+
+    def test_profile_change_invalidates(self, generator):
+        """Test prompts follow profile edits and replacement"""
+        table = generator.table
+        generator.profile.data['appearance']['clothing'] = "red raincoat"
+        generator.profile.mark_changed()
+        assert generator.table is not table
+        assert "red raincoat" in generator.generate_state_prompt(get_character_state(StateType.LISTENING))
+
+        data = dict(generator.profile.data)
+        data['appearance'] = dict(data['appearance'], clothing="green overalls")
+        generator.profile.data = data
+        assert "green overalls" in generator.generate_state_prompt(get_character_state(StateType.LISTENING))
+
+        generator.profile = CharacterProfile()
+        assert generator.base_appearance == ", , , "
+
+
+class TestPromptTemplates:
+    """Test file-backed prompt templates"""
+
+    @staticmethod
+    def write(path, text):
+        """Write a template with a fresh mtime"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding='utf-8')
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_placeholders(self):
+        """Test appearance/character fields, nested lists and literal braces"""
+        profile = CharacterProfile(str(CONFIG_PATH))
+        template = PromptTemplate("{character.nickname} ({character.personality.traits}) in "
+                                  "{appearance.clothing}{appearance.missing} {other}")
+        assert len(template.fields) == 4
+        assert template.render(profile) == (
+            "HooRii (tsundere, mischievous, cute, clever) in "
+            "Black skirt, wearing black choker, wearing black wireless cat-ear headset {other}"
+        )
+
+    def test_shipped_templates(self):
+        """Test the prompts/ tree overrides built-in actions where files exist"""
+        generator = PromptGenerator(CharacterProfile(str(CONFIG_PATH)), TemplateLibrary(str(PROMPTS_DIR)))
+        prompt = generator.generate_state_prompt(get_character_state(StateType.EMOTION, EmotionType.SURPRISED))
+        assert "looks around nervously left and right" in prompt
+        assert "Girl turns from left side" in generator.generate_transition_prompt(
+            StateType.DEFAULT, StateType.LISTENING
+        )
+
+    def test_edit_rebuilds_table(self, tmp_path):
+        """Test templates load lazily and edits reach the prompt table"""
+        library = TemplateLibrary(str(tmp_path), check_interval=0)
+        self.write(tmp_path / "emotions" / "happy.txt", "{character.nickname} grins\n")
+        generator = PromptGenerator(CharacterProfile(str(CONFIG_PATH)), library)
+        assert len(library) == 0
+
+        happy = get_character_state(StateType.EMOTION, EmotionType.HAPPY)
+        assert "HooRii grins, white background" in generator.generate_state_prompt(happy)
+        assert "girl is angry" in generator.generate_state_prompt(
+            get_character_state(StateType.EMOTION, EmotionType.ANGRY)
+        )
+        table = generator.table
+        assert generator.table is table
+
+        self.write(tmp_path / "emotions" / "happy.txt", "{character.nickname} laughs")
+        assert "HooRii laughs" in generator.generate_state_prompt(happy)
+
+        self.write(tmp_path / "emotions" / "angry.txt", "stomps")
+        assert "stomps" in generator.generate_state_prompt(
+            get_character_state(StateType.EMOTION, EmotionType.ANGRY)
+        )
+
+        table = generator.table
+        (tmp_path / "emotions" / "happy.txt").touch()
+        assert generator.table is table
+
+
+class TestPromptExport:
+    """Test change-aware prompt export"""
+
+    @staticmethod
+    def make_profiles(count):
+        """Profiles with distinct ids and clothing"""
+        profiles = []
+        for i in range(count):
+            profile = CharacterProfile(str(CONFIG_PATH))
+            profile.data['character']['id'] = f"char_{i}"
+            profile.data['appearance']['clothing'] = f"outfit {i}"
+            profile.mark_changed()
+            profiles.append(profile)
+        return profiles
+
+    def test_unchanged_files_skipped(self, tmp_path):
+        """Test a second export writes nothing and an edit writes only changed files"""
+        generator = PromptGenerator(CharacterProfile(str(CONFIG_PATH)))
+        first = generator.save_prompts_to_file(str(tmp_path))
+        assert len(first.written) == 17 and not first.unchanged
+        assert (tmp_path / "emotions" / "happy.txt").read_text(encoding='utf-8') == \
+            generator.generate_state_prompt(get_character_state(StateType.EMOTION, EmotionType.HAPPY))
+
+        mtime = (tmp_path / "listening_state.txt").stat().st_mtime_ns
+        second = generator.save_prompts_to_file(str(tmp_path))
+        assert not second.written and len(second.unchanged) == 17
+        assert (tmp_path / "listening_state.txt").stat().st_mtime_ns == mtime
+
+        (tmp_path / "emotions" / "sad.txt").write_text("edited", encoding='utf-8')
+        third = generator.save_prompts_to_file(str(tmp_path))
+        assert third.written == ["emotions/sad.txt"]
+        assert not list(tmp_path.rglob(".*.tmp"))
+
+    def test_refuses_template_directory(self, tmp_path):
+        """Test rendered prompts cannot overwrite the templates they come from"""
+        generator = PromptGenerator(CharacterProfile(str(CONFIG_PATH)), TemplateLibrary(str(tmp_path)))
+        with pytest.raises(ValueError):
+            generator.save_prompts_to_file(str(tmp_path))
+        assert not list(tmp_path.iterdir())
+
+    def test_jsonl_bulk_export(self, tmp_path):
+        """Test one line per character and no rewrite when unchanged"""
+        path = tmp_path / "prompts.jsonl"
+        profiles = self.make_profiles(3)
+        assert export_profiles(profiles, str(path)).written == ["char_0", "char_1", "char_2"]
+
+        lines = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+        assert "outfit 1" in lines[1]['prompts']["emotions/happy.txt"]
+
+        mtime = path.stat().st_mtime_ns
+        assert len(export_profiles(profiles, str(path)).unchanged) == 3
+        assert path.stat().st_mtime_ns == mtime
+
+    def test_sqlite_bulk_export(self, tmp_path):
+        """Test only prompts whose hash changed are rewritten"""
+        path = tmp_path / "prompts.sqlite"
+        profiles = self.make_profiles(2)
+        assert len(export_profiles(profiles, str(path)).written) == 34
+
+        profiles[1].data['appearance']['clothing'] = "new outfit"
+        profiles[1].mark_changed()
+        result = export_profiles(profiles, str(path))
+        assert all(key.startswith("char_1/") for key in result.written)
+        assert "char_1/character_image.txt" in result.written
+        assert len(result.unchanged) == 17 + 17 - len(result.written)
+
+        with sqlite3.connect(str(path)) as connection:
+            (prompt,) = connection.execute(
+                "SELECT prompt FROM prompts WHERE character_id = 'char_1' AND name = 'listening_state.txt'"
+            ).fetchone()
+        assert "new outfit" in prompt
+
+    def test_sqlite_removes_stale_prompts(self, tmp_path):
+        """Test rows a character no longer produces are deleted"""
+        path = tmp_path / "prompts.sqlite"
+        profiles = self.make_profiles(1)
+        export_profiles(profiles, str(path))
+        with sqlite3.connect(str(path)) as connection:
+            connection.execute(
+                "INSERT INTO prompts VALUES ('char_0', 'emotions/retired.txt', 'old', 'x')"
+            )
+
+        result = export_profiles(profiles, str(path))
+        assert result.removed == ["char_0/emotions/retired.txt"]
+        with sqlite3.connect(str(path)) as connection:
+            (count,) = connection.execute("SELECT COUNT(*) FROM prompts").fetchone()
+        assert count == 17
+
+    def test_duplicate_character_ids_rejected(self, tmp_path):
+        """Test two profiles resolving to one id fail without touching the target"""
+        profiles = self.make_profiles(2)
+        profiles[1].data['character']['id'] = "char_0"
+        profiles[1].mark_changed()
+
+        for name in ("prompts.jsonl", "prompts.sqlite"):
+            path = tmp_path / name
+            export_profiles(profiles[:1], str(path))
+            before = path.read_bytes()
+            with pytest.raises(ValueError):
+                export_profiles(profiles, str(path))
+            assert path.read_bytes() == before
+        assert not list(tmp_path.glob(".*.tmp"))
+
+    def test_unknown_format(self, tmp_path):
+        """Test unsupported export formats are rejected"""
+        with pytest.raises(ValueError):
+            export_profiles([], str(tmp_path / "prompts.csv"))
+
+
+class TestPromptSweep:
+    """Test prompt variant sweeps"""
+
+    @pytest.fixture
+    def profile(self):
+        return CharacterProfile(str(CONFIG_PATH))
+
+    def test_lazy_product(self, profile):
+        """Test variants cover the product and leave the base profile alone"""
+        happy = get_character_state(StateType.EMOTION, EmotionType.HAPPY)
+        sweep = (PromptSweep(profile, states=[happy])
+                 .vary("appearance.clothing", ["red coat", "blue dress"])
+                 .vary("appearance.art_style", ["watercolor", "pixel art", "anime"]))
+        assert len(sweep) == 6
+
+        variants = sweep.variants()
+        first = next(variants)
+        assert first.overrides == (("appearance.clothing", "red coat"), ("appearance.art_style", "watercolor"))
+        assert first.prompt.startswith("watercolor, red coat")
+        assert len(list(variants)) == 5
+        assert "red coat" not in PromptGenerator(profile).generate_state_prompt(happy)
+
+    def test_duplicates_removed(self, profile):
+        """Test variants rendering identical prompts are generated once"""
+        happy = get_character_state(StateType.EMOTION, EmotionType.HAPPY)
+        listening = get_character_state(StateType.LISTENING)
+        sweep = (PromptSweep(profile, states=[listening])
+                 .vary("appearance.pose", ["standing", "sitting"])
+                 .vary_action(happy, ["smiles", "{character.nickname} smiles", "smiles"]))
+        assert len(sweep) == 2 * (1 + 3)
+
+        unique = list(sweep.unique())
+        assert len(unique) == 3
+        assert "HooRii smiles" in unique[2].prompt
+
+        estimate = sweep.estimate(cost_per_second=0.5)
+        assert (estimate.combinations, estimate.unique, estimate.duplicates) == (8, 3, 5)
+        assert estimate.cost == pytest.approx(estimate.video_seconds * 0.5)
+
+    def test_states_never_merged(self, profile):
+        """Test states rendering the same prompt each keep their clip"""
+        listening = get_character_state(StateType.LISTENING)
+        neutral = get_character_state(StateType.EMOTION, EmotionType.NEUTRAL)
+        sweep = PromptSweep(profile)
+        generator = PromptGenerator(profile)
+        assert generator.generate_state_prompt(neutral) == generator.generate_state_prompt(listening)
+
+        labels = [variant.label for variant in sweep.unique()]
+        assert len(labels) == len(sweep)
+        assert any(label.startswith("neutral_") for label in labels)
+
+    def test_submit_unique_only(self, profile, tmp_path):
+        """Test only unique prompts are submitted and cost limits are enforced"""
+        happy = get_character_state(StateType.EMOTION, EmotionType.HAPPY)
+        sweep = PromptSweep(profile, states=[]).vary_action(happy, ["smiles", "smiles", "grins"])
+
+        with pytest.raises(ValueError):
+            sweep.submit(VideoGenerator(), str(tmp_path), max_cost=1.0)
+
+        results = sweep.submit(VideoGenerator(), str(tmp_path), max_cost=100.0)
+        assert [result['label'] for result in results] == ["happy_0000", "happy_0002"]
+        assert all(result['success'] for result in results)
+
+    def test_invalid_field(self, profile):
+        """Test only appearance and character fields can be swept"""
+        with pytest.raises(ValueError):
+            PromptSweep(profile).vary("clothing", ["red"])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])